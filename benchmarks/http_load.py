@@ -0,0 +1,307 @@
+"""
+Benchmark de carga HTTP ponta a ponta da API de Tarefas
+
+Sobe a aplicação real (servidor WSGI em thread) sobre um banco SQLite
+populado, dispara tráfego concorrente misto (login, listagens com filtros
+e páginas profundas, criação, atualização, exclusão e estatísticas) e
+gera um relatório JSON com vazão e latências p50/p95/p99 por endpoint.
+
+Uso:
+    python benchmarks/http_load.py --users 10000 --tasks-per-user 100 \\
+        --duration 60 --concurrency 32 --output resultado.json
+
+    # Comparar com um baseline salvo (sai com código 1 em regressão)
+    python benchmarks/http_load.py --compare benchmarks/baseline.json --threshold 0.15
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+# Adicionar o diretório raiz ao path
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# Peso relativo de cada operação no tráfego misto
+TRAFFIC_MIX = {
+    'login': 2,
+    'list': 25,
+    'list_filtered': 15,
+    'list_deep_page': 8,
+    'get': 10,
+    'create': 12,
+    'update': 12,
+    'delete': 6,
+    'stats': 10,
+}
+
+def start_server(app):
+    """Subir a aplicação em um servidor WSGI multithread numa porta livre"""
+    from werkzeug.serving import make_server
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+class BenchClient:
+    """Cliente HTTP keep-alive de um worker do benchmark"""
+
+    def __init__(self, port, users, tasks_per_user):
+        self.port = port
+        self.users = users
+        self.tasks_per_user = tasks_per_user
+        self.conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        self.token = None
+        self.user_index = None
+        self.created_ids = []
+
+    def request(self, method, path, body=None):
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        payload = json.dumps(body) if body is not None else None
+        try:
+            self.conn.request(method, path, body=payload, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+        except (http.client.HTTPException, OSError):
+            # Reabrir a conexão e propagar a falha para ser contada como erro
+            self.conn.close()
+            self.conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=30)
+            raise
+        return response.status, data
+
+    def login(self, rng):
+        from init_db import SEED_PASSWORD, seed_email
+
+        self.user_index = rng.randint(1, self.users)
+        self.token = None
+        status, data = self.request('POST', '/api/login', {
+            'email': seed_email(self.user_index),
+            'password': SEED_PASSWORD
+        })
+        if status == 200:
+            self.token = json.loads(data)['access_token']
+            self.created_ids = []
+        return status
+
+    def run(self, operation, rng):
+        """Executar uma operação e devolver o status HTTP"""
+        if operation == 'login' or self.token is None:
+            return self.login(rng)
+        if operation == 'list':
+            return self.request('GET', '/api/tasks')[0]
+        if operation == 'list_filtered':
+            status = rng.choice(['pendente', 'concluida'])
+            return self.request('GET', f'/api/tasks?status={status}&per_page=50')[0]
+        if operation == 'list_deep_page':
+            pages = max(1, self.tasks_per_user // 20)
+            return self.request('GET', f'/api/tasks?page={rng.randint(1, pages)}')[0]
+        if operation == 'get':
+            if not self.created_ids:
+                return self.request('GET', '/api/tasks?per_page=1')[0]
+            return self.request('GET', f'/api/tasks/{rng.choice(self.created_ids)}')[0]
+        if operation == 'create':
+            status, data = self.request('POST', '/api/tasks', {
+                'name': f'Tarefa benchmark {rng.randint(0, 10 ** 6)}',
+                'description': 'Criada durante o benchmark',
+                'status': 'pendente'
+            })
+            if status == 201:
+                self.created_ids.append(json.loads(data)['task']['id'])
+            return status
+        if operation == 'update':
+            if not self.created_ids:
+                return self.run('create', rng)
+            return self.request('PUT', f'/api/tasks/{rng.choice(self.created_ids)}', {
+                'status': rng.choice(['pendente', 'concluida'])
+            })[0]
+        if operation == 'delete':
+            if not self.created_ids:
+                return self.run('create', rng)
+            task_id = self.created_ids.pop(rng.randrange(len(self.created_ids)))
+            return self.request('DELETE', f'/api/tasks/{task_id}')[0]
+        if operation == 'stats':
+            return self.request('GET', '/api/tasks/stats')[0]
+        raise ValueError(f'Operação desconhecida: {operation}')
+
+def percentile(sorted_values, fraction):
+    """Percentil pelo método nearest-rank"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def run_load(port, users, tasks_per_user, duration, concurrency, seed=1):
+    """Disparar o tráfego misto e coletar latências por operação"""
+    operations = list(TRAFFIC_MIX)
+    weights = [TRAFFIC_MIX[op] for op in operations]
+    deadline = time.perf_counter() + duration
+
+    def worker(worker_id):
+        rng = random.Random(seed * 1000 + worker_id)
+        client = BenchClient(port, users, tasks_per_user)
+        latencies = defaultdict(list)
+        errors = defaultdict(int)
+        client.login(rng)
+        while time.perf_counter() < deadline:
+            operation = rng.choices(operations, weights)[0]
+            started = time.perf_counter()
+            try:
+                status = client.run(operation, rng)
+            except (http.client.HTTPException, OSError):
+                status = None
+            elapsed = time.perf_counter() - started
+            if status is None or status >= 400:
+                errors[operation] += 1
+            else:
+                latencies[operation].append(elapsed)
+        client.conn.close()
+        return latencies, errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    all_latencies = defaultdict(list)
+    all_errors = defaultdict(int)
+    for latencies, errors in results:
+        for operation, values in latencies.items():
+            all_latencies[operation].extend(values)
+        for operation, count in errors.items():
+            all_errors[operation] += count
+
+    return summarize(all_latencies, all_errors, elapsed)
+
+def summarize(latencies, errors, elapsed):
+    """Montar o relatório com vazão e percentis em milissegundos"""
+    endpoints = {}
+    total_requests = 0
+    for operation in TRAFFIC_MIX:
+        values = sorted(latencies.get(operation, []))
+        total_requests += len(values)
+        endpoints[operation] = {
+            'requests': len(values),
+            'errors': errors.get(operation, 0),
+            'throughput_rps': round(len(values) / elapsed, 2) if elapsed else 0,
+            'p50_ms': round(percentile(values, 0.50) * 1000, 3),
+            'p95_ms': round(percentile(values, 0.95) * 1000, 3),
+            'p99_ms': round(percentile(values, 0.99) * 1000, 3)
+        }
+    return {
+        'duration_s': round(elapsed, 3),
+        'total_requests': total_requests,
+        'total_errors': sum(errors.values()),
+        'throughput_rps': round(total_requests / elapsed, 2) if elapsed else 0,
+        'endpoints': endpoints
+    }
+
+def compare_results(current, baseline, threshold):
+    """
+    Comparar o resultado atual com um baseline
+
+    Returns:
+        list: Descrição das regressões acima do limite (vazia se nenhuma)
+    """
+    regressions = []
+    for operation, base in baseline.get('endpoints', {}).items():
+        now = current['endpoints'].get(operation)
+        if not now or not base.get('requests'):
+            continue
+        for metric in ('p50_ms', 'p95_ms', 'p99_ms'):
+            if base[metric] and now[metric] > base[metric] * (1 + threshold):
+                regressions.append(f'{operation}.{metric}: {base[metric]} -> {now[metric]}')
+        if now['throughput_rps'] < base['throughput_rps'] * (1 - threshold):
+            regressions.append(
+                f"{operation}.throughput_rps: {base['throughput_rps']} -> {now['throughput_rps']}"
+            )
+    if current['throughput_rps'] < baseline.get('throughput_rps', 0) * (1 - threshold):
+        regressions.append(f"throughput_rps: {baseline['throughput_rps']} -> {current['throughput_rps']}")
+    return regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark de carga HTTP da API de Tarefas')
+    parser.add_argument('--users', type=int, default=10000, help='Usuários no banco populado')
+    parser.add_argument('--tasks-per-user', type=int, default=100, help='Tarefas por usuário')
+    parser.add_argument('--duration', type=float, default=30, help='Duração da carga em segundos')
+    parser.add_argument('--concurrency', type=int, default=32, help='Clientes concorrentes')
+    parser.add_argument('--db', help='Arquivo SQLite a usar (reaproveitado se já existir)')
+    parser.add_argument('--output', help='Arquivo onde gravar o relatório JSON')
+    parser.add_argument('--compare', help='Relatório JSON de baseline para comparação')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Regressão tolerada em fração (0.10 = 10%%)')
+    parser.add_argument('--seed', type=int, default=1, help='Semente do gerador de tráfego')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    db_file = args.db or os.path.join(
+        tempfile.gettempdir(), f'bench_{args.users}u_{args.tasks_per_user}t.db'
+    )
+    db_file = os.path.abspath(db_file)
+    needs_seed = not os.path.exists(db_file)
+
+    # A configuração lê DATABASE_URL na importação, então definir antes de importar
+    # a app (e o init_db, que também importa src.config)
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_file}'
+    from init_db import seed_database
+    from src.main import create_app
+    from src.models.sharding import init_shards
+    app = create_app('production')
+
+    if needs_seed:
+        print(f'Populando {db_file} ({args.users} usuários x {args.tasks_per_user} tarefas)...',
+              file=sys.stderr)
+        seeded = seed_database(args.users, args.tasks_per_user, app=app)
+        with app.app_context():
+            # Registrar os usuários gerados no diretório de shards (se ativo)
+            init_shards()
+        print(f"Banco populado em {seeded['seconds']}s ({seeded['rows_per_second']} linhas/s)",
+              file=sys.stderr)
+
+    server = start_server(app)
+    try:
+        result = run_load(server.server_port, args.users, args.tasks_per_user,
+                          args.duration, args.concurrency, args.seed)
+    finally:
+        server.shutdown()
+
+    result['config'] = {
+        'users': args.users,
+        'tasks_per_user': args.tasks_per_user,
+        'duration_s': args.duration,
+        'concurrency': args.concurrency,
+        'seed': args.seed
+    }
+
+    report = json.dumps(result, indent=2, ensure_ascii=False)
+    print(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(result, baseline, args.threshold)
+        if regressions:
+            print('Regressões acima do limite:', file=sys.stderr)
+            for line in regressions:
+                print(f'  {line}', file=sys.stderr)
+            return 1
+        print('Sem regressões em relação ao baseline', file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,16 +2,35 @@
 Script para inicializar o banco de dados da API de Tarefas
 """
 
+import argparse
 import os
+import random
 import sys
+import time
+from datetime import datetime, timedelta
 
 # Adicionar o diretório raiz ao path
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from flask import Flask
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.pool import NullPool
+from werkzeug.security import generate_password_hash
 from src.config import config
 from src.models import db, User, Task
 
+# Senha de todos os usuários sintéticos criados por seed_database
+SEED_PASSWORD = 'seed123'
+
+# PRAGMAs aplicados apenas na conexão de carga: sem fsync por transação e
+# journal/temporários em memória (um crash no meio da carga exige refazê-la)
+BULK_LOAD_PRAGMAS = [
+    'PRAGMA synchronous = OFF',
+    'PRAGMA journal_mode = MEMORY',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA cache_size = -262144',
+]
+
 def create_app(config_name='development'):
     """Criar aplicação Flask com configuração específica"""
     app = Flask(__name__)
@@ -73,14 +92,147 @@ def create_sample_data():
         print(f"Usuário: {user.email} (senha: 123456)")
         print(f"{len(tasks)} tarefas criadas")
 
+def seed_email(user_id):
+    """Email determinístico de um usuário sintético"""
+    return f"user{user_id}@seed.local"
+
+def seed_database(users, tasks_per_user, status_ratio=0.3, batch_size=100000,
+                  app=None, random_seed=42):
+    """
+    Gerar dados sintéticos em massa para testes de capacidade
+    
+    Os usuários recebem IDs a partir do maior ID existente e todos
+    compartilham um único hash de senha (SEED_PASSWORD) calculado uma vez.
+    As linhas são inseridas com executemany via Core em transações de
+    `batch_size` linhas, sem passar pela unit of work do ORM. A carga usa
+    uma engine própria, descartada no fim, para que os BULK_LOAD_PRAGMAS
+    não fiquem em conexões do pool da aplicação.
+    
+    Args:
+        users (int): Quantidade de usuários a criar
+        tasks_per_user (int): Tarefas por usuário
+        status_ratio (float): Fração de tarefas com status 'concluida'
+        batch_size (int): Linhas por transação
+        app (Flask): Aplicação a usar (padrão: create_app())
+        random_seed (int): Semente para datas e status
+        
+    Returns:
+        dict: Linhas inseridas, tempo gasto e linhas por segundo
+    """
+    app = app or create_app()
+    rng = random.Random(random_seed)
+    started = time.perf_counter()
+    
+    with app.app_context():
+        db.create_all()
+        password_hash = generate_password_hash(SEED_PASSWORD)
+        now = datetime.now()
+        
+        # Banco em memória só existe na conexão da aplicação
+        in_memory = db.engine.url.database in (None, '', ':memory:')
+        engine = db.engine if in_memory else create_engine(db.engine.url, poolclass=NullPool)
+        try:
+            first_id = _bulk_load(engine, users, tasks_per_user, status_ratio, batch_size,
+                                  rng, password_hash, now)
+        finally:
+            if engine is not db.engine:
+                engine.dispose()
+    
+    elapsed = time.perf_counter() - started
+    rows = users + users * tasks_per_user
+    return {
+        'users': users,
+        'tasks': users * tasks_per_user,
+        'first_user_id': first_id,
+        'seconds': round(elapsed, 2),
+        'rows_per_second': round(rows / elapsed) if elapsed else rows
+    }
+
+def _bulk_load(engine, users, tasks_per_user, status_ratio, batch_size, rng, password_hash, now):
+    """Inserir usuários e tarefas sintéticos; devolve o ID do primeiro usuário"""
+    with engine.connect() as conn:
+        # O modo WAL fica gravado no arquivo e é compartilhado com a aplicação: mantê-lo
+        wal = conn.exec_driver_sql('PRAGMA journal_mode').scalar() == 'wal'
+        for pragma in BULK_LOAD_PRAGMAS:
+            if not (wal and 'journal_mode' in pragma):
+                conn.exec_driver_sql(pragma)
+        
+        first_id = (conn.execute(select(func.max(User.id))).scalar() or 0) + 1
+        user_ids = range(first_id, first_id + users)
+        
+        for start in range(0, users, batch_size):
+            conn.execute(insert(User.__table__), [
+                {
+                    'id': user_id,
+                    'name': f'Usuário {user_id}',
+                    'email': seed_email(user_id),
+                    'password_hash': password_hash,
+                    'created_at': now,
+                    'updated_at': now
+                }
+                for user_id in user_ids[start:start + batch_size]
+            ])
+            conn.commit()
+        
+        batch = []
+        for user_id in user_ids:
+            for n in range(tasks_per_user):
+                created = now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+                batch.append({
+                    'name': f'Tarefa {n + 1}',
+                    'description': None,
+                    'status': 'concluida' if rng.random() < status_ratio else 'pendente',
+                    'user_id': user_id,
+                    'created_at': created,
+                    'updated_at': created
+                })
+                if len(batch) >= batch_size:
+                    conn.execute(insert(Task.__table__), batch)
+                    conn.commit()
+                    batch = []
+        if batch:
+            conn.execute(insert(Task.__table__), batch)
+            conn.commit()
+    return first_id
+
+def parse_args(argv=None):
+    """Argumentos de linha de comando"""
+    parser = argparse.ArgumentParser(description='Inicializar o banco de dados da API de Tarefas')
+    parser.add_argument('--sample', action='store_true',
+                        help='Criar o usuário e as tarefas de exemplo')
+    parser.add_argument('--users', type=int, default=0,
+                        help='Quantidade de usuários sintéticos a gerar')
+    parser.add_argument('--tasks-per-user', type=int, default=0,
+                        help='Tarefas sintéticas por usuário')
+    parser.add_argument('--status-ratio', type=float, default=0.3,
+                        help="Fração de tarefas sintéticas com status 'concluida'")
+    parser.add_argument('--batch-size', type=int, default=100000,
+                        help='Linhas por transação na carga sintética')
+    args = parser.parse_args(argv)
+    if not 0 <= args.status_ratio <= 1:
+        parser.error('--status-ratio deve estar entre 0 e 1')
+    return args
+
 if __name__ == '__main__':
+    args = parse_args()
+    
     print("Inicializando banco de dados da API de Tarefas...")
     init_database()
     
-    # Perguntar se deve criar dados de exemplo
-    create_sample = input("\n Deseja criar dados de exemplo? (s/N): ").lower().strip()
-    if create_sample in ['s', 'sim', 'y', 'yes']:
+    create_sample = args.sample
+    # Só perguntar quando houver um terminal; builds (Dockerfile) não têm stdin
+    if not create_sample and not args.users and sys.stdin.isatty():
+        answer = input("\n Deseja criar dados de exemplo? (s/N): ").lower().strip()
+        create_sample = answer in ['s', 'sim', 'y', 'yes']
+    if create_sample:
         create_sample_data()
     
+    if args.users:
+        print(f"\n Gerando {args.users} usuários x {args.tasks_per_user} tarefas...")
+        result = seed_database(args.users, args.tasks_per_user, args.status_ratio, args.batch_size)
+        print(f"{result['users'] + result['tasks']} linhas em {result['seconds']}s "
+              f"({result['rows_per_second']} linhas/s)")
+        print(f"Usuários user{result['first_user_id']}@seed.local em diante (senha: {SEED_PASSWORD})")
+    
     print("\n Configuração concluída!")
 
@@ -0,0 +1,252 @@
+"""
+Modo de execução ASGI da API de Tarefas
+
+Expõe a mesma aplicação Flask (mesmas rotas, TaskService/AuthService e
+contrato JSON) por meio de handlers assíncronos. A leitura do corpo e o
+envio da resposta acontecem no event loop, e apenas o processamento da
+requisição (banco de dados, hash de senha) roda em um pool de threads
+limitado. Conexões lentas ou ociosas não prendem threads, então um único
+processo sustenta milhares de conexões simultâneas. O corpo da resposta é
+enviado em partes, à medida que a aplicação o produz, e requisições além
+da capacidade do pool e da fila recebem 503.
+
+Uso:
+    uvicorn --factory src.asgi:create_asgi_app --host 0.0.0.0 --port 5001
+"""
+
+import asyncio
+import io
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+class WsgiResponse:
+    """
+    Resposta de uma aplicação WSGI lida parte a parte
+
+    Cada chamada (a aplicação e cada read) roda em uma thread do pool; entre
+    uma parte e outra nenhuma thread fica presa ao envio para o cliente.
+    """
+
+    def __init__(self, wsgi_app, environ):
+        self.status = None
+        self.headers = None
+        self.closed = False
+        self._written = []
+        self._result = wsgi_app(environ, self._start_response)
+        self._iterator = iter(self._result)
+
+    def _start_response(self, status, response_headers, exc_info=None):
+        self.status = int(status.split(' ', 1)[0])
+        self.headers = [
+            (name.lower().encode('latin-1'), value.encode('latin-1'))
+            for name, value in response_headers
+        ]
+        return self._written.append
+
+    def read(self):
+        """Próxima parte não vazia do corpo, ou None no fim (a resposta é fechada)"""
+        while not self.closed:
+            chunk = next(self._iterator, None)
+            # Dados do write() legado vêm antes da parte seguinte do iterável
+            if self._written:
+                data = b''.join(self._written) + (chunk or b'')
+                self._written.clear()
+            else:
+                data = chunk
+            if chunk is None:
+                self.close()
+            if data:
+                return data
+        return None
+
+    def close(self):
+        """Fechar o iterável da aplicação (uma única vez)"""
+        if not self.closed:
+            self.closed = True
+            if hasattr(self._result, 'close'):
+                self._result.close()
+
+class AsgiAdapter:
+    """Adaptador ASGI que despacha requisições para uma aplicação WSGI"""
+
+    def __init__(self, wsgi_app, max_workers=32, max_body_size=None, max_queue=None):
+        self.wsgi_app = wsgi_app
+        self.max_workers = max_workers
+        # Requisições em andamento além das max_workers (na fila do pool ou
+        # enviando a resposta); acima disso a resposta é 503 (padrão: 4 por thread)
+        self.max_queue = max_workers * 4 if max_queue is None else max_queue
+        self.in_flight = 0
+        # Limite do corpo aplicado já na leitura (padrão: MAX_CONTENT_LENGTH da aplicação)
+        if max_body_size is None:
+            max_body_size = getattr(wsgi_app, 'config', {}).get('MAX_CONTENT_LENGTH')
+        self.max_body_size = max_body_size
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='asgi-worker'
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        """Responder aos eventos de ciclo de vida do servidor"""
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope, receive, send):
+        """Ler o corpo, processar no pool de threads e enviar a resposta"""
+        limit = self.max_body_size
+        if limit is not None and self._declared_length(scope) > limit:
+            await self._send_too_large(send)
+            return
+
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body.extend(message.get('body', b''))
+            # Corpo sem Content-Length (chunked) ou maior que o declarado
+            if limit is not None and len(body) > limit:
+                await self._send_too_large(send)
+                return
+            if not message.get('more_body', False):
+                break
+
+        # Contador só alterado no event loop: dispensa lock
+        if self.in_flight >= self.max_workers + self.max_queue:
+            await self._send_json(send, 503, 'Servidor sobrecarregado, tente novamente', [(b'retry-after', b'1')])
+            return
+        self.in_flight += 1
+        try:
+            await self._respond(self.build_environ(scope, bytes(body)), send)
+        finally:
+            self.in_flight -= 1
+
+    async def _respond(self, environ, send):
+        """Enviar cada parte do corpo com more_body=True assim que a aplicação a produz"""
+        loop = asyncio.get_running_loop()
+        response, chunk = await loop.run_in_executor(self.executor, self._start_wsgi, environ)
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': response.status,
+                'headers': response.headers
+            })
+            while chunk is not None:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                chunk = await loop.run_in_executor(self.executor, response.read)
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            # Cliente desconectado no meio do envio: liberar a resposta (e a requisição Flask)
+            if not response.closed:
+                await loop.run_in_executor(self.executor, response.close)
+
+    @staticmethod
+    def _declared_length(scope):
+        """Valor do header Content-Length (0 se ausente ou inválido)"""
+        for raw_name, raw_value in scope.get('headers', []):
+            if raw_name.lower() == b'content-length':
+                try:
+                    return int(raw_value)
+                except ValueError:
+                    return 0
+        return 0
+
+    async def _send_too_large(self, send):
+        """Responder 413 sem ler o restante do corpo"""
+        await self._send_json(send, 413, f'Corpo da requisição excede o limite de {self.max_body_size} bytes')
+
+    @staticmethod
+    async def _send_json(send, status, error, headers=()):
+        """Responder um erro JSON sem passar pela aplicação"""
+        body = json.dumps({'error': error}).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+                *headers
+            ]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    def _start_wsgi(self, environ):
+        """Executar a aplicação WSGI e ler a primeira parte do corpo (roda em uma thread do pool)"""
+        response = WsgiResponse(self.wsgi_app, environ)
+        try:
+            return response, response.read()
+        except BaseException:
+            response.close()
+            raise
+
+    @staticmethod
+    def build_environ(scope, body):
+        """
+        Montar o environ WSGI (PEP 3333) a partir do scope ASGI
+
+        Args:
+            scope (dict): Scope HTTP da requisição ASGI
+            body (bytes): Corpo completo da requisição
+
+        Returns:
+            dict: Environ WSGI
+        """
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'REMOTE_PORT': str(client[1]),
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+
+        for raw_name, raw_value in scope.get('headers', []):
+            name = raw_name.decode('latin-1').upper().replace('-', '_')
+            value = raw_value.decode('latin-1')
+            if name == 'CONTENT_TYPE':
+                environ['CONTENT_TYPE'] = value
+                continue
+            if name == 'CONTENT_LENGTH':
+                continue
+            key = f'HTTP_{name}'
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+
+        return environ
+
+def create_asgi_app(config_name=None):
+    """Criar a aplicação ASGI a partir da aplicação Flask"""
+    from src.main import create_app
+
+    app = create_app(config_name)
+    return AsgiAdapter(
+        app,
+        max_workers=app.config['ASGI_MAX_WORKERS'],
+        max_body_size=app.config['MAX_CONTENT_LENGTH'],
+        max_queue=app.config['ASGI_MAX_QUEUE']
+    )
@@ -0,0 +1,101 @@
+"""
+Comandos de linha de comando da aplicação (flask --app src.main <comando>)
+"""
+
+import click
+
+def register_commands(app):
+    """Registrar os comandos de manutenção na CLI do Flask"""
+
+    @app.cli.command('rebalance-shards')
+    @click.option('--batch-size', default=500, show_default=True,
+                  help='Entradas do diretório lidas por vez')
+    def rebalance_shards(batch_size):
+        """Mover usuários para o shard indicado pelo hashing consistente"""
+        from src.services.shard_service import ShardService
+
+        success, message, stats = ShardService.rebalance(batch_size=batch_size)
+        if not success:
+            raise click.ClickException(message)
+        click.echo(f"{message}: {stats['scanned']} usuários verificados, "
+                   f"{stats['moved']} movidos, {stats['failed']} falhas")
+
+    @app.cli.command('sweep-idempotency-keys')
+    @click.option('--batch-size', default=500, show_default=True,
+                  help='Registros removidos por transação')
+    def sweep_idempotency_keys(batch_size):
+        """Remover respostas de Idempotency-Key expiradas"""
+        from src.services.idempotency_service import IdempotencyService
+
+        removed = IdempotencyService.sweep_expired(batch_size=batch_size)
+        click.echo(f"{removed} chaves expiradas removidas")
+
+    @app.cli.command('sweep-revoked-tokens')
+    def sweep_revoked_tokens():
+        """Remover revogações de tokens que já expiraram"""
+        from src.services.revocation_service import RevocationService
+
+        removed = RevocationService.sweep_expired()
+        click.echo(f"{removed} revogações expiradas removidas")
+
+    @app.cli.command('archive-tasks')
+    @click.option('--older-than-days', type=int, default=None,
+                  help='Idade mínima das tarefas concluídas (padrão: ARCHIVE_AFTER_DAYS)')
+    @click.option('--batch-size', type=int, default=None,
+                  help='Tarefas movidas por transação (padrão: ARCHIVE_BATCH_SIZE)')
+    def archive_tasks(older_than_days, batch_size):
+        """Mover tarefas concluídas antigas para tasks_archive"""
+        from src.services.archive_service import ArchiveService
+
+        success, message, stats = ArchiveService.archive_completed_tasks(
+            older_than_days=older_than_days, batch_size=batch_size
+        )
+        if not success:
+            raise click.ClickException(message)
+        click.echo(f"{message}: {stats['archived']} tarefas arquivadas em {stats['batches']} lotes")
+
+    @app.cli.command('backfill-task-stats')
+    def backfill_task_stats():
+        """Reconstruir o agregado diário de tarefas concluídas"""
+        from src.services.stats_service import StatsService
+
+        success, message, stats = StatsService.backfill_completions()
+        if not success:
+            raise click.ClickException(message)
+        click.echo(f"{message}: {stats['tasks']} tarefas sem data de conclusão preenchidas, "
+                   f"{stats['days']} dias agregados")
+
+    @app.cli.command('backup-db')
+    @click.option('--destination', default=None, help='Diretório dos snapshots (padrão: BACKUP_DIR)')
+    @click.option('--pages', type=int, default=None,
+                  help='Páginas copiadas por passo (padrão: BACKUP_PAGES_PER_STEP)')
+    @click.option('--compress/--no-compress', default=None, help='Comprimir com gzip (padrão: BACKUP_COMPRESS)')
+    @click.option('--keep', type=int, default=None, help='Snapshots mantidos (padrão: BACKUP_KEEP, 0 mantém todos)')
+    def backup_db(destination, pages, compress, keep):
+        """Copiar os bancos (todos os shards) para um snapshot, sem parar a aplicação"""
+        from src.services.backup_service import BackupService
+
+        success, message, stats = BackupService.create_backup(
+            destination=destination, pages=pages, compress=compress, keep=keep
+        )
+        if not success:
+            raise click.ClickException(message)
+        click.echo(f"{message}: {stats['snapshot']} ({stats['shards']} shards, {stats['bytes']} bytes), "
+                   f"{stats['pruned']} snapshots antigos removidos")
+
+    @app.cli.command('restore-db')
+    @click.argument('snapshot', required=False)
+    @click.option('--verify-only', is_flag=True, help='Apenas conferir o snapshot, sem restaurar')
+    def restore_db(snapshot, verify_only):
+        """Conferir e restaurar um snapshot (padrão: o mais recente) sobre os bancos"""
+        from src.services.backup_service import BackupService
+
+        if snapshot is None:
+            snapshots = BackupService.list_backups()
+            if not snapshots:
+                raise click.ClickException("Nenhum snapshot encontrado")
+            snapshot = snapshots[-1]
+        success, message, stats = BackupService.restore_backup(snapshot, verify_only=verify_only)
+        if not success:
+            raise click.ClickException(message)
+        click.echo(f"{message}: {snapshot} ({stats['shards']} shards)")
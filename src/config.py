@@ -7,6 +7,58 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Réplicas de leitura: URIs explícitas ou, para SQLite, N conexões
+    # somente leitura ao mesmo arquivo WAL (0 desativa o roteamento)
+    SQLALCHEMY_READ_REPLICAS = [uri for uri in os.environ.get('DATABASE_READ_URLS', '').split(',') if uri]
+    SQLALCHEMY_READ_POOL_SIZE = int(os.environ.get('DATABASE_READ_POOL_SIZE', 0))
+    
+    # Particionamento por usuário: total de shards (1 desativa) ou URIs
+    # explícitas dos shards adicionais (o shard 0 é o banco principal)
+    SHARD_COUNT = int(os.environ.get('DATABASE_SHARDS', 1))
+    SHARD_DATABASE_URIS = [uri for uri in os.environ.get('DATABASE_SHARD_URLS', '').split(',') if uri]
+    # Travas de migração mais antigas que isso (em segundos) são de migrações
+    # interrompidas e deixam de bloquear o usuário
+    SHARD_MOVE_LOCK_SECONDS = int(os.environ.get('SHARD_MOVE_LOCK_SECONDS', 600))
+    
+    # Group commit das escritas de tarefas: escritas concorrentes dentro da
+    # janela (em ms) compartilham uma transação e um fsync (0 desativa)
+    GROUP_COMMIT_WINDOW_MS = float(os.environ.get('GROUP_COMMIT_WINDOW_MS', 0))
+    GROUP_COMMIT_MAX_BATCH = int(os.environ.get('GROUP_COMMIT_MAX_BATCH', 256))
+    
+    # Exclusão de conta: tarefas removidas por transação e limite acima do
+    # qual a exclusão roda em segundo plano
+    ACCOUNT_DELETE_CHUNK_SIZE = 500
+    ACCOUNT_DELETE_SYNC_MAX_TASKS = 2000
+    BACKGROUND_WORKERS = 2
+    
+    # Arquivamento: tarefas concluídas há mais de N dias vão para tasks_archive
+    ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 90))
+    ARCHIVE_BATCH_SIZE = 500
+    
+    # Ordem manual: chaves de posição maiores que isso disparam o
+    # reequilíbrio das posições do usuário em segundo plano
+    POSITION_REBALANCE_LENGTH = int(os.environ.get('POSITION_REBALANCE_LENGTH', 24))
+    
+    # Lembretes de prazo (due_at): agendador em processo, desligado por
+    # padrão; carrega do banco a cada POLL os lembretes da janela LOOKAHEAD.
+    # REMINDER_SINK: 'modulo:funcao' que recebe cada lembrete (padrão: log)
+    REMINDERS_ENABLED = os.environ.get('REMINDERS_ENABLED', 'false').lower() in ('true', '1', 'yes')
+    REMINDER_LOOKAHEAD_SECONDS = int(os.environ.get('REMINDER_LOOKAHEAD_SECONDS', 300))
+    REMINDER_POLL_SECONDS = int(os.environ.get('REMINDER_POLL_SECONDS', 30))
+    REMINDER_BATCH_SIZE = 1000
+    REMINDER_SINK = os.environ.get('REMINDER_SINK') or None
+    
+    # Backup online (flask backup-db): snapshots em BACKUP_DIR, páginas
+    # copiadas por passo da API de backup do SQLite (as escritas seguem
+    # entre os passos), gzip, snapshots mantidos e backup periódico em
+    # minutos (0 desativa)
+    BACKUP_DIR = os.environ.get('BACKUP_DIR') or os.path.join(os.path.dirname(__file__), 'database', 'backups')
+    BACKUP_PAGES_PER_STEP = int(os.environ.get('BACKUP_PAGES_PER_STEP', 256))
+    BACKUP_STEP_SLEEP = 0.01
+    BACKUP_COMPRESS = os.environ.get('BACKUP_COMPRESS', 'true').lower() in ('true', '1', 'yes')
+    BACKUP_KEEP = int(os.environ.get('BACKUP_KEEP', 7))
+    BACKUP_INTERVAL_MINUTES = int(os.environ.get('BACKUP_INTERVAL_MINUTES', 0))
+    
     # Configurações JWT
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-chave-de-producao'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
@@ -16,8 +68,39 @@ class Config:
     JWT_REFRESH_CSRF_HEADER_NAME = None
     JWT_CSRF_METHODS = []
     
+    # Tokens com assinatura já verificada mantidos em cache por processo (0 desativa)
+    JWT_DECODE_CACHE_SIZE = int(os.environ.get('JWT_DECODE_CACHE_SIZE', 10000))
+    
+    # Intervalo de sincronização da lista de tokens revogados em memória
+    TOKEN_REVOCATION_SYNC_SECONDS = int(os.environ.get('TOKEN_REVOCATION_SYNC_SECONDS', 30))
+    
+    # Idempotency-Key: validade das respostas guardadas, tempo até uma
+    # requisição em processamento ser considerada abandonada e limpeza
+    # oportunista de chaves expiradas a cada N requisições com chave
+    IDEMPOTENCY_TTL = timedelta(hours=24)
+    IDEMPOTENCY_LOCK_TIMEOUT = timedelta(seconds=60)
+    IDEMPOTENCY_SWEEP_EVERY = 100
+    
+    # Cache de respostas por usuário (listas, estatísticas e perfil):
+    # limite de memória em bytes (0 desativa) e validade máxima em segundos
+    RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', 0))
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 30))
+    
+    # Tamanho máximo do corpo das requisições, verificado antes da leitura do JSON
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 64 * 1024))
+    
     # Configurações CORS
     CORS_ORIGINS = ["*"]
+    
+    # Arquivos estáticos: cache dos nomes com fingerprint e limite para manter em memória
+    STATIC_MAX_AGE = 365 * 24 * 3600
+    STATIC_INLINE_MAX_BYTES = 256 * 1024
+    
+    # Threads que processam requisições no modo ASGI (src/asgi.py)
+    ASGI_MAX_WORKERS = int(os.environ.get('ASGI_MAX_WORKERS', 32))
+    # Requisições ASGI em andamento além das ASGI_MAX_WORKERS (na fila do
+    # pool ou enviando a resposta); acima disso, 503
+    ASGI_MAX_QUEUE = int(os.environ.get('ASGI_MAX_QUEUE', 128))
 
 class DevelopmentConfig(Config):
     """Configurações para desenvolvimento"""
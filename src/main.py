@@ -3,12 +3,20 @@ import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+from flask import Flask
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager
 
 from src.config import config
 from src.models import db
+from src.models.routing import configure_read_replicas, enable_wal
+from src.models.schema import create_missing_columns, create_missing_indexes
+from src.models.sharding import configure_shards, init_shards
+from src.commands import register_commands
+from src.middleware.jwt_cache import CachedJWTManager
+from src.middleware.static_assets import StaticManifest
+from src.services.backup_service import start_backup_schedule
+from src.services.reminders import start_reminders
+from src.services.revocation_service import RevocationService
 from src.routes.user import user_bp
 from src.routes.task import task_bp
 
@@ -21,9 +29,11 @@ def create_app(config_name=None):
     
     app.config.from_object(config[config_name])
     
+    configure_read_replicas(app)
+    configure_shards(app)
     db.init_app(app)
     CORS(app, origins=app.config['CORS_ORIGINS'])
-    jwt = JWTManager(app)
+    jwt = CachedJWTManager(app)
     
     app.register_blueprint(user_bp, url_prefix='/api')
     app.register_blueprint(task_bp, url_prefix='/api')
@@ -31,26 +41,52 @@ def create_app(config_name=None):
     with app.app_context():
         # Criar diretório do banco se não existir
         db_path = os.path.dirname(app.config['SQLALCHEMY_DATABASE_URI'].replace('sqlite:///', ''))
-        if not os.path.exists(db_path):
+        if db_path and not os.path.exists(db_path):
             os.makedirs(db_path)
         db.create_all()
+        create_missing_columns(db.engine, db.metadata.sorted_tables)
+        create_missing_indexes(db.engine, db.metadata.sorted_tables)
+        init_shards()
+        if app.extensions.get('read_replicas'):
+            enable_wal(db.engine)
+    
+    register_commands(app)
+    
+    # Lembretes de prazo: vários processos podem rodar o agendador, cada
+    # lembrete é reivindicado no banco por um só
+    if app.config['REMINDERS_ENABLED']:
+        start_reminders(app)
+    
+    # Backup periódico: o primeiro processo a criar o snapshot do intervalo faz o backup
+    if app.config['BACKUP_INTERVAL_MINUTES']:
+        start_backup_schedule(app)
+    
+    # Manifesto dos arquivos estáticos (frontend), montado uma vez
+    static_manifest = StaticManifest(
+        app.static_folder,
+        inline_max_bytes=app.config['STATIC_INLINE_MAX_BYTES'],
+        max_age=app.config['STATIC_MAX_AGE']
+    )
+    app.extensions['static_manifest'] = static_manifest
     
     # Rota para servir arquivos estáticos (frontend)
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
     def serve(path):
-        static_folder_path = app.static_folder
-        if static_folder_path is None:
+        if app.static_folder is None:
             return "Static folder não configurada", 404
 
-        if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-            return send_from_directory(static_folder_path, path)
-        else:
-            index_path = os.path.join(static_folder_path, 'index.html')
-            if os.path.exists(index_path):
-                return send_from_directory(static_folder_path, 'index.html')
-            else:
-                return {"message": "API de Gerenciamento de Tarefas", "version": "1.1"}, 200
+        asset, immutable = static_manifest.lookup(path) if path else (None, False)
+        if asset is None:
+            asset, immutable = static_manifest.lookup('index.html')
+        if asset is None:
+            return {"message": "API de Gerenciamento de Tarefas", "version": "1.1"}, 200
+        return static_manifest.response(asset, immutable)
+    
+    # Corpo acima de MAX_CONTENT_LENGTH (sem Content-Length ou lido fora de validate_body)
+    @app.errorhandler(413)
+    def request_too_large(error):
+        return {"error": f"Corpo da requisição excede o limite de {app.config['MAX_CONTENT_LENGTH']} bytes"}, 413
     
     # Erros JWT
     @jwt.expired_token_loader
@@ -65,6 +101,15 @@ def create_app(config_name=None):
     def missing_token_callback(error):
         return {"message": "Token de autorização necessário"}, 401
     
+    # Tokens revogados (logout/troca de senha), verificados em memória
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        return RevocationService.is_revoked(jwt_payload)
+    
+    @jwt.revoked_token_loader
+    def revoked_token_callback(jwt_header, jwt_payload):
+        return {"message": "Token revogado"}, 401
+    
     return app
 
 app = create_app()
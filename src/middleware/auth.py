@@ -16,7 +16,7 @@ def auth_required(f):
     @jwt_required()
     def decorated_function(*args, **kwargs):
         try:
-            current_user_id = get_jwt_identity()
+            current_user_id = get_current_user_id()
             user = AuthService.get_user_by_id(current_user_id)
             
             if not user:
@@ -30,6 +30,19 @@ def auth_required(f):
     
     return decorated_function
 
+def get_current_user_id():
+    """
+    Obter ID do usuário autenticado a partir do token JWT
+    
+    O PyJWT exige que o claim 'sub' seja string, então a identidade é
+    gravada como texto e convertida de volta para inteiro aqui.
+    
+    Returns:
+        int|None: ID do usuário ou None
+    """
+    identity = get_jwt_identity()
+    return int(identity) if identity is not None else None
+
 def get_current_user():
     """
     Obter usuário atual autenticado
@@ -38,41 +51,9 @@ def get_current_user():
         User|None: Usuário autenticado ou None
     """
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = get_current_user_id()
         if current_user_id:
             return AuthService.get_user_by_id(current_user_id)
         return None
     except Exception:
         return None
-
-def validate_request_data(required_fields):
-    """
-    Decorator para validar dados obrigatórios na requisição
-    
-    Args:
-        required_fields (list): Lista de campos obrigatórios
-    """
-    def decorator(f):
-        @wraps(f)
-        def decorated_function(*args, **kwargs):
-            from flask import request
-            
-            data = request.get_json()
-            if not data:
-                return jsonify({'error': 'Dados não fornecidos'}), 400
-            
-            missing_fields = []
-            for field in required_fields:
-                if field not in data or not data[field]:
-                    missing_fields.append(field)
-            
-            if missing_fields:
-                return jsonify({
-                    'error': f'Campos obrigatórios ausentes: {", ".join(missing_fields)}'
-                }), 400
-            
-            return f(*args, **kwargs)
-        
-        return decorated_function
-    return decorator
-
@@ -0,0 +1,50 @@
+"""
+Decorator de cache de respostas por usuário
+"""
+
+from functools import wraps
+
+from flask import current_app, make_response, request
+from src.middleware.auth import get_current_user_id
+from src.services.response_cache import response_cache
+
+CACHE_HEADER = 'X-Cache'
+
+def cached_response(f):
+    """
+    Decorator para rotas de leitura cujas respostas podem ser guardadas
+
+    A chave inclui o usuário, o caminho (com os IDs da URL), os parâmetros
+    da query e a versão dos dados do usuário, lida antes de executar a rota:
+    uma escrita concorrente incrementa a versão e a resposta calculada com
+    dados antigos nunca é servida depois dela. Apenas respostas 200 são
+    guardadas. Deve ser aplicado abaixo de @jwt_required().
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        cache = response_cache()
+        if cache is None:
+            return f(*args, **kwargs)
+
+        user_id = get_current_user_id()
+        key = (
+            user_id,
+            request.path,
+            tuple(sorted(request.args.items(multi=True))),
+            cache.version(user_id)
+        )
+
+        cached = cache.get(key)
+        if cached is not None:
+            body, status, mimetype = cached
+            response = current_app.response_class(body, status=status, mimetype=mimetype)
+            response.headers[CACHE_HEADER] = 'HIT'
+            return response
+
+        response = make_response(f(*args, **kwargs))
+        if response.status_code == 200 and not response.is_streamed:
+            cache.put(key, (response.get_data(), response.status_code, response.mimetype))
+        response.headers[CACHE_HEADER] = 'MISS'
+        return response
+
+    return decorated_function
@@ -0,0 +1,95 @@
+"""
+Suporte ao cabeçalho Idempotency-Key nas rotas de escrita
+"""
+
+import hashlib
+import itertools
+from functools import wraps
+
+from flask import current_app, jsonify, make_response, request
+from src.middleware.auth import get_current_user_id
+from src.middleware.versioning import IF_MATCH_HEADER
+from src.services.idempotency_service import IdempotencyService
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+# Contador de requisições para a limpeza oportunista de chaves expiradas
+_requests = itertools.count(1)
+
+def request_fingerprint():
+    """Hash do método, caminho, If-Match e corpo da requisição atual"""
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(b'\0')
+    digest.update(request.path.encode())
+    digest.update(b'\0')
+    # A mesma escrita com outra versão esperada é outra requisição
+    digest.update(request.headers.get(IF_MATCH_HEADER, '').encode())
+    digest.update(b'\0')
+    digest.update(request.get_data(cache=True))
+    return digest.hexdigest()
+
+def idempotent(f):
+    """
+    Decorator para rotas de escrita que aceitam Idempotency-Key
+
+    A primeira requisição com uma chave executa a rota e guarda a resposta;
+    repetições com a mesma chave recebem a resposta guardada sem executar a
+    rota de novo. Deve ser aplicado abaixo de @jwt_required().
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            return f(*args, **kwargs)
+
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return jsonify({
+                'error': f'{IDEMPOTENCY_HEADER} deve ter entre 1 e {MAX_KEY_LENGTH} caracteres'
+            }), 400
+
+        user_id = get_current_user_id()
+        state, record = IdempotencyService.begin(user_id, key, request_fingerprint())
+
+        if state == IdempotencyService.REPLAY:
+            response = current_app.response_class(
+                record.response_body,
+                status=record.status_code,
+                mimetype='application/json'
+            )
+            response.headers[REPLAYED_HEADER] = 'true'
+            if record.response_etag:
+                response.headers['ETag'] = record.response_etag
+            return response
+        if state == IdempotencyService.MISMATCH:
+            return jsonify({
+                'error': f'{IDEMPOTENCY_HEADER} já utilizada em outra requisição'
+            }), 422
+        if state == IdempotencyService.IN_PROGRESS:
+            return jsonify({
+                'error': f'Requisição com esta {IDEMPOTENCY_HEADER} ainda em processamento'
+            }), 409
+
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            IdempotencyService.release(user_id, key)
+            raise
+
+        # Erros internos não são guardados: a próxima tentativa executa de novo
+        if response.status_code >= 500:
+            IdempotencyService.release(user_id, key)
+        else:
+            IdempotencyService.complete(
+                user_id, key, response.status_code, response.get_data(), response.headers.get('ETag')
+            )
+
+        sweep_every = current_app.config['IDEMPOTENCY_SWEEP_EVERY']
+        if sweep_every and next(_requests) % sweep_every == 0:
+            IdempotencyService.sweep_expired(max_batches=1)
+
+        return response
+
+    return decorated_function
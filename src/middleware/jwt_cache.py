@@ -0,0 +1,99 @@
+"""
+Cache de tokens JWT já verificados
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from flask_jwt_extended import JWTManager
+
+class TokenCache:
+    """
+    Cache LRU limitado de claims de tokens com assinatura já verificada
+
+    A chave é o SHA-256 do token bruto, então só um token idêntico (mesma
+    assinatura) reaproveita o resultado. Cada entrada vale até o 'exp' do
+    token; depois disso o token passa de novo pela decodificação completa,
+    que o rejeita como expirado.
+    """
+
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(encoded_token):
+        return hashlib.sha256(encoded_token.encode('utf-8')).digest()
+
+    def get(self, key):
+        """Claims do token em cache, ou None se ausente ou expirado"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                claims, expires_at = entry
+                if expires_at is None or expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return claims
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, claims, expires_at):
+        with self._lock:
+            self._entries[key] = (claims, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        """Métricas do cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0
+            }
+
+class CachedJWTManager(JWTManager):
+    """
+    JWTManager que verifica a assinatura de cada token uma única vez
+
+    Clientes que repetem o mesmo token a cada requisição pagam a
+    decodificação e a verificação do HMAC apenas na primeira; as seguintes
+    usam as claims do cache (JWT_DECODE_CACHE_SIZE, 0 desativa). A
+    verificação de revogação continua sendo feita a cada requisição.
+    """
+
+    decode_cache = None
+
+    def init_app(self, app, add_context_processor=False):
+        super().init_app(app, add_context_processor)
+        max_size = app.config.get('JWT_DECODE_CACHE_SIZE', 0)
+        self.decode_cache = TokenCache(max_size) if max_size else None
+        app.extensions['jwt_decode_cache'] = self.decode_cache
+
+    # Método privado do flask-jwt-extended: versão fixada em requirements.txt e
+    # assinatura conferida em tests/test_jwt_cache.py
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        cache = self.decode_cache
+        if cache is None or csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        key = cache.key(encoded_token)
+        claims = cache.get(key)
+        if claims is None:
+            claims = super()._decode_jwt_from_config(encoded_token)
+            cache.put(key, claims, claims.get('exp'))
+        return dict(claims)
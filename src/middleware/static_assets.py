@@ -0,0 +1,118 @@
+"""
+Servidor de arquivos estáticos com manifesto, fingerprint e cache HTTP
+"""
+
+import hashlib
+import mimetypes
+import os
+import re
+
+from flask import Response, request, send_file
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age={max_age}, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+# Referências absolutas a arquivos locais em atributos href/src
+REFERENCE_PATTERN = re.compile(r'(href|src)=(["\'])/([^"\'?#]+)\2')
+
+class StaticAsset:
+    """Arquivo estático conhecido pelo manifesto"""
+
+    __slots__ = ('path', 'fingerprinted_path', 'file_path', 'data', 'mimetype', 'etag')
+
+    def __init__(self, path, fingerprinted_path, file_path, data, mimetype, etag):
+        self.path = path
+        self.fingerprinted_path = fingerprinted_path
+        self.file_path = file_path
+        self.data = data
+        self.mimetype = mimetype
+        self.etag = etag
+
+class StaticManifest:
+    """
+    Manifesto dos arquivos estáticos montado uma única vez na inicialização
+
+    Cada arquivo recebe um nome com fingerprint do conteúdo
+    (favicon.ico -> favicon.3f2a9c1b7d4e.ico), servido com cache imutável
+    de longa duração. O nome original continua acessível, mas é revalidado
+    via ETag. Arquivos pequenos ficam em memória; caminhos desconhecidos
+    são resolvidos pelo manifesto, sem consultar o sistema de arquivos.
+    """
+
+    def __init__(self, static_folder, inline_max_bytes=256 * 1024, max_age=31536000):
+        self.static_folder = static_folder
+        self.inline_max_bytes = inline_max_bytes
+        self.max_age = max_age
+        self.assets = {}
+        self.fingerprinted = {}
+        if static_folder and os.path.isdir(static_folder):
+            self._build()
+
+    def _build(self):
+        for root, dirs, files in os.walk(self.static_folder):
+            for filename in files:
+                file_path = os.path.join(root, filename)
+                path = os.path.relpath(file_path, self.static_folder).replace(os.sep, '/')
+                with open(file_path, 'rb') as f:
+                    content = f.read()
+                digest = hashlib.sha256(content).hexdigest()[:12]
+                base, ext = os.path.splitext(path)
+                asset = StaticAsset(
+                    path=path,
+                    fingerprinted_path=f'{base}.{digest}{ext}',
+                    file_path=file_path,
+                    data=content if len(content) <= self.inline_max_bytes else None,
+                    mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+                    etag=digest
+                )
+                self.assets[path] = asset
+                self.fingerprinted[asset.fingerprinted_path] = asset
+
+        # Apontar as referências dos HTMLs para os nomes com fingerprint
+        for asset in self.assets.values():
+            if asset.mimetype == 'text/html' and asset.data is not None:
+                asset.data = self._rewrite_references(asset.data)
+                asset.etag = hashlib.sha256(asset.data).hexdigest()[:12]
+
+    def _rewrite_references(self, html):
+        def replace(match):
+            attribute, quote, path = match.groups()
+            target = self.assets.get(path)
+            if target is None or target.mimetype == 'text/html':
+                return match.group(0)
+            return f'{attribute}={quote}/{target.fingerprinted_path}{quote}'
+
+        return REFERENCE_PATTERN.sub(replace, html.decode('utf-8')).encode('utf-8')
+
+    def url_for(self, path):
+        """URL com fingerprint de um arquivo estático (ou a original se desconhecido)"""
+        asset = self.assets.get(path)
+        return f'/{asset.fingerprinted_path}' if asset else f'/{path}'
+
+    def lookup(self, path):
+        """
+        Resolver um caminho requisitado
+
+        Returns:
+            tuple: (asset: StaticAsset|None, immutable: bool)
+        """
+        asset = self.fingerprinted.get(path)
+        if asset is not None:
+            return asset, True
+        return self.assets.get(path), False
+
+    def response(self, asset, immutable):
+        """Resposta condicional (ETag/If-None-Match) com cabeçalhos de cache"""
+        cache_control = IMMUTABLE_CACHE_CONTROL.format(max_age=self.max_age) \
+            if immutable else REVALIDATE_CACHE_CONTROL
+
+        if asset.data is None:
+            response = send_file(asset.file_path, mimetype=asset.mimetype,
+                                 etag=asset.etag, conditional=True)
+        else:
+            response = Response(asset.data, mimetype=asset.mimetype)
+            response.set_etag(asset.etag)
+            response.make_conditional(request)
+
+        response.headers['Cache-Control'] = cache_control
+        return response
@@ -0,0 +1,213 @@
+"""
+Validação declarativa dos corpos JSON das requisições
+"""
+
+from functools import wraps
+
+from flask import jsonify, request
+
+# Campo ausente no corpo (diferente de null)
+MISSING = object()
+
+class Field:
+    """
+    Regra de um campo do corpo da requisição
+
+    Args:
+        label (str): Nome do campo nas mensagens de erro
+        required (bool): O campo deve estar presente (e não ser null)
+        blank (bool): Aceitar texto vazio depois do strip (as demais regras continuam valendo)
+        strip (bool): Remover espaços das pontas
+        min_length (int): Tamanho mínimo
+        max_length (int): Tamanho máximo
+        choices (list): Valores aceitos
+        check (callable): Validação extra, recebe o valor e devolve a mensagem de erro ou None
+        default: Valor usado quando o campo está ausente
+    """
+
+    def __init__(self, label, required=False, blank=False, strip=True, min_length=None,
+                 max_length=None, choices=None, check=None, default=MISSING):
+        self.label = label
+        self.required = required
+        self.blank = blank
+        self.strip = strip
+        self.min_length = min_length
+        self.max_length = max_length
+        self.choices = choices
+        self.check = check
+        self.default = default
+
+    def compile(self):
+        """
+        Montar a função de validação do campo
+
+        Apenas as verificações configuradas entram na função, que devolve
+        (valor normalizado, mensagem de erro ou None).
+        """
+        label = self.label
+        checks = []
+        if not self.blank:
+            checks.append(lambda value: f"{label} é obrigatório" if not value else None)
+        if self.min_length is not None:
+            min_length = self.min_length
+            checks.append(lambda value: f"{label} deve ter pelo menos {min_length} caracteres"
+                          if len(value) < min_length else None)
+        if self.max_length is not None:
+            max_length = self.max_length
+            checks.append(lambda value: f"{label} deve ter no máximo {max_length} caracteres"
+                          if len(value) > max_length else None)
+        if self.choices is not None:
+            choices = frozenset(self.choices)
+            message = f"{label} deve ser um dos seguintes: {', '.join(self.choices)}"
+            checks.append(lambda value: message if value not in choices else None)
+        if self.check is not None:
+            checks.append(self.check)
+
+        required, strip, default = self.required, self.strip, self.default
+
+        def validate(value):
+            if value is MISSING or value is None:
+                if required:
+                    return value, f"{label} é obrigatório"
+                return (default if value is MISSING else None), None
+            if not isinstance(value, str):
+                return value, f"{label} deve ser texto"
+            if strip:
+                value = value.strip()
+            for check in checks:
+                error = check(value)
+                if error:
+                    return value, error
+            return value, None
+
+        return validate
+
+class ListField(Field):
+    """
+    Campo com uma lista de textos, cada um validado pela regra item
+
+    Args:
+        label (str): Nome do campo nas mensagens de erro
+        item (Field): Regra de cada elemento
+        max_items (int): Quantidade máxima de elementos
+        required (bool): O campo deve estar presente (e não ser null)
+    """
+
+    def __init__(self, label, item, max_items=None, required=False):
+        super().__init__(label, required=required)
+        self.item = item
+        self.max_items = max_items
+
+    def compile(self):
+        label, required, max_items = self.label, self.required, self.max_items
+        validate_item = self.item.compile()
+
+        def validate(value):
+            if value is MISSING or value is None:
+                if required:
+                    return value, f"{label} é obrigatório"
+                return value, None
+            if not isinstance(value, list):
+                return value, f"{label} deve ser uma lista"
+            if max_items is not None and len(value) > max_items:
+                return value, f"{label} deve ter no máximo {max_items} itens"
+            items = []
+            for item in value:
+                item, error = validate_item(item)
+                if error:
+                    return value, error
+                items.append(item)
+            return items, None
+
+        return validate
+
+class IntegerField(Field):
+    """
+    Campo com um número inteiro
+
+    Args:
+        label (str): Nome do campo nas mensagens de erro
+        minimum (int): Menor valor aceito
+        required (bool): O campo deve estar presente (e não ser null)
+    """
+
+    def __init__(self, label, minimum=None, required=False):
+        super().__init__(label, required=required)
+        self.minimum = minimum
+
+    def compile(self):
+        label, required, minimum = self.label, self.required, self.minimum
+
+        def validate(value):
+            if value is MISSING or value is None:
+                if required:
+                    return value, f"{label} é obrigatório"
+                return value, None
+            if isinstance(value, bool) or not isinstance(value, int):
+                return value, f"{label} deve ser um número inteiro"
+            if minimum is not None and value < minimum:
+                return value, f"{label} deve ser no mínimo {minimum}"
+            return value, None
+
+        return validate
+
+class Schema:
+    """
+    Conjunto de campos de um corpo JSON, compilado uma vez na criação
+
+    Campos não declarados são descartados. validate percorre o corpo uma
+    única vez e devolve os erros de todos os campos.
+    """
+
+    def __init__(self, body_required=True, **fields):
+        self.body_required = body_required
+        self.fields = fields
+        self._validators = tuple((name, field.compile()) for name, field in fields.items())
+
+    def validate(self, data):
+        """
+        Validar um corpo já decodificado
+
+        Returns:
+            tuple: (data: dict, errors: dict) com os valores normalizados e as mensagens por campo
+        """
+        cleaned = {}
+        errors = {}
+        for name, validate in self._validators:
+            value, error = validate(data.get(name, MISSING))
+            if error:
+                errors[name] = error
+            elif value is not MISSING:
+                cleaned[name] = value
+        return cleaned, errors
+
+def validate_body(schema):
+    """
+    Decorator que valida o corpo JSON da requisição com um Schema
+
+    Corpos maiores que MAX_CONTENT_LENGTH são recusados pelo Content-Length,
+    antes de qualquer leitura. Os valores validados chegam à rota no
+    argumento data. Deve ser aplicado abaixo de @jwt_required() e acima de
+    @idempotent, para que corpos inválidos não ocupem chaves de idempotência.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            limit = request.max_content_length
+            if limit is not None and request.content_length and request.content_length > limit:
+                return jsonify({'error': f'Corpo da requisição excede o limite de {limit} bytes'}), 413
+
+            data = request.get_json(silent=True)
+            if data is None and not schema.body_required and not request.content_length:
+                data = {}
+            if not isinstance(data, dict):
+                return jsonify({'error': 'Dados não fornecidos'}), 400
+
+            data, errors = schema.validate(data)
+            if errors:
+                return jsonify({'error': next(iter(errors.values())), 'errors': errors}), 400
+
+            return f(*args, data=data, **kwargs)
+
+        return decorated_function
+    return decorator
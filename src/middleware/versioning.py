@@ -0,0 +1,37 @@
+"""
+Escritas condicionais pela versão da linha (ETag / If-Match)
+"""
+
+from flask import request
+
+IF_MATCH_HEADER = 'If-Match'
+
+def etag(version):
+    """ETag de uma linha versionada (o número da versão entre aspas)"""
+    return f'"{version}"'
+
+def if_match_version():
+    """
+    Versão exigida pelo header If-Match da requisição
+
+    Aceita a ETag devolvida pela API, com ou sem aspas e com ou sem o
+    prefixo W/.
+
+    Returns:
+        int|None: Versão esperada; None sem o header ou com '*'
+
+    Raises:
+        ValueError: Valor que não é a ETag de uma versão
+    """
+    value = request.headers.get(IF_MATCH_HEADER)
+    if value is None or value.strip() == '*':
+        return None
+
+    value = value.strip()
+    if value.startswith('W/'):
+        value = value[2:]
+    if len(value) > 1 and value[0] == value[-1] == '"':
+        value = value[1:-1]
+    if not value.isdigit():
+        raise ValueError(f'{IF_MATCH_HEADER} deve conter a ETag (versão) do recurso')
+    return int(value)
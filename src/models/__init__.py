@@ -1,4 +1,4 @@
-from .user import db, User, Task
-
-__all__ = ['db', 'User', 'Task']
+from .user import db, User, Task, TaskArchive, TaskDailyStat, TaskClosure, TaskOccurrence, TaskTag, TagCount, UserDirectory, IdBlock, IdempotencyRecord, RevokedToken, UserRevocation
 
+__all__ = ['db', 'User', 'Task', 'TaskArchive', 'TaskDailyStat', 'TaskClosure', 'TaskOccurrence', 'TaskTag', 'TagCount',
+           'UserDirectory', 'IdBlock', 'IdempotencyRecord', 'RevokedToken', 'UserRevocation']
@@ -0,0 +1,117 @@
+"""
+Roteamento de leitura/escrita entre o banco primário e réplicas de leitura
+"""
+
+import itertools
+from functools import wraps
+
+from flask import current_app
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.sql.util import find_tables
+
+class RoutingSession(Session):
+    """
+    Sessão que envia operações somente leitura para as réplicas
+
+    Consultas feitas dentro de uma operação marcada com @read_only usam uma
+    das engines de leitura configuradas (sempre a mesma durante a sessão).
+    Escritas, flushes e qualquer leitura feita depois de uma escrita na
+    mesma requisição continuam no primário (read-your-writes).
+    
+    Com particionamento ativo, tabelas particionadas vão para o shard
+    escolhido por use_user_shard (as réplicas atendem apenas o shard 0).
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get('shard') and is_sharded(mapper, clause):
+            return current_app.extensions['shards']['engines'][self.info['shard']]
+        if bind is None and self._can_use_replica():
+            engine = self._read_engine()
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _can_use_replica(self):
+        if not self.info.get('read_only') or self.info.get('wrote'):
+            return False
+        return not (self._flushing or self.new or self.dirty or self.deleted)
+
+    def _read_engine(self):
+        engine = self.info.get('read_engine')
+        if engine is None:
+            replicas = current_app.extensions.get('read_replicas')
+            if not replicas:
+                return None
+            engines = replicas['engines']
+            engine = engines[next(replicas['counter']) % len(engines)]
+            self.info['read_engine'] = engine
+        return engine
+
+def is_sharded(mapper=None, clause=None):
+    """Indica se a operação atinge uma tabela particionada por usuário"""
+    if mapper is not None:
+        return inspect(mapper).local_table.info.get('sharded', False)
+    if clause is not None:
+        return any(table.info.get('sharded') for table in find_tables(clause, include_crud=True))
+    return False
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_session_wrote(session, flush_context):
+    """Fixar a sessão no primário depois da primeira escrita"""
+    session.info['wrote'] = True
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _mark_session_executed_dml(orm_execute_state):
+    """Fixar a sessão no primário também com INSERT/UPDATE/DELETE via session.execute (sem flush)"""
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info['wrote'] = True
+
+def read_only(func):
+    """
+    Decorator para operações de serviço que apenas leem dados
+
+    As consultas da operação podem ser atendidas por uma réplica de leitura.
+    """
+    @wraps(func)
+    def decorated_function(*args, **kwargs):
+        session = current_app.extensions['sqlalchemy'].session()
+        previous = session.info.get('read_only', False)
+        session.info['read_only'] = True
+        try:
+            return func(*args, **kwargs)
+        finally:
+            session.info['read_only'] = previous
+
+    return decorated_function
+
+def configure_read_replicas(app):
+    """
+    Criar as engines de leitura da aplicação
+
+    Usa SQLALCHEMY_READ_REPLICAS (lista de URIs) ou, para SQLite em arquivo,
+    SQLALCHEMY_READ_POOL_SIZE conexões somente leitura ao mesmo arquivo WAL
+    do primário. As engines ficam fora dos binds do Flask-SQLAlchemy para que
+    create_all/drop_all nunca as alcancem.
+    """
+    replicas = list(app.config.get('SQLALCHEMY_READ_REPLICAS') or [])
+    pool_size = app.config.get('SQLALCHEMY_READ_POOL_SIZE', 0)
+    primary_uri = app.config['SQLALCHEMY_DATABASE_URI']
+
+    if not replicas and pool_size and primary_uri.startswith('sqlite:///') \
+            and ':memory:' not in primary_uri:
+        path = primary_uri.replace('sqlite:///', '', 1)
+        replicas = [f'sqlite:///file:{path}?mode=ro&uri=true'] * pool_size
+
+    if replicas:
+        options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+        app.extensions['read_replicas'] = {
+            'engines': [create_engine(uri, **options) for uri in replicas],
+            'counter': itertools.count()
+        }
+
+def enable_wal(engine):
+    """Ativar o modo WAL para que leitores não bloqueiem o escritor"""
+    if engine.dialect.name == 'sqlite' and engine.url.database not in (None, '', ':memory:'):
+        with engine.connect() as conn:
+            conn.execute(text('PRAGMA journal_mode=WAL'))
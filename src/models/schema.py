@@ -0,0 +1,36 @@
+"""
+Manutenção do esquema em bancos já existentes
+"""
+
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateColumn
+
+def create_missing_indexes(engine, tables):
+    """
+    Criar os índices declarados nos modelos que ainda não existem no banco
+
+    create_all só cria tabelas novas; índices adicionados depois a tabelas
+    existentes são criados aqui.
+    """
+    for table in tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+def create_missing_columns(engine, tables):
+    """
+    Adicionar as colunas declaradas nos modelos que ainda não existem no banco
+
+    Apenas colunas opcionais (nullable) ou com valor padrão no banco
+    (server_default) são adicionadas, com ALTER TABLE ADD COLUMN; as linhas
+    existentes ficam com NULL ou com o valor padrão.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing and (column.nullable or column.server_default is not None):
+                    definition = CreateColumn(column).compile(dialect=engine.dialect)
+                    conn.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {definition}')
@@ -0,0 +1,256 @@
+"""
+Particionamento de usuários entre vários bancos SQLite (shards)
+
+Cada usuário vive inteiro (linha em users e todas as suas tarefas) em um
+único shard. O shard 0 é o banco primário, que também guarda as tabelas
+globais: o diretório usuário -> shard (user_directory), consultado no
+login por email, e os blocos de IDs globais (id_blocks). Novos usuários
+são posicionados por hashing consistente do user_id; o rebalanceamento
+move os usuários cujo shard no diretório difere do indicado pelo anel.
+"""
+
+import bisect
+import hashlib
+import os
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import and_, create_engine, delete, func, insert, select, update
+
+from .schema import create_missing_columns, create_missing_indexes
+from .user import db, User, Task, TaskArchive, UserDirectory, IdBlock
+
+# IDs reservados por processo a cada ida ao banco primário
+ID_BLOCK_SIZE = 1000
+
+class ShardMovingError(Exception):
+    """Usuário está sendo movido entre shards e não pode ser acessado agora"""
+
+class HashRing:
+    """Anel de hashing consistente com nós virtuais"""
+
+    def __init__(self, shard_ids, replicas=100):
+        self.shard_ids = list(shard_ids)
+        self._points = []
+        for shard in self.shard_ids:
+            for replica in range(replicas):
+                self._points.append((self._hash(f'shard-{shard}-{replica}'), shard))
+        self._points.sort()
+        self._keys = [point for point, shard in self._points]
+
+    @staticmethod
+    def _hash(value):
+        return int.from_bytes(hashlib.md5(value.encode('utf-8')).digest()[:8], 'big')
+
+    def shard_for(self, user_id):
+        """Shard de destino de um usuário"""
+        index = bisect.bisect(self._keys, self._hash(str(user_id))) % len(self._points)
+        return self._points[index][1]
+
+def configure_shards(app):
+    """
+    Criar as engines dos shards adicionais
+
+    Usa SHARD_DATABASE_URIS (URIs dos shards 1..N-1) ou, para SQLite em
+    arquivo, SHARD_COUNT - 1 arquivos ao lado do banco primário
+    (app.db -> app.shard1.db, app.shard2.db, ...). Com um único shard o
+    particionamento fica desligado e nada muda no acesso ao banco.
+    """
+    uris = list(app.config.get('SHARD_DATABASE_URIS') or [])
+    count = app.config.get('SHARD_COUNT', 1)
+    primary_uri = app.config['SQLALCHEMY_DATABASE_URI']
+
+    if not uris and count > 1 and primary_uri.startswith('sqlite:///') \
+            and ':memory:' not in primary_uri:
+        base, ext = os.path.splitext(primary_uri)
+        uris = [f'{base}.shard{index}{ext or ".db"}' for index in range(1, count)]
+
+    if uris:
+        options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+        engines = {index: create_engine(uri, **options) for index, uri in enumerate(uris, start=1)}
+        app.extensions['shards'] = {
+            'engines': engines,
+            'ring': HashRing([0, *engines]),
+            'id_blocks': {},
+            'id_lock': threading.Lock(),
+        }
+
+def init_shards():
+    """
+    Preparar os shards (chamar dentro do app context, após create_all)
+
+    Cria as tabelas particionadas em cada shard, registra no diretório os
+    usuários que já existiam no primário e garante que as sequências
+    globais de IDs de tarefas e de usuários comecem depois do maior ID
+    existente.
+    """
+    shards = current_app.extensions.get('shards')
+    if not shards:
+        return
+
+    tables = sharded_tables()
+    for engine in shards['engines'].values():
+        db.metadata.create_all(engine, tables=tables)
+        create_missing_columns(engine, tables)
+        create_missing_indexes(engine, tables)
+
+    with db.engine.begin() as conn:
+        conn.execute(
+            insert(UserDirectory.__table__).from_select(
+                ['user_id', 'email', 'shard', 'locked'],
+                select(User.id, User.email, 0, False).where(
+                    User.id.not_in(select(UserDirectory.user_id))
+                )
+            )
+        )
+        # Linhas inseridas fora do alocador (cargas em massa, banco antes do
+        # particionamento) não podem colidir
+        max_ids = {
+            'tasks': 0,
+            'users': conn.execute(select(func.max(UserDirectory.user_id))).scalar() or 0,
+        }
+        for index in range(len(shards['engines']) + 1):
+            with shard_engine(index).connect() as shard_conn:
+                for name, model in (('tasks', Task), ('tasks', TaskArchive), ('users', User)):
+                    max_id = shard_conn.execute(select(func.max(model.id))).scalar() or 0
+                    max_ids[name] = max(max_ids[name], max_id)
+        for name, max_id in max_ids.items():
+            current = conn.execute(select(IdBlock.next_value).where(IdBlock.name == name)).scalar()
+            if current is None:
+                conn.execute(insert(IdBlock.__table__).values(name=name, next_value=max_id + 1))
+            elif current <= max_id:
+                conn.execute(
+                    update(IdBlock.__table__).where(IdBlock.name == name).values(next_value=max_id + 1)
+                )
+
+def sharding_enabled():
+    """Indica se o particionamento está ativo na aplicação atual"""
+    return 'shards' in current_app.extensions
+
+def shard_ring():
+    """Anel de hashing consistente da aplicação atual"""
+    return current_app.extensions['shards']['ring']
+
+def shard_engine(shard):
+    """Engine de um shard (o shard 0 é o banco primário)"""
+    if not shard:
+        return db.engine
+    return current_app.extensions['shards']['engines'][shard]
+
+def shard_count():
+    """Quantidade de shards configurados"""
+    shards = current_app.extensions.get('shards')
+    return len(shards['engines']) + 1 if shards else 1
+
+def sharded_tables():
+    """Tabelas particionadas por usuário, em ordem de dependência"""
+    return [table for table in db.metadata.sorted_tables if table.info.get('sharded')]
+
+def owner_column(table):
+    """Coluna com o ID do usuário dono das linhas de uma tabela particionada"""
+    return table.c.user_id if 'user_id' in table.c else table.c.id
+
+def move_lock_cutoff():
+    """Instante a partir do qual uma trava de migração ainda vale (SHARD_MOVE_LOCK_SECONDS)"""
+    return datetime.now() - timedelta(seconds=current_app.config['SHARD_MOVE_LOCK_SECONDS'])
+
+def move_in_progress(entry):
+    """
+    Indica se a entrada do diretório está travada por uma migração em andamento
+
+    Uma migração interrompida (processo encerrado no meio da cópia) deixa a
+    trava para trás; depois de SHARD_MOVE_LOCK_SECONDS ela deixa de valer.
+    A migração só remove as linhas de origem com o lock de escrita do
+    usuário no shard de origem, então uma trava vencida não expõe escritas.
+    """
+    return bool(entry.locked) and entry.locked_at is not None and entry.locked_at >= move_lock_cutoff()
+
+def moving_users():
+    """Condição SQL equivalente a move_in_progress, para consultas ao diretório"""
+    return and_(UserDirectory.locked.is_(True), UserDirectory.locked_at >= move_lock_cutoff())
+
+def use_user_shard(user_id):
+    """
+    Direcionar a sessão atual para o shard do usuário
+
+    Usuários fora do diretório (inexistentes) caem no shard 0, onde as
+    consultas simplesmente não encontram nada.
+
+    Returns:
+        int: Shard do usuário
+    """
+    if not sharding_enabled():
+        return 0
+
+    entry = db.session.get(UserDirectory, user_id) if user_id is not None else None
+    if entry is not None and move_in_progress(entry):
+        raise ShardMovingError('Usuário em migração entre shards, tente novamente')
+
+    shard = entry.shard if entry is not None else 0
+    db.session.info['shard'] = shard
+    return shard
+
+def check_user_shard(user_id, shard):
+    """
+    Conferir no diretório, sem o cache da sessão, que o usuário segue no shard
+
+    Para escritas que não encontraram o usuário no shard já com o lock de
+    escrita: se ele foi movido depois de use_user_shard, a escrita é
+    recusada em vez de ir para o shard antigo.
+    """
+    with db.engine.connect() as conn:
+        entry = conn.execute(
+            select(UserDirectory.shard, UserDirectory.locked, UserDirectory.locked_at)
+            .where(UserDirectory.user_id == user_id)
+        ).first()
+    if entry is not None and (move_in_progress(entry) or entry.shard != shard):
+        raise ShardMovingError('Usuário em migração entre shards, tente novamente')
+
+def reserve_user_id(email):
+    """
+    Registrar um novo usuário no diretório e escolher seu shard
+
+    A entrada do diretório é confirmada antes da criação do usuário no
+    shard; em caso de falha, release_user_id desfaz a reserva. O ID sai da
+    sequência global 'users' e nunca é reaproveitado, nem depois de
+    release_user_id ou da exclusão da conta.
+
+    Returns:
+        int: ID global do novo usuário
+    """
+    user_id = allocate_id('users')
+    entry = UserDirectory(user_id=user_id, email=email, shard=shard_ring().shard_for(user_id))
+    db.session.add(entry)
+    db.session.commit()
+    db.session.info['shard'] = entry.shard
+    return entry.user_id
+
+def release_user_id(user_id):
+    """Desfazer a reserva de um usuário que não chegou a ser criado"""
+    with db.engine.begin() as conn:
+        conn.execute(delete(UserDirectory.__table__).where(UserDirectory.user_id == user_id))
+
+def allocate_id(name):
+    """
+    Reservar um ID global único entre todos os shards
+
+    Cada processo reserva blocos de ID_BLOCK_SIZE IDs no banco primário,
+    então apenas uma escrita no primário acontece a cada bloco.
+    """
+    shards = current_app.extensions['shards']
+    with shards['id_lock']:
+        block = shards['id_blocks'].get(name)
+        if block is None or block[0] >= block[1]:
+            with db.engine.begin() as conn:
+                limit = conn.execute(
+                    update(IdBlock.__table__)
+                    .where(IdBlock.name == name)
+                    .values(next_value=IdBlock.next_value + ID_BLOCK_SIZE)
+                    .returning(IdBlock.next_value)
+                ).scalar_one()
+            block = [limit - ID_BLOCK_SIZE, limit]
+            shards['id_blocks'][name] = block
+        value = block[0]
+        block[0] += 1
+        return value
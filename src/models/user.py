@@ -1,12 +1,15 @@
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+from .routing import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(db.Model):
     """Modelo de usuário com autenticação"""
     __tablename__ = 'users'
+    # AUTOINCREMENT: IDs de contas excluídas não voltam a ser usados
+    __table_args__ = {'info': {'sharded': True}, 'sqlite_autoincrement': True}
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -14,9 +17,13 @@ class User(db.Model):
     password_hash = db.Column(db.String(255), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.now)
     updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+    # Versão da linha: incrementada a cada UPDATE, que só é aplicado se a versão não mudou
+    version = db.Column(db.Integer, nullable=False, server_default='1')
     
     # Relacionamento com tarefas
     tasks = db.relationship('Task', backref='user', lazy=True, cascade='all, delete-orphan')
+    
+    __mapper_args__ = {'version_id_col': version}
 
     def __repr__(self):
         return f'<User {self.email}>'
@@ -36,12 +43,38 @@ class User(db.Model):
             'name': self.name,
             'email': self.email,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'version': self.version
         }
 
 class Task(db.Model):
     """Modelo de tarefa"""
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # Um índice por ordenação da listagem, com e sem filtro de status
+        # (os formatos aceitos estão em TaskService.parse_list_shape)
+        db.Index('ix_tasks_user_id_created_at', 'user_id', 'created_at'),
+        db.Index('ix_tasks_user_id_updated_at', 'user_id', 'updated_at'),
+        db.Index('ix_tasks_user_id_name', 'user_id', 'name'),
+        db.Index('ix_tasks_user_id_status_created_at', 'user_id', 'status', 'created_at'),
+        db.Index('ix_tasks_user_id_status_updated_at', 'user_id', 'status', 'updated_at'),
+        db.Index('ix_tasks_user_id_status_name', 'user_id', 'status', 'name'),
+        # Localizar tarefas concluídas antigas para o arquivamento (updated_at
+        # para as concluídas antes de completed_at existir)
+        db.Index('ix_tasks_status_completed_at', 'status', 'completed_at'),
+        db.Index('ix_tasks_status_updated_at', 'status', 'updated_at'),
+        # Subtarefas diretas de uma tarefa
+        db.Index('ix_tasks_parent_id', 'parent_id'),
+        # Ordem manual (sort=position); chaves únicas por usuário
+        db.Index('ix_tasks_user_id_position', 'user_id', 'position', unique=True),
+        # Tarefas recorrentes do usuário, expandidas na listagem
+        db.Index('ix_tasks_user_id_recurrence', 'user_id', 'recurrence'),
+        # Próximos lembretes: só tarefas com prazo ainda não lembradas
+        db.Index('ix_tasks_status_due_at_pending', 'status', 'due_at',
+                 sqlite_where=db.text('reminded_at IS NULL AND due_at IS NOT NULL')),
+        # IDs de tarefas arquivadas nunca são reutilizados
+        {'info': {'sharded': True}, 'sqlite_autoincrement': True},
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
@@ -49,9 +82,29 @@ class Task(db.Model):
     status = db.Column(db.String(20), nullable=False, default='pendente')
     created_at = db.Column(db.DateTime, default=datetime.now)
     updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+    # Momento em que a tarefa passou a 'concluida' (None enquanto pendente)
+    completed_at = db.Column(db.DateTime)
+    # Tarefa mãe (None para tarefas de primeiro nível); a hierarquia completa fica em task_closure
+    parent_id = db.Column(db.Integer)
+    # Chave fracionária da ordem manual (src/services/fractional_index.py)
+    position = db.Column(db.String(255))
+    # Regra de recorrência ('diaria' ou 'semanal'); as ocorrências saem da regra
+    # na leitura e só as alteradas ficam em task_occurrences
+    recurrence = db.Column(db.String(20))
+    # Prazo da tarefa e momento em que o lembrete foi disparado (src/services/reminders.py)
+    due_at = db.Column(db.DateTime)
+    reminded_at = db.Column(db.DateTime)
+    # Versão da linha (controle de concorrência otimista, ver User.version);
+    # UPDATEs em conjunto incrementam a coluna explicitamente
+    version = db.Column(db.Integer, nullable=False, server_default='1')
     
     # Chave estrangeira para o usuário
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    
+    __mapper_args__ = {'version_id_col': version}
+    
+    # Etiquetas (tabela task_tags), preenchidas pelo TaskService nas escritas
+    tags = None
 
     def __repr__(self):
         return f'<Task {self.name}>'
@@ -65,6 +118,198 @@ class Task(db.Model):
             'status': self.status,
             'user_id': self.user_id,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'parent_id': self.parent_id,
+            'recurrence': self.recurrence,
+            'due_at': self.due_at.isoformat() if self.due_at else None,
+            'version': self.version,
+            'tags': list(self.tags or [])
         }
 
+
+class TaskArchive(db.Model):
+    """Tarefa concluída antiga, movida da tabela quente pelo arquivamento"""
+    __tablename__ = 'tasks_archive'
+    __table_args__ = (
+        db.Index('ix_tasks_archive_user_id_created_at', 'user_id', 'created_at'),
+        {'info': {'sharded': True}},
+    )
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text)
+    status = db.Column(db.String(20), nullable=False)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    completed_at = db.Column(db.DateTime)
+    parent_id = db.Column(db.Integer)
+    recurrence = db.Column(db.String(20))
+    due_at = db.Column(db.DateTime)
+    version = db.Column(db.Integer, nullable=False, server_default='1')
+    user_id = db.Column(db.Integer, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    def __repr__(self):
+        return f'<TaskArchive {self.name}>'
+
+class TaskDailyStat(db.Model):
+    """Tarefas concluídas por usuário e dia, atualizadas junto com as escritas de tarefas"""
+    __tablename__ = 'task_daily_stats'
+    __table_args__ = {'info': {'sharded': True}}
+    
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    day = db.Column(db.Date, primary_key=True)
+    completed = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<TaskDailyStat {self.user_id} {self.day}={self.completed}>'
+
+class TaskClosure(db.Model):
+    """
+    Par ancestral -> descendente da hierarquia de subtarefas
+
+    Cada tarefa tem uma linha para cada ancestral (depth 1 = tarefa mãe), então
+    subárvores e ancestrais saem de uma busca no índice, sem recursão.
+    """
+    __tablename__ = 'task_closure'
+    __table_args__ = (
+        # Ancestrais de uma tarefa, da mãe para a raiz
+        db.Index('ix_task_closure_descendant_id_depth', 'descendant_id', 'depth'),
+        {'info': {'sharded': True}},
+    )
+    
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    ancestor_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    depth = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    descendant_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+
+    def __repr__(self):
+        return f'<TaskClosure {self.ancestor_id} -> {self.descendant_id} ({self.depth})>'
+
+class TaskOccurrence(db.Model):
+    """
+    Ocorrência de uma tarefa recorrente que o usuário concluiu ou alterou
+
+    As demais ocorrências não são gravadas: saem da regra da tarefa, apenas
+    para o período consultado.
+    """
+    __tablename__ = 'task_occurrences'
+    __table_args__ = (
+        # Ocorrências de uma tarefa excluída
+        db.Index('ix_task_occurrences_task_id', 'task_id'),
+        {'info': {'sharded': True}},
+    )
+    
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    day = db.Column(db.Date, primary_key=True)
+    task_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    # Nome e descrição próprios (None = os da tarefa recorrente)
+    name = db.Column(db.String(200))
+    description = db.Column(db.Text)
+    status = db.Column(db.String(20), nullable=False, default='pendente')
+    completed_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+
+    def __repr__(self):
+        return f'<TaskOccurrence {self.task_id} {self.day}>'
+
+class TaskTag(db.Model):
+    """Etiqueta de uma tarefa (índice invertido: usuário, etiqueta -> tarefas)"""
+    __tablename__ = 'task_tags'
+    __table_args__ = (
+        # Etiquetas de uma página de tarefas
+        db.Index('ix_task_tags_task_id_tag', 'task_id', 'tag'),
+        {'info': {'sharded': True}},
+    )
+    
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    tag = db.Column(db.String(50), primary_key=True)
+    task_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+
+    def __repr__(self):
+        return f'<TaskTag {self.tag} -> {self.task_id}>'
+
+class TagCount(db.Model):
+    """Quantidade de tarefas por etiqueta, atualizada junto com as escritas"""
+    __tablename__ = 'tag_counts'
+    __table_args__ = (
+        db.Index('ix_tag_counts_user_id_count', 'user_id', 'count', 'tag'),
+        {'info': {'sharded': True}},
+    )
+    
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    tag = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<TagCount {self.tag}={self.count}>'
+
+class UserDirectory(db.Model):
+    """Diretório global usuário -> shard (fica sempre no banco primário)"""
+    __tablename__ = 'user_directory'
+    
+    user_id = db.Column(db.Integer, primary_key=True)
+    email = db.Column(db.String(120), unique=True, nullable=False, index=True)
+    shard = db.Column(db.Integer, nullable=False, default=0)
+    # Usuário sendo movido entre shards pelo rebalanceamento; a trava vale
+    # por SHARD_MOVE_LOCK_SECONDS a partir de locked_at (ver move_in_progress)
+    locked = db.Column(db.Boolean, nullable=False, default=False)
+    locked_at = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f'<UserDirectory {self.user_id} -> shard {self.shard}>'
+
+class IdBlock(db.Model):
+    """Próximo ID livre de uma sequência global, reservada em blocos"""
+    __tablename__ = 'id_blocks'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    next_value = db.Column(db.Integer, nullable=False)
+
+    def __repr__(self):
+        return f'<IdBlock {self.name}={self.next_value}>'
+
+class IdempotencyRecord(db.Model):
+    """Resposta armazenada de uma requisição com Idempotency-Key"""
+    __tablename__ = 'idempotency_keys'
+    
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    key = db.Column(db.String(255), primary_key=True)
+    # Hash do método, caminho, If-Match e corpo da requisição original
+    request_hash = db.Column(db.String(64), nullable=False)
+    # Nulo enquanto a requisição original ainda está em processamento
+    status_code = db.Column(db.Integer)
+    response_body = db.Column(db.LargeBinary)
+    # ETag da resposta original (escritas condicionais), devolvida na repetição
+    response_etag = db.Column(db.String(100))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<IdempotencyRecord {self.user_id}:{self.key}>'
+
+class RevokedToken(db.Model):
+    """Token JWT revogado antes de expirar (logout)"""
+    __tablename__ = 'revoked_tokens'
+    
+    jti = db.Column(db.String(36), primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    # Depois da expiração do token a revogação pode ser descartada
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, nullable=False, default=datetime.now, index=True)
+
+    def __repr__(self):
+        return f'<RevokedToken {self.jti}>'
+
+class UserRevocation(db.Model):
+    """Revogação de todos os tokens de um usuário emitidos antes de um instante"""
+    __tablename__ = 'user_revocations'
+    
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    # Timestamp Unix: tokens com 'iat' anterior são rejeitados
+    revoked_before = db.Column(db.Integer, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.now, index=True)
+
+    def __repr__(self):
+        return f'<UserRevocation {self.user_id} < {self.revoked_before}>'
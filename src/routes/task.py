@@ -2,34 +2,93 @@
 Rotas para gerenciamento de tarefas
 """
 
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, current_app, request, jsonify, stream_with_context
+from flask_jwt_extended import jwt_required
+from src.middleware.auth import get_current_user_id
+from src.middleware.caching import cached_response
+from src.middleware.idempotency import idempotent
+from src.middleware.validation import Field, IntegerField, ListField, Schema, validate_body
+from src.middleware.versioning import etag, if_match_version
+from src.services.recurrence_service import RecurrenceService
+from src.services.stats_service import StatsService
+from src.services.subtask_service import SubtaskService
+from src.services.tag_service import TagService
 from src.services.task_service import TaskService
 from src.services.auth_service import AuthService
 
 # Criar blueprint para rotas de tarefas
 task_bp = Blueprint('tasks', __name__)
 
+# Corpos aceitos pelas rotas de escrita
+TAGS_FIELD = ListField(
+    'Tags',
+    Field('Tag', max_length=TagService.MAX_TAG_LENGTH),
+    max_items=TagService.MAX_TAGS_PER_TASK
+)
+TASK_CREATE_SCHEMA = Schema(
+    name=Field('Nome da tarefa', required=True, max_length=200),
+    description=Field('Descrição', blank=True, max_length=1000),
+    status=Field('Status', choices=TaskService.VALID_STATUSES, default='pendente'),
+    tags=TAGS_FIELD,
+    parent_id=IntegerField('Tarefa mãe', minimum=1),
+    recurrence=Field('Recorrência', choices=list(RecurrenceService.RULES)),
+    due_at=Field('Prazo', max_length=40)
+)
+TASK_UPDATE_SCHEMA = Schema(
+    name=Field('Nome da tarefa', max_length=200),
+    description=Field('Descrição', blank=True, max_length=1000),
+    status=Field('Status', choices=TaskService.VALID_STATUSES),
+    tags=TAGS_FIELD,
+    due_at=Field('Prazo', blank=True, max_length=40)
+)
+TASK_OCCURRENCE_SCHEMA = Schema(
+    name=Field('Nome da tarefa', max_length=200),
+    description=Field('Descrição', blank=True, max_length=1000),
+    status=Field('Status', choices=TaskService.VALID_STATUSES)
+)
+TASK_MOVE_SCHEMA = Schema(
+    parent_id=IntegerField('Tarefa mãe', minimum=1)
+)
+TASK_POSITION_SCHEMA = Schema(
+    after_id=IntegerField('Tarefa anterior', minimum=1)
+)
+
+def include_archived_arg():
+    """Valor do parâmetro ?include_archived=true"""
+    return request.args.get('include_archived', 'false').lower() in ('true', '1', 'yes')
+
+def list_options():
+    """Ordenação, filtros e ocorrências da listagem (?sort=...&created_after=...&tag=...&occurrences_from=...)"""
+    return {
+        'include_archived': include_archived_arg(),
+        'sort': request.args.get('sort'),
+        'date_filters': {
+            name: request.args[name] for name in TaskService.DATE_FILTERS if name in request.args
+        },
+        'tags': request.args.getlist('tag'),
+        'tag_mode': request.args.get('tag_mode', 'all'),
+        'occurrences_from': request.args.get('occurrences_from'),
+        'occurrences_to': request.args.get('occurrences_to')
+    }
+
 @task_bp.route('/tasks', methods=['POST'])
 @jwt_required()
-def create_task():
+@validate_body(TASK_CREATE_SCHEMA)
+@idempotent
+def create_task(data):
     """Criar nova tarefa"""
     try:
-        current_user_id = get_jwt_identity()
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({'error': 'Dados não fornecidos'}), 400
-        
-        name = data.get('name')
-        description = data.get('description')
-        status = data.get('status', 'pendente')
+        current_user_id = get_current_user_id()
         
         success, message, task = TaskService.create_task(
             user_id=current_user_id,
-            name=name,
-            description=description,
-            status=status
+            name=data['name'],
+            description=data.get('description'),
+            status=data['status'],
+            tags=data.get('tags'),
+            parent_id=data.get('parent_id'),
+            recurrence=data.get('recurrence'),
+            due_at=data.get('due_at')
         )
         
         if success:
@@ -45,10 +104,11 @@ def create_task():
 
 @task_bp.route('/tasks', methods=['GET'])
 @jwt_required()
+@cached_response
 def get_tasks():
     """Listar tarefas do usuário com filtros opcionais"""
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = get_current_user_id()
         
         # Parâmetros de query
         status = request.args.get('status')
@@ -59,7 +119,8 @@ def get_tasks():
             user_id=current_user_id,
             status=status,
             page=page,
-            per_page=per_page
+            per_page=per_page,
+            **list_options()
         )
         
         if success:
@@ -75,12 +136,34 @@ def get_tasks():
     except Exception as e:
         return jsonify({'error': f'Erro interno: {str(e)}'}), 500
 
+@task_bp.route('/tasks/export', methods=['GET'])
+@jwt_required()
+def export_tasks():
+    """Exportar todas as tarefas do usuário (JSON gerado em streaming)"""
+    try:
+        current_user_id = get_current_user_id()
+        tasks = TaskService.iter_user_tasks(current_user_id, include_archived=include_archived_arg())
+        
+        def generate():
+            yield '{"tasks": ['
+            for index, task in enumerate(tasks):
+                yield (',' if index else '') + current_app.json.dumps(task)
+            yield ']}'
+        
+        return current_app.response_class(
+            stream_with_context(generate()),
+            mimetype='application/json'
+        )
+        
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
 @task_bp.route('/tasks/<int:task_id>', methods=['GET'])
 @jwt_required()
 def get_task(task_id):
     """Obter tarefa específica"""
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = get_current_user_id()
         
         success, message, task = TaskService.get_task_by_id(task_id, current_user_id)
         
@@ -88,7 +171,7 @@ def get_task(task_id):
             return jsonify({
                 'message': message,
                 'task': task.to_dict()
-            }), 200
+            }), 200, {'ETag': etag(task.version)}
         else:
             return jsonify({'error': message}), 404
             
@@ -97,32 +180,36 @@ def get_task(task_id):
 
 @task_bp.route('/tasks/<int:task_id>', methods=['PUT'])
 @jwt_required()
-def update_task(task_id):
-    """Atualizar tarefa"""
+@validate_body(TASK_UPDATE_SCHEMA)
+@idempotent
+def update_task(task_id, data):
+    """Atualizar tarefa (com If-Match, apenas se a versão ainda for a informada)"""
     try:
-        current_user_id = get_jwt_identity()
-        data = request.get_json()
+        current_user_id = get_current_user_id()
         
-        if not data:
-            return jsonify({'error': 'Dados não fornecidos'}), 400
-        
-        name = data.get('name')
-        description = data.get('description')
-        status = data.get('status')
+        try:
+            expected_version = if_match_version()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         success, message, task = TaskService.update_task(
             task_id=task_id,
             user_id=current_user_id,
-            name=name,
-            description=description,
-            status=status
+            name=data.get('name'),
+            description=data.get('description'),
+            status=data.get('status'),
+            tags=data.get('tags'),
+            due_at=data.get('due_at'),
+            expected_version=expected_version
         )
         
         if success:
             return jsonify({
                 'message': message,
                 'task': task.to_dict()
-            }), 200
+            }), 200, {'ETag': etag(task.version)}
+        elif message == TaskService.VERSION_CONFLICT:
+            return jsonify({'error': message}), 409
         else:
             return jsonify({'error': message}), 400
             
@@ -131,10 +218,11 @@ def update_task(task_id):
 
 @task_bp.route('/tasks/<int:task_id>', methods=['DELETE'])
 @jwt_required()
+@idempotent
 def delete_task(task_id):
     """Excluir tarefa"""
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = get_current_user_id()
         
         success, message = TaskService.delete_task(task_id, current_user_id)
         
@@ -146,12 +234,170 @@ def delete_task(task_id):
     except Exception as e:
         return jsonify({'error': f'Erro interno: {str(e)}'}), 500
 
+@task_bp.route('/tasks/<int:task_id>/move', methods=['POST'])
+@jwt_required()
+@validate_body(TASK_MOVE_SCHEMA)
+@idempotent
+def move_task(task_id, data):
+    """Mover tarefa com as subtarefas para outra tarefa mãe (parent_id null = primeiro nível)"""
+    try:
+        current_user_id = get_current_user_id()
+        
+        success, message, task = TaskService.move_task(task_id, current_user_id, data.get('parent_id'))
+        
+        if success:
+            return jsonify({
+                'message': message,
+                'task': task.to_dict()
+            }), 200
+        else:
+            return jsonify({'error': message}), 400
+            
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+@task_bp.route('/tasks/<int:task_id>/position', methods=['PUT'])
+@jwt_required()
+@validate_body(TASK_POSITION_SCHEMA)
+@idempotent
+def reorder_task(task_id, data):
+    """Mudar a tarefa de lugar na ordem manual (after_id null = primeira posição)"""
+    try:
+        current_user_id = get_current_user_id()
+        
+        success, message, task = TaskService.reorder_task(task_id, current_user_id, data.get('after_id'))
+        
+        if success:
+            return jsonify({
+                'message': message,
+                'task': task.to_dict()
+            }), 200
+        else:
+            return jsonify({'error': message}), 400
+            
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+@task_bp.route('/tasks/<int:task_id>/occurrences/<day>', methods=['PUT'])
+@jwt_required()
+@validate_body(TASK_OCCURRENCE_SCHEMA)
+@idempotent
+def update_occurrence(task_id, day, data):
+    """Concluir ou alterar a ocorrência de uma tarefa recorrente em um dia (AAAA-MM-DD)"""
+    try:
+        current_user_id = get_current_user_id()
+        
+        success, message, occurrence = TaskService.update_occurrence(
+            task_id,
+            current_user_id,
+            day,
+            name=data.get('name'),
+            description=data.get('description'),
+            status=data.get('status')
+        )
+        
+        if success:
+            return jsonify({
+                'message': message,
+                'occurrence': occurrence
+            }), 200
+        else:
+            return jsonify({'error': message}), 400
+            
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+@task_bp.route('/tasks/<int:task_id>/subtree', methods=['GET'])
+@jwt_required()
+@cached_response
+def get_subtree(task_id):
+    """Obter tarefa com todas as subtarefas, em qualquer nível"""
+    try:
+        current_user_id = get_current_user_id()
+        
+        success, message, data = SubtaskService.get_subtree(task_id, current_user_id)
+        
+        if success:
+            return jsonify({
+                'message': message,
+                **data
+            }), 200
+        else:
+            return jsonify({'error': message}), 404
+            
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+@task_bp.route('/tasks/<int:task_id>/ancestors', methods=['GET'])
+@jwt_required()
+@cached_response
+def get_ancestors(task_id):
+    """Obter os ancestrais da tarefa, da mãe até o primeiro nível"""
+    try:
+        current_user_id = get_current_user_id()
+        
+        success, message, tasks = SubtaskService.get_ancestors(task_id, current_user_id)
+        
+        if success:
+            return jsonify({
+                'message': message,
+                'tasks': tasks
+            }), 200
+        else:
+            return jsonify({'error': message}), 404
+            
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+@task_bp.route('/tasks/<int:task_id>/subtree/stats', methods=['GET'])
+@jwt_required()
+@cached_response
+def get_subtree_statistics(task_id):
+    """Obter a conclusão da tarefa somada à de todas as subtarefas"""
+    try:
+        current_user_id = get_current_user_id()
+        
+        success, message, stats = SubtaskService.get_subtree_statistics(task_id, current_user_id)
+        
+        if success:
+            return jsonify({
+                'message': message,
+                'statistics': stats
+            }), 200
+        else:
+            return jsonify({'error': message}), 404
+            
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+@task_bp.route('/tasks/<int:task_id>/subtree/complete', methods=['POST'])
+@jwt_required()
+@idempotent
+def complete_subtree(task_id):
+    """Concluir a tarefa e todas as subtarefas pendentes"""
+    try:
+        current_user_id = get_current_user_id()
+        
+        success, message, data = TaskService.complete_subtree(task_id, current_user_id)
+        
+        if success:
+            return jsonify({
+                'message': message,
+                **data
+            }), 200
+        else:
+            return jsonify({'error': message}), 404
+            
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
 @task_bp.route('/tasks/stats', methods=['GET'])
 @jwt_required()
+@cached_response
 def get_task_statistics():
     """Obter estatísticas das tarefas do usuário"""
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = get_current_user_id()
         
         success, message, stats = TaskService.get_task_statistics(current_user_id)
         
@@ -166,13 +412,62 @@ def get_task_statistics():
     except Exception as e:
         return jsonify({'error': f'Erro interno: {str(e)}'}), 500
 
+@task_bp.route('/tasks/stats/timeseries', methods=['GET'])
+@jwt_required()
+@cached_response
+def get_completion_timeseries():
+    """Tarefas concluídas por dia ou semana (?from=AAAA-MM-DD&to=AAAA-MM-DD&bucket=day|week)"""
+    try:
+        current_user_id = get_current_user_id()
+        
+        success, message, data = StatsService.get_completion_timeseries(
+            current_user_id,
+            start=request.args.get('from'),
+            end=request.args.get('to'),
+            bucket=request.args.get('bucket', 'day')
+        )
+        
+        if success:
+            return jsonify({
+                'message': message,
+                **data
+            }), 200
+        else:
+            return jsonify({'error': message}), 400
+            
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+@task_bp.route('/tags', methods=['GET'])
+@jwt_required()
+@cached_response
+def get_tag_cloud():
+    """Etiquetas do usuário com a quantidade de tarefas de cada uma (?limit=N)"""
+    try:
+        current_user_id = get_current_user_id()
+        limit = min(int(request.args.get('limit', 100)), 500)
+        
+        success, message, tags = TagService.get_tag_cloud(current_user_id, limit=limit)
+        
+        if success:
+            return jsonify({
+                'message': message,
+                'tags': tags
+            }), 200
+        else:
+            return jsonify({'error': message}), 500
+            
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
 # Rotas para filtros específicos (conveniência)
 @task_bp.route('/tasks/pending', methods=['GET'])
 @jwt_required()
+@cached_response
 def get_pending_tasks():
     """Listar apenas tarefas pendentes"""
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = get_current_user_id()
         page = int(request.args.get('page', 1))
         per_page = min(int(request.args.get('per_page', 20)), 100)
         
@@ -180,7 +475,8 @@ def get_pending_tasks():
             user_id=current_user_id,
             status='pendente',
             page=page,
-            per_page=per_page
+            per_page=per_page,
+            **list_options()
         )
         
         if success:
@@ -198,10 +494,11 @@ def get_pending_tasks():
 
 @task_bp.route('/tasks/completed', methods=['GET'])
 @jwt_required()
+@cached_response
 def get_completed_tasks():
     """Listar apenas tarefas concluídas"""
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = get_current_user_id()
         page = int(request.args.get('page', 1))
         per_page = min(int(request.args.get('per_page', 20)), 100)
         
@@ -209,7 +506,8 @@ def get_completed_tasks():
             user_id=current_user_id,
             status='concluida',
             page=page,
-            per_page=per_page
+            per_page=per_page,
+            **list_options()
         )
         
         if success:
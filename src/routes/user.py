@@ -2,27 +2,49 @@
 Rotas de autenticação e usuário
 """
 
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_token
+from flask import Blueprint, current_app, jsonify
+from flask_jwt_extended import jwt_required, create_access_token, create_refresh_token, decode_token, get_jwt
 from src.services.auth_service import AuthService
+from src.services.response_cache import response_cache
+from src.services.revocation_service import RevocationService
+from src.middleware.auth import get_current_user_id
+from src.middleware.caching import cached_response
+from src.middleware.validation import Field, Schema, validate_body
+from src.middleware.versioning import etag, if_match_version
 
 # Criar blueprint para rotas de usuário/autenticação
 user_bp = Blueprint('auth', __name__)
 
+def email_format(value):
+    """Mensagem de erro para emails mal formados"""
+    return None if AuthService.validate_email(value) else "Formato de email inválido"
+
+# Corpos aceitos pelas rotas
+REGISTER_SCHEMA = Schema(
+    name=Field('Nome', required=True, max_length=100),
+    email=Field('Email', required=True, max_length=120, check=email_format),
+    password=Field('Senha', required=True, blank=True, strip=False, min_length=6)
+)
+LOGIN_SCHEMA = Schema(
+    email=Field('Email', required=True),
+    password=Field('Senha', required=True, strip=False)
+)
+LOGOUT_SCHEMA = Schema(
+    body_required=False,
+    refresh_token=Field('Refresh token', blank=True)
+)
+PROFILE_SCHEMA = Schema(
+    name=Field('Nome', blank=True, max_length=100),
+    email=Field('Email', max_length=120, check=email_format),
+    password=Field('Senha', blank=True, strip=False, min_length=6)
+)
+
 @user_bp.route('/register', methods=['POST'])
-def register():
+@validate_body(REGISTER_SCHEMA)
+def register(data):
     """Registrar novo usuário"""
     try:
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({'error': 'Dados não fornecidos'}), 400
-        
-        name = data.get('name')
-        email = data.get('email')
-        password = data.get('password')
-        
-        success, message, user = AuthService.register_user(name, email, password)
+        success, message, user = AuthService.register_user(data['name'], data['email'], data['password'])
         
         if success:
             return jsonify({
@@ -36,18 +58,11 @@ def register():
         return jsonify({'error': f'Erro interno: {str(e)}'}), 500
 
 @user_bp.route('/login', methods=['POST'])
-def login():
+@validate_body(LOGIN_SCHEMA)
+def login(data):
     """Fazer login do usuário"""
     try:
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({'error': 'Dados não fornecidos'}), 400
-        
-        email = data.get('email')
-        password = data.get('password')
-        
-        success, message, tokens = AuthService.authenticate_user(email, password)
+        success, message, tokens = AuthService.authenticate_user(data['email'], data['password'])
         
         if success:
             return jsonify({
@@ -67,13 +82,13 @@ def login():
 def refresh():
     """Renovar token de acesso"""
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = get_current_user_id()
         user = AuthService.get_user_by_id(current_user_id)
         
         if not user:
             return jsonify({'error': 'Usuário não encontrado'}), 404
         
-        new_token = create_access_token(identity=current_user_id)
+        new_token = create_access_token(identity=str(current_user_id))
         
         return jsonify({
             'message': 'Token renovado com sucesso',
@@ -83,12 +98,37 @@ def refresh():
     except Exception as e:
         return jsonify({'error': f'Erro interno: {str(e)}'}), 500
 
+@user_bp.route('/logout', methods=['POST'])
+@jwt_required()
+@validate_body(LOGOUT_SCHEMA)
+def logout(data):
+    """Revogar o token de acesso atual (e o refresh token, se enviado)"""
+    try:
+        claims = get_jwt()
+        RevocationService.revoke_token(claims)
+        
+        refresh_token = data.get('refresh_token')
+        if refresh_token:
+            try:
+                refresh_claims = decode_token(refresh_token)
+            except Exception:
+                return jsonify({'error': 'Refresh token inválido'}), 400
+            if refresh_claims.get('sub') != claims['sub']:
+                return jsonify({'error': 'Refresh token inválido'}), 400
+            RevocationService.revoke_token(refresh_claims)
+        
+        return jsonify({'message': 'Logout realizado com sucesso'}), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
 @user_bp.route('/profile', methods=['GET'])
 @jwt_required()
+@cached_response
 def get_profile():
     """Obter perfil do usuário autenticado"""
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = get_current_user_id()
         user = AuthService.get_user_by_id(current_user_id)
         
         if not user:
@@ -103,56 +143,66 @@ def get_profile():
 
 @user_bp.route('/profile', methods=['PUT'])
 @jwt_required()
-def update_profile():
-    """Atualizar perfil do usuário autenticado"""
+@validate_body(PROFILE_SCHEMA)
+def update_profile(data):
+    """Atualizar perfil do usuário autenticado (com If-Match, apenas se a versão ainda for a informada)"""
     try:
-        current_user_id = get_jwt_identity()
-        user = AuthService.get_user_by_id(current_user_id)
+        current_user_id = get_current_user_id()
         
-        if not user:
-            return jsonify({'error': 'Usuário não encontrado'}), 404
+        try:
+            expected_version = if_match_version()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        data = request.get_json()
-        if not data:
-            return jsonify({'error': 'Dados não fornecidos'}), 400
-        
-        # Atualizar nome se fornecido
-        if 'name' in data and data['name'].strip():
-            user.name = data['name'].strip()
-        
-        # Atualizar email se fornecido
-        if 'email' in data:
-            new_email = data['email'].lower().strip()
-            if new_email != user.email:
-                if not AuthService.validate_email(new_email):
-                    return jsonify({'error': 'Formato de email inválido'}), 400
-                
-                # Verificar se novo email já existe
-                from src.models import User
-                existing_user = User.query.filter_by(email=new_email).first()
-                if existing_user:
-                    return jsonify({'error': 'Email já está em uso'}), 400
-                
-                user.email = new_email
-        
-        # Atualizar senha se fornecida
-        if 'password' in data:
-            is_valid, message = AuthService.validate_password(data['password'])
-            if not is_valid:
-                return jsonify({'error': message}), 400
-            user.set_password(data['password'])
-        
-        from src.models import db
-        db.session.commit()
+        success, message, user = AuthService.update_user(
+            current_user_id,
+            name=data.get('name'),
+            email=data.get('email'),
+            password=data.get('password'),
+            expected_version=expected_version
+        )
         
-        return jsonify({
-            'message': 'Perfil atualizado com sucesso',
-            'user': user.to_dict()
-        }), 200
+        if success:
+            response = {
+                'message': message,
+                'user': user.to_dict()
+            }
+            # A troca de senha revoga os tokens anteriores: devolver novos
+            if data.get('password') is not None:
+                response['access_token'] = create_access_token(identity=str(current_user_id))
+                response['refresh_token'] = create_refresh_token(identity=str(current_user_id))
+            return jsonify(response), 200, {'ETag': etag(user.version)}
+        elif message == AuthService.USER_NOT_FOUND:
+            return jsonify({'error': message}), 404
+        elif message == AuthService.VERSION_CONFLICT:
+            return jsonify({'error': message}), 409
+        else:
+            return jsonify({'error': message}), 400
+        
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+@user_bp.route('/profile', methods=['DELETE'])
+@jwt_required()
+def delete_profile():
+    """Excluir a conta do usuário autenticado e todas as suas tarefas"""
+    try:
+        current_user_id = get_current_user_id()
+        
+        success, message, data = AuthService.delete_user(current_user_id)
+        
+        if success:
+            # Contas grandes são excluídas em segundo plano
+            return jsonify({
+                'message': message,
+                'tasks': data['tasks']
+            }), 202 if data['scheduled'] else 200
+        elif message == AuthService.USER_NOT_FOUND:
+            return jsonify({'error': message}), 404
+        else:
+            return jsonify({'error': message}), 500
         
     except Exception as e:
-        from src.models import db
-        db.session.rollback()
         return jsonify({'error': f'Erro interno: {str(e)}'}), 500
 
 # Rota de teste para verificar se a API está funcionando
@@ -165,3 +215,14 @@ def health_check():
         'version': '1.1'
     }), 200
 
+
+@user_bp.route('/metrics', methods=['GET'])
+@jwt_required()
+def metrics():
+    """Métricas internas do processo (caches), apenas para usuários autenticados"""
+    decode_cache = current_app.extensions.get('jwt_decode_cache')
+    cache = response_cache()
+    return jsonify({
+        'jwt_decode_cache': decode_cache.stats() if decode_cache else None,
+        'response_cache': cache.stats() if cache else None
+    }), 200
@@ -1,5 +1,9 @@
 from .auth_service import AuthService
 from .task_service import TaskService
+from .shard_service import ShardService
+from .idempotency_service import IdempotencyService
+from .archive_service import ArchiveService
+from .revocation_service import RevocationService
 
-__all__ = ['AuthService', 'TaskService']
-
+__all__ = ['AuthService', 'TaskService', 'ShardService', 'IdempotencyService', 'ArchiveService',
+           'RevocationService']
@@ -0,0 +1,106 @@
+"""
+Serviço de arquivamento de tarefas concluídas antigas
+"""
+
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import and_, delete, insert, literal, or_, select
+from src.models import db, Task, TaskArchive, TaskClosure, UserDirectory
+from src.models.sharding import moving_users, shard_count, shard_engine, sharding_enabled
+from src.services.response_cache import bump_user_version
+
+# Colunas copiadas da tabela quente para o arquivo
+ARCHIVED_COLUMNS = ['id', 'name', 'description', 'status', 'created_at', 'updated_at', 'completed_at', 'parent_id', 'recurrence',
+                    'due_at', 'version', 'user_id']
+
+class ArchiveService:
+    """Serviço responsável por mover tarefas concluídas para tasks_archive"""
+
+    @staticmethod
+    def archive_completed_tasks(older_than_days=None, batch_size=None):
+        """
+        Mover tarefas concluídas há mais de N dias para a tabela de arquivo
+
+        Cada lote (cópia + exclusão) é uma transação curta em cada shard, para
+        não segurar o lock de escrita. A idade é contada de completed_at, então
+        editar uma tarefa concluída não adia o arquivamento. Usuários sendo movidos entre shards
+        ficam para a próxima execução. Tarefas com subtarefas ativas também
+        ficam: uma subárvore é arquivada a partir das folhas. Tarefas
+        recorrentes nunca são arquivadas, para manter as ocorrências gravadas.
+
+        Args:
+            older_than_days (int): Idade mínima desde a conclusão (padrão: ARCHIVE_AFTER_DAYS)
+            batch_size (int): Tarefas por transação (padrão: ARCHIVE_BATCH_SIZE)
+
+        Returns:
+            tuple: (success: bool, message: str, stats: dict|None)
+        """
+        if older_than_days is None:
+            older_than_days = current_app.config['ARCHIVE_AFTER_DAYS']
+        batch_size = batch_size or current_app.config['ARCHIVE_BATCH_SIZE']
+        cutoff = datetime.now() - timedelta(days=older_than_days)
+
+        tasks = Task.__table__
+        archive = TaskArchive.__table__
+        closure = TaskClosure.__table__
+        stats = {'archived': 0, 'batches': 0}
+
+        try:
+            for shard in range(shard_count()):
+                engine = shard_engine(shard)
+                while True:
+                    with engine.begin() as conn:
+                        query = select(tasks.c.id, tasks.c.user_id).where(
+                            # A idade conta da conclusão; updated_at só para tarefas
+                            # concluídas antes de completed_at existir (NULL)
+                            or_(
+                                and_(tasks.c.status == 'concluida', tasks.c.completed_at < cutoff),
+                                and_(tasks.c.status == 'concluida', tasks.c.completed_at.is_(None),
+                                     tasks.c.updated_at < cutoff)
+                            ),
+                            tasks.c.recurrence.is_(None),
+                            ~select(closure.c.descendant_id).where(
+                                closure.c.user_id == tasks.c.user_id,
+                                closure.c.ancestor_id == tasks.c.id
+                            ).exists()
+                        )
+                        locked = ArchiveService._locked_users()
+                        if locked:
+                            query = query.where(tasks.c.user_id.not_in(locked))
+                        rows = conn.execute(query.limit(batch_size)).all()
+                        if not rows:
+                            break
+                        task_ids = [row.id for row in rows]
+
+                        conn.execute(
+                            insert(archive).from_select(
+                                [*ARCHIVED_COLUMNS, 'archived_at'],
+                                select(*(tasks.c[name] for name in ARCHIVED_COLUMNS), literal(datetime.now()))
+                                .where(tasks.c.id.in_(task_ids))
+                            )
+                        )
+                        conn.execute(delete(tasks).where(tasks.c.id.in_(task_ids)))
+                        conn.execute(delete(closure).where(closure.c.descendant_id.in_(task_ids)))
+
+                    for user_id in {row.user_id for row in rows}:
+                        bump_user_version(user_id)
+                    stats['archived'] += len(task_ids)
+                    stats['batches'] += 1
+                    if len(task_ids) < batch_size:
+                        break
+
+            return True, "Arquivamento concluído", stats
+
+        except Exception as e:
+            return False, f"Erro interno: {str(e)}", stats
+
+    @staticmethod
+    def _locked_users():
+        """Usuários bloqueados no diretório (em migração entre shards)"""
+        if not sharding_enabled():
+            return []
+        with db.engine.connect() as conn:
+            return conn.execute(
+                select(UserDirectory.user_id).where(moving_users())
+            ).scalars().all()
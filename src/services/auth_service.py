@@ -2,13 +2,27 @@
 Serviço de autenticação para a API de Tarefas
 """
 
+from flask import current_app
 from flask_jwt_extended import create_access_token, create_refresh_token
-from src.models import db, User
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm.exc import StaleDataError
+from src.models import (
+    db, User, Task, TaskArchive, TaskDailyStat, TaskOccurrence, TaskTag, TagCount, UserDirectory, IdempotencyRecord
+)
+from src.models.routing import read_only
+from src.models.sharding import sharding_enabled, use_user_shard, reserve_user_id, release_user_id
+from src.services.background import submit_job
+from src.services.response_cache import bump_user_version
+from src.services.revocation_service import RevocationService
+from src.services.task_service import TaskService
 import re
 
 class AuthService:
     """Serviço responsável pela autenticação de usuários"""
     
+    USER_NOT_FOUND = "Usuário não encontrado"
+    VERSION_CONFLICT = "O perfil foi alterado por outra requisição"
+    
     @staticmethod
     def validate_email(email):
         """Valida formato do email"""
@@ -22,6 +36,32 @@ class AuthService:
             return False, "Senha deve ter pelo menos 6 caracteres"
         return True, "Senha válida"
     
+    @staticmethod
+    def email_in_use(email):
+        """Verifica se o email já pertence a algum usuário (em qualquer shard)"""
+        if sharding_enabled():
+            return UserDirectory.query.filter_by(email=email).first() is not None
+        return User.query.filter_by(email=email).first() is not None
+    
+    @staticmethod
+    def find_user_by_email(email):
+        """
+        Busca usuário pelo email, resolvendo o shard pelo diretório
+        
+        Args:
+            email (str): Email já normalizado
+            
+        Returns:
+            User|None: Usuário encontrado ou None
+        """
+        if sharding_enabled():
+            entry = UserDirectory.query.filter_by(email=email).first()
+            if entry is None:
+                return None
+            use_user_shard(entry.user_id)
+            return db.session.get(User, entry.user_id)
+        return User.query.filter_by(email=email).first()
+    
     @staticmethod
     def register_user(name, email, password):
         """
@@ -35,6 +75,7 @@ class AuthService:
         Returns:
             tuple: (success: bool, message: str, user: User|None)
         """
+        reserved_id = None
         try:
             # Validar dados de entrada
             if not name or not name.strip():
@@ -51,8 +92,7 @@ class AuthService:
                 return False, password_message, None
             
             # Verificar se email já existe
-            existing_user = User.query.filter_by(email=email.lower().strip()).first()
-            if existing_user:
+            if AuthService.email_in_use(email.lower().strip()):
                 return False, "Email já cadastrado", None
             
             # Criar novo usuário
@@ -62,6 +102,10 @@ class AuthService:
             )
             user.set_password(password)
             
+            # Com particionamento, o ID vem do diretório global e define o shard
+            if sharding_enabled():
+                reserved_id = user.id = reserve_user_id(user.email)
+            
             db.session.add(user)
             db.session.commit()
             
@@ -69,6 +113,8 @@ class AuthService:
             
         except Exception as e:
             db.session.rollback()
+            if reserved_id is not None:
+                release_user_id(reserved_id)
             return False, f"Erro interno: {str(e)}", None
     
     @staticmethod
@@ -88,14 +134,14 @@ class AuthService:
                 return False, "Email e senha são obrigatórios", None
             
             # Buscar usuário pelo email
-            user = User.query.filter_by(email=email.lower().strip()).first()
+            user = AuthService.find_user_by_email(email.lower().strip())
             
             if not user or not user.check_password(password):
                 return False, "Email ou senha incorretos", None
             
-            # Gerar tokens JWT
-            access_token = create_access_token(identity=user.id)
-            refresh_token = create_refresh_token(identity=user.id)
+            # Gerar tokens JWT (o claim 'sub' precisa ser string)
+            access_token = create_access_token(identity=str(user.id))
+            refresh_token = create_refresh_token(identity=str(user.id))
             
             tokens = {
                 'access_token': access_token,
@@ -109,6 +155,168 @@ class AuthService:
             return False, f"Erro interno: {str(e)}", None
     
     @staticmethod
+    def update_user(user_id, name=None, email=None, password=None, expected_version=None):
+        """
+        Atualiza os dados do usuário
+        
+        A leitura do usuário é feita no banco primário, já que ele será
+        modificado em seguida. O UPDATE só é aplicado se a versão lida não
+        mudou; caso contrário devolve VERSION_CONFLICT.
+        
+        Args:
+            user_id (int): ID do usuário
+            name (str): Novo nome (ignorado se vazio)
+            email (str): Novo email
+            password (str): Nova senha
+            expected_version (int): Versão que o cliente leu (If-Match); None para não exigir
+            
+        Returns:
+            tuple: (success: bool, message: str, user: User|None)
+        """
+        try:
+            use_user_shard(user_id)
+            user = db.session.get(User, user_id)
+            if not user:
+                return False, AuthService.USER_NOT_FOUND, None
+            if expected_version is not None and user.version != expected_version:
+                return False, AuthService.VERSION_CONFLICT, None
+            
+            # Atualizar nome se fornecido
+            if name is not None and name.strip():
+                user.name = name.strip()
+            
+            # Atualizar email se fornecido
+            if email is not None:
+                new_email = email.lower().strip()
+                if new_email != user.email:
+                    if not AuthService.validate_email(new_email):
+                        return False, "Formato de email inválido", None
+                    
+                    # Verificar se novo email já existe
+                    if AuthService.email_in_use(new_email):
+                        return False, "Email já está em uso", None
+                    
+                    user.email = new_email
+                    if sharding_enabled():
+                        db.session.get(UserDirectory, user_id).email = new_email
+            
+            # Atualizar senha se fornecida
+            if password is not None:
+                is_valid, message = AuthService.validate_password(password)
+                if not is_valid:
+                    return False, message, None
+                user.set_password(password)
+            
+            db.session.commit()
+            bump_user_version(user_id)
+            
+            # Nova senha encerra todas as sessões abertas
+            if password is not None:
+                RevocationService.revoke_user_tokens(user_id)
+            
+            return True, "Perfil atualizado com sucesso", user
+            
+        except StaleDataError:
+            db.session.rollback()
+            return False, AuthService.VERSION_CONFLICT, None
+        except Exception as e:
+            db.session.rollback()
+            return False, f"Erro interno: {str(e)}", None
+    
+    @staticmethod
+    def delete_user(user_id):
+        """
+        Excluir a conta do usuário e todas as suas tarefas
+        
+        Contas com mais tarefas que ACCOUNT_DELETE_SYNC_MAX_TASKS são
+        excluídas em segundo plano.
+        
+        Args:
+            user_id (int): ID do usuário
+            
+        Returns:
+            tuple: (success: bool, message: str, data: dict|None)
+        """
+        try:
+            use_user_shard(user_id)
+            if db.session.get(User, user_id) is None:
+                return False, AuthService.USER_NOT_FOUND, None
+            
+            # Antes de qualquer remoção: os tokens da conta deixam de valer já,
+            # inclusive durante a exclusão em segundo plano
+            RevocationService.revoke_user_tokens(user_id, account_deleted=True)
+            
+            task_count = db.session.execute(
+                select(func.count()).select_from(Task).where(Task.user_id == user_id)
+            ).scalar()
+            
+            if task_count > current_app.config['ACCOUNT_DELETE_SYNC_MAX_TASKS']:
+                submit_job(AuthService.purge_user, user_id)
+                return True, "Exclusão da conta agendada", {'scheduled': True, 'tasks': task_count}
+            
+            deleted = AuthService.purge_user(user_id)
+            return True, "Conta excluída com sucesso", {'scheduled': False, 'tasks': deleted}
+            
+        except Exception as e:
+            db.session.rollback()
+            return False, f"Erro interno: {str(e)}", None
+    
+    @staticmethod
+    def purge_user(user_id, chunk_size=None):
+        """
+        Remover as tarefas do usuário em lotes e, por fim, o próprio usuário
+        
+        Cada lote é uma transação curta com no máximo chunk_size tarefas, então
+        memória e tempo de lock não dependem do total de tarefas. O usuário é
+        removido na mesma transação do último lote.
+        
+        Args:
+            user_id (int): ID do usuário
+            chunk_size (int): Tarefas por transação (padrão: ACCOUNT_DELETE_CHUNK_SIZE)
+            
+        Returns:
+            int: Quantidade de tarefas excluídas
+        """
+        chunk_size = chunk_size or current_app.config['ACCOUNT_DELETE_CHUNK_SIZE']
+        use_user_shard(user_id)
+        deleted = 0
+        
+        while True:
+            task_ids = db.session.execute(
+                select(Task.id).where(Task.user_id == user_id).limit(chunk_size)
+            ).scalars().all()
+            deleted += TaskService.purge_task_ids(db.session, task_ids)
+            
+            if len(task_ids) < chunk_size:
+                db.session.execute(delete(User).where(User.id == user_id))
+                db.session.commit()
+                break
+            db.session.commit()
+        
+        # Tarefas arquivadas
+        while True:
+            archived_ids = select(TaskArchive.id).where(TaskArchive.user_id == user_id).limit(chunk_size)
+            count = db.session.execute(delete(TaskArchive).where(TaskArchive.id.in_(archived_ids))).rowcount
+            db.session.commit()
+            if count < chunk_size:
+                break
+        
+        # Agregados diários, etiquetas (inclusive das tarefas arquivadas) e ocorrências
+        for model in (TaskDailyStat, TaskTag, TagCount, TaskOccurrence):
+            db.session.execute(delete(model).where(model.user_id == user_id))
+        db.session.commit()
+        
+        # Dados do usuário no banco primário
+        db.session.execute(delete(IdempotencyRecord).where(IdempotencyRecord.user_id == user_id))
+        db.session.commit()
+        if sharding_enabled():
+            release_user_id(user_id)
+        bump_user_version(user_id)
+        
+        return deleted
+    
+    @staticmethod
+    @read_only
     def get_user_by_id(user_id):
         """
         Busca usuário por ID
@@ -120,6 +328,7 @@ class AuthService:
             User|None: Usuário encontrado ou None
         """
         try:
+            use_user_shard(user_id)
             return User.query.get(user_id)
         except Exception:
             return None
@@ -0,0 +1,48 @@
+"""
+Execução de tarefas de manutenção em segundo plano
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from src.models import db
+
+_lock = threading.Lock()
+
+def background_executor():
+    """Pool de threads de segundo plano da aplicação atual (criado sob demanda)"""
+    executor = current_app.extensions.get('background')
+    if executor is None:
+        with _lock:
+            executor = current_app.extensions.get('background')
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=current_app.config.get('BACKGROUND_WORKERS', 2),
+                    thread_name_prefix='background'
+                )
+                current_app.extensions['background'] = executor
+    return executor
+
+def submit_job(fn, *args, **kwargs):
+    """
+    Executar uma função em segundo plano, dentro do contexto da aplicação
+
+    A função usa sua própria sessão do banco, descartada ao terminar.
+
+    Returns:
+        concurrent.futures.Future: Resultado da função
+    """
+    app = current_app._get_current_object()
+
+    def run():
+        with app.app_context():
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                app.logger.exception('Falha na tarefa em segundo plano %s', fn.__qualname__)
+                raise
+            finally:
+                db.session.remove()
+
+    return background_executor().submit(run)
@@ -0,0 +1,261 @@
+"""
+Serviço de backup online dos bancos SQLite (API de backup incremental)
+"""
+
+import gzip
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app
+from src.models.sharding import shard_count, shard_engine
+
+# Nome dos snapshots: um diretório por backup, com um arquivo por shard
+SNAPSHOT_FORMAT = '%Y%m%dT%H%M%S'
+SNAPSHOT_PATTERN = re.compile(r'^\d{8}T\d{6}$')
+
+class BackupService:
+    """Serviço responsável pelos snapshots dos bancos e pela restauração verificada"""
+
+    @staticmethod
+    def create_backup(destination=None, pages=None, compress=None, keep=None, stamp=None):
+        """
+        Copiar todos os shards para um novo snapshot, com a aplicação no ar
+
+        Cada shard é copiado pela API de backup do SQLite, pages páginas por
+        passo: entre os passos o lock de leitura é liberado e as escritas
+        seguem. A cópia é conferida com PRAGMA integrity_check antes de ser
+        comprimida. O snapshot é montado em <stamp>.partial e renomeado no
+        fim, então um diretório <stamp> está sempre completo; criar o
+        .partial é atômico, e dois processos com o mesmo stamp não fazem o
+        mesmo backup duas vezes.
+
+        Args:
+            destination (str): Diretório dos snapshots (padrão: BACKUP_DIR)
+            pages (int): Páginas copiadas por passo (padrão: BACKUP_PAGES_PER_STEP)
+            compress (bool): Comprimir com gzip (padrão: BACKUP_COMPRESS)
+            keep (int): Snapshots mantidos; os mais antigos são removidos (padrão: BACKUP_KEEP)
+            stamp (datetime): Momento que nomeia o snapshot (padrão: agora)
+
+        Returns:
+            tuple: (success: bool, message: str, stats: dict|None)
+        """
+        config = current_app.config
+        destination = destination or config['BACKUP_DIR']
+        pages = pages or config['BACKUP_PAGES_PER_STEP']
+        compress = config['BACKUP_COMPRESS'] if compress is None else compress
+        keep = config['BACKUP_KEEP'] if keep is None else keep
+        name = (stamp or datetime.now()).strftime(SNAPSHOT_FORMAT)
+
+        snapshot = os.path.join(destination, name)
+        partial = f'{snapshot}.partial'
+        try:
+            os.makedirs(destination, exist_ok=True)
+            os.mkdir(partial)
+        except FileExistsError:
+            return False, f"Backup {name} já está em andamento", None
+        if os.path.exists(snapshot):
+            os.rmdir(partial)
+            return False, f"Backup {name} já existe", None
+
+        stats = {'snapshot': snapshot, 'shards': 0, 'bytes': 0, 'pruned': 0}
+        try:
+            for shard in range(shard_count()):
+                copy = os.path.join(partial, f'shard{shard}.db')
+                BackupService._copy(shard_engine(shard), copy, pages, config['BACKUP_STEP_SLEEP'])
+                is_valid, message = BackupService._check(copy)
+                if not is_valid:
+                    raise RuntimeError(f"Cópia do shard {shard} corrompida: {message}")
+                if compress:
+                    with open(copy, 'rb') as source, gzip.open(f'{copy}.gz', 'wb') as target:
+                        shutil.copyfileobj(source, target)
+                    os.remove(copy)
+                    copy = f'{copy}.gz'
+                stats['shards'] += 1
+                stats['bytes'] += os.path.getsize(copy)
+            os.rename(partial, snapshot)
+
+        except Exception as e:
+            shutil.rmtree(partial, ignore_errors=True)
+            return False, f"Erro interno: {str(e)}", None
+
+        stats['pruned'] = BackupService.prune_backups(destination, keep)
+        return True, "Backup concluído", stats
+
+    @staticmethod
+    def _copy(engine, path, pages, sleep):
+        """Copiar o banco de uma engine para um arquivo, pages páginas por passo"""
+        target = sqlite3.connect(path)
+        source = engine.raw_connection()
+        try:
+            source.driver_connection.backup(target, pages=pages, sleep=sleep)
+        finally:
+            source.close()
+            target.close()
+
+    @staticmethod
+    def _check(path):
+        """
+        Conferir a integridade de um arquivo de banco
+
+        Returns:
+            tuple: (is_valid: bool, message: str)
+        """
+        conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        try:
+            result = conn.execute('PRAGMA integrity_check').fetchone()[0]
+            if result != 'ok':
+                return False, result
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users'").fetchone() is None:
+                return False, "tabela users ausente"
+            return True, "ok"
+        except sqlite3.DatabaseError as e:
+            return False, str(e)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def list_backups(destination=None):
+        """Snapshots completos do diretório, do mais antigo para o mais recente"""
+        destination = destination or current_app.config['BACKUP_DIR']
+        if not os.path.isdir(destination):
+            return []
+        return sorted(
+            os.path.join(destination, name) for name in os.listdir(destination)
+            if SNAPSHOT_PATTERN.match(name) and os.path.isdir(os.path.join(destination, name))
+        )
+
+    @staticmethod
+    def prune_backups(destination, keep):
+        """Remover os snapshots mais antigos além dos keep mais recentes (0 mantém todos)"""
+        if not keep:
+            return 0
+        expired = BackupService.list_backups(destination)[:-keep]
+        for snapshot in expired:
+            shutil.rmtree(snapshot)
+        return len(expired)
+
+    @staticmethod
+    def restore_backup(snapshot, verify_only=False, pages=None):
+        """
+        Restaurar um snapshot sobre os bancos configurados
+
+        Cada arquivo do snapshot é descomprimido em um arquivo temporário e
+        conferido (integrity_check e presença das tabelas) antes que qualquer
+        shard seja tocado: um snapshot com um arquivo inválido não restaura
+        nada. A cópia para o banco usa a mesma API de backup, com o destino
+        travado até o fim, e o resultado é conferido de novo. Pare a
+        aplicação antes de restaurar.
+
+        Args:
+            snapshot (str): Diretório do snapshot
+            verify_only (bool): Apenas conferir, sem restaurar
+            pages (int): Páginas copiadas por passo (padrão: BACKUP_PAGES_PER_STEP)
+
+        Returns:
+            tuple: (success: bool, message: str, stats: dict|None)
+        """
+        pages = pages or current_app.config['BACKUP_PAGES_PER_STEP']
+        if not os.path.isdir(snapshot):
+            return False, "Snapshot não encontrado", None
+
+        files = {}
+        for shard in range(shard_count()):
+            for name in (f'shard{shard}.db.gz', f'shard{shard}.db'):
+                if os.path.exists(os.path.join(snapshot, name)):
+                    files[shard] = os.path.join(snapshot, name)
+                    break
+            else:
+                return False, f"Snapshot sem o arquivo do shard {shard}", None
+
+        scratch = f'{snapshot.rstrip(os.sep)}.restore'
+        os.makedirs(scratch, exist_ok=True)
+        try:
+            copies = {}
+            for shard, path in files.items():
+                copy = os.path.join(scratch, f'shard{shard}.db')
+                if path.endswith('.gz'):
+                    with gzip.open(path, 'rb') as source, open(copy, 'wb') as target:
+                        shutil.copyfileobj(source, target)
+                else:
+                    shutil.copyfile(path, copy)
+                is_valid, message = BackupService._check(copy)
+                if not is_valid:
+                    return False, f"Snapshot inválido no shard {shard}: {message}", None
+                copies[shard] = copy
+
+            if verify_only:
+                return True, "Snapshot íntegro", {'shards': len(copies), 'restored': 0}
+
+            for shard, copy in copies.items():
+                source = sqlite3.connect(copy)
+                target = shard_engine(shard).raw_connection()
+                try:
+                    source.backup(target.driver_connection, pages=pages)
+                    result = target.driver_connection.execute('PRAGMA integrity_check').fetchone()[0]
+                finally:
+                    target.close()
+                    source.close()
+                if result != 'ok':
+                    return False, f"Banco do shard {shard} corrompido após restaurar: {result}", None
+
+            return True, "Backup restaurado", {'shards': len(copies), 'restored': len(copies)}
+
+        except Exception as e:
+            return False, f"Erro interno: {str(e)}", None
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+class BackupSchedule:
+    """
+    Backup periódico em uma thread de segundo plano (BACKUP_INTERVAL_MINUTES)
+
+    O snapshot é nomeado pelo início do intervalo, não pelo relógio de
+    cada processo: com vários workers, o primeiro a criar o diretório faz
+    o backup e os demais desistem daquele intervalo.
+    """
+
+    def __init__(self, app, interval_minutes):
+        self.app = app
+        self.interval = interval_minutes * 60
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='backup', daemon=True)
+
+    def start(self):
+        """Iniciar a thread do backup periódico"""
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        """Parar a thread do backup periódico"""
+        self._stopped.set()
+        self._thread.join(timeout)
+
+    def run_once(self, now=None):
+        """Fazer o backup do intervalo atual, se nenhum processo o fez"""
+        now = now or time.time()
+        stamp = datetime.fromtimestamp(now - now % self.interval)
+        with self.app.app_context():
+            success, message, stats = BackupService.create_backup(stamp=stamp)
+        if success:
+            self.app.logger.info('Backup %s: %s bytes', stats['snapshot'], stats['bytes'])
+        return success, message, stats
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                self.app.logger.exception('Falha no backup periódico')
+            now = time.time()
+            self._stopped.wait(self.interval - now % self.interval)
+
+def start_backup_schedule(app):
+    """Iniciar o backup periódico da aplicação (BACKUP_INTERVAL_MINUTES)"""
+    schedule = BackupSchedule(app, app.config['BACKUP_INTERVAL_MINUTES'])
+    app.extensions['backup_schedule'] = schedule
+    schedule.start()
+    return schedule
@@ -0,0 +1,142 @@
+"""
+Chaves de ordenação fracionárias (comparadas como texto)
+
+Entre duas chaves sempre cabe uma terceira, então mover um item altera
+apenas a chave dele. Cada chave tem uma parte inteira de tamanho variável
+(o primeiro caractere indica o tamanho: 'a' = 1 dígito, 'b' = 2, ...; 'Z',
+'Y', ... para as negativas) seguida de uma parte fracionária sem zeros à
+direita. Acrescentar sempre no fim faz as chaves crescerem de forma
+logarítmica; inserções repetidas no mesmo intervalo crescem um caractere a
+cada ~6 inserções, e por isso as chaves são reequilibradas de tempos em tempos.
+"""
+
+# Dígitos em base 62, na ordem ASCII (a mesma da comparação de texto do banco)
+DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+ZERO = DIGITS[0]
+# Menor parte inteira possível: não há chave antes dela
+SMALLEST_INTEGER = 'A' + ZERO * 26
+
+def key_between(before, after):
+    """
+    Chave estritamente entre before e after
+
+    Args:
+        before (str): Chave anterior (None para o início)
+        after (str): Chave seguinte (None para o fim)
+
+    Returns:
+        str: Nova chave
+
+    Raises:
+        ValueError: Chaves inválidas ou fora de ordem
+    """
+    if before is not None:
+        _validate(before)
+    if after is not None:
+        _validate(after)
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"Chaves fora de ordem: {before} >= {after}")
+
+    if before is None:
+        if after is None:
+            return 'a' + ZERO
+        integer = _integer_part(after)
+        if integer == SMALLEST_INTEGER:
+            return integer + _midpoint('', after[len(integer):])
+        if integer < after:
+            return integer
+        decremented = _decrement(integer)
+        if decremented is None:
+            raise ValueError("Não há chave antes da menor chave possível")
+        return decremented
+
+    integer = _integer_part(before)
+    fraction = before[len(integer):]
+    if after is None:
+        incremented = _increment(integer)
+        return integer + _midpoint(fraction, None) if incremented is None else incremented
+
+    after_integer = _integer_part(after)
+    if integer == after_integer:
+        return integer + _midpoint(fraction, after[len(after_integer):])
+    incremented = _increment(integer)
+    if incremented is not None and incremented < after:
+        return incremented
+    return integer + _midpoint(fraction, None)
+
+def _midpoint(low, high):
+    """Parte fracionária entre low e high (high None = sem limite superior)"""
+    if high is not None:
+        # Prefixo comum (low completado com zeros)
+        common = 0
+        while (low[common] if common < len(low) else ZERO) == high[common]:
+            common += 1
+        if common:
+            return high[:common] + _midpoint(low[common:], high[common:])
+
+    low_digit = DIGITS.index(low[0]) if low else 0
+    high_digit = DIGITS.index(high[0]) if high is not None else len(DIGITS)
+    if high_digit - low_digit > 1:
+        return DIGITS[(low_digit + high_digit + 1) // 2]
+    if high is not None and len(high) > 1:
+        return high[0]
+    return DIGITS[low_digit] + _midpoint(low[1:], None)
+
+def _integer_length(head):
+    if 'a' <= head <= 'z':
+        return ord(head) - ord('a') + 2
+    if 'A' <= head <= 'Z':
+        return ord('Z') - ord(head) + 2
+    raise ValueError(f"Chave inválida: {head}")
+
+def _integer_part(key):
+    length = _integer_length(key[0])
+    if length > len(key):
+        raise ValueError(f"Chave inválida: {key}")
+    return key[:length]
+
+def _validate(key):
+    if not key or key == SMALLEST_INTEGER:
+        raise ValueError(f"Chave inválida: {key}")
+    if key[len(_integer_part(key)):].endswith(ZERO) or any(char not in DIGITS for char in key):
+        raise ValueError(f"Chave inválida: {key}")
+
+def _increment(integer):
+    """Próxima parte inteira (None depois da maior possível)"""
+    head, digits = integer[0], list(integer[1:])
+    for index in range(len(digits) - 1, -1, -1):
+        digit = DIGITS.index(digits[index]) + 1
+        if digit < len(DIGITS):
+            digits[index] = DIGITS[digit]
+            return head + ''.join(digits)
+        digits[index] = ZERO
+    if head == 'Z':
+        return 'a' + ZERO
+    if head == 'z':
+        return None
+    head = chr(ord(head) + 1)
+    if head > 'a':
+        digits.append(ZERO)
+    else:
+        digits.pop()
+    return head + ''.join(digits)
+
+def _decrement(integer):
+    """Parte inteira anterior (None antes da menor possível)"""
+    head, digits = integer[0], list(integer[1:])
+    for index in range(len(digits) - 1, -1, -1):
+        digit = DIGITS.index(digits[index]) - 1
+        if digit >= 0:
+            digits[index] = DIGITS[digit]
+            return head + ''.join(digits)
+        digits[index] = DIGITS[-1]
+    if head == 'a':
+        return 'Z' + DIGITS[-1]
+    if head == 'A':
+        return None
+    head = chr(ord(head) - 1)
+    if head < 'Z':
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + ''.join(digits)
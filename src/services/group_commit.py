@@ -0,0 +1,147 @@
+"""
+Group commit: escritas concorrentes compartilhando uma transação e um fsync
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from flask import current_app
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+class GroupCommitter:
+    """
+    Executor de operações de escrita em lotes
+
+    Uma thread dedicada junta as operações que chegam dentro de uma janela
+    curta (ex.: 2 ms) e executa todas em uma única transação, cada uma em
+    seu próprio SAVEPOINT. Uma operação que falha (exceção ou resultado
+    com success=False) desfaz apenas o seu savepoint; as demais seguem e
+    são confirmadas juntas em um único COMMIT (um único fsync). Cada
+    chamador recebe o próprio resultado depois do COMMIT, então a
+    durabilidade é a mesma do commit individual.
+    """
+
+    def __init__(self, app, database_uri, window_seconds, max_batch=256):
+        self.app = app
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self.engine = self._create_engine(database_uri)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='group-commit', daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _create_engine(database_uri):
+        """Engine própria com uma conexão e transações explícitas"""
+        engine = create_engine(database_uri, pool_size=1, max_overflow=0)
+
+        if engine.dialect.name == 'sqlite':
+            # O pysqlite gerencia transações por conta própria e quebra os
+            # SAVEPOINTs; desligar isso e abrir a transação já com o lock de escrita
+            @event.listens_for(engine, 'connect')
+            def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+                dbapi_connection.isolation_level = None
+
+            @event.listens_for(engine, 'begin')
+            def _begin_immediate(conn):
+                conn.exec_driver_sql('BEGIN IMMEDIATE')
+
+        return engine
+
+    def submit(self, operation):
+        """
+        Executar uma operação no próximo lote e aguardar o resultado
+
+        Args:
+            operation (callable): Função que recebe a Session do lote e
+                devolve uma tupla (success: bool, ...)
+
+        Returns:
+            O valor devolvido pela operação, depois do COMMIT do lote
+        """
+        future = Future()
+        self._queue.put((operation, future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window_seconds
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            with self.app.app_context():
+                self._commit_batch(batch)
+
+    def _commit_batch(self, batch):
+        """Executar um lote em uma transação e resolver os futures"""
+        outcomes = []
+        session = Session(bind=self.engine, expire_on_commit=False)
+        try:
+            for operation, future in batch:
+                savepoint = session.begin_nested()
+                try:
+                    result = operation(session)
+                except Exception as e:
+                    savepoint.rollback()
+                    outcomes.append((future, None, e))
+                    continue
+                if isinstance(result, tuple) and result and result[0] is False:
+                    savepoint.rollback()
+                else:
+                    savepoint.commit()
+                outcomes.append((future, result, None))
+
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            session.close()
+            for operation, future in batch:
+                future.set_exception(e)
+            return
+
+        # Objetos devolvidos continuam com os atributos carregados após fechar a sessão
+        session.close()
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+def group_committer(shard=0):
+    """
+    Group committer do banco (ou shard) informado
+
+    Returns:
+        GroupCommitter|None: None quando o group commit está desativado
+    """
+    window_ms = current_app.config.get('GROUP_COMMIT_WINDOW_MS', 0)
+    if not window_ms:
+        return None
+
+    committers = current_app.extensions.setdefault('group_commit', {})
+    committer = committers.get(shard)
+    if committer is None:
+        lock = current_app.extensions.setdefault('group_commit_lock', threading.Lock())
+        with lock:
+            committer = committers.get(shard)
+            if committer is None:
+                from src.models.sharding import shard_engine
+
+                uri = shard_engine(shard).url.render_as_string(hide_password=False)
+                committer = GroupCommitter(
+                    current_app._get_current_object(),
+                    uri,
+                    window_ms / 1000,
+                    current_app.config.get('GROUP_COMMIT_MAX_BATCH', 256)
+                )
+                committers[shard] = committer
+    return committer
@@ -0,0 +1,141 @@
+"""
+Serviço de armazenamento de respostas por Idempotency-Key
+"""
+
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import delete, literal_column, select, update
+from sqlalchemy.exc import IntegrityError
+from src.models import db, IdempotencyRecord
+
+class IdempotencyService:
+    """Serviço responsável pelas chaves de idempotência"""
+
+    NEW = 'new'
+    REPLAY = 'replay'
+    IN_PROGRESS = 'in_progress'
+    MISMATCH = 'mismatch'
+
+    @staticmethod
+    def begin(user_id, key, request_hash):
+        """
+        Reservar uma chave de idempotência de forma atômica
+
+        A reserva é um INSERT na chave primária (user_id, key): entre
+        requisições concorrentes com a mesma chave, apenas uma consegue
+        inserir e executa a operação; as demais encontram o registro.
+
+        Args:
+            user_id (int): ID do usuário
+            key (str): Valor do cabeçalho Idempotency-Key
+            request_hash (str): Hash da requisição
+
+        Returns:
+            tuple: (state: str, record: IdempotencyRecord|None)
+        """
+        now = datetime.now()
+        ttl = current_app.config['IDEMPOTENCY_TTL']
+
+        for attempt in range(2):
+            try:
+                db.session.add(IdempotencyRecord(
+                    user_id=user_id,
+                    key=key,
+                    request_hash=request_hash,
+                    created_at=now,
+                    expires_at=now + ttl
+                ))
+                db.session.commit()
+                return IdempotencyService.NEW, None
+            except IntegrityError:
+                db.session.rollback()
+
+            record = db.session.get(IdempotencyRecord, (user_id, key), populate_existing=True)
+            if record is None:
+                continue
+
+            if record.expires_at <= now or IdempotencyService._is_abandoned(record, now):
+                # Chave expirada ou requisição original abandonada: assumir a chave
+                taken = db.session.execute(
+                    update(IdempotencyRecord)
+                    .where(IdempotencyRecord.user_id == user_id,
+                           IdempotencyRecord.key == key,
+                           IdempotencyRecord.created_at == record.created_at)
+                    .values(request_hash=request_hash, status_code=None, response_body=None,
+                            created_at=now, expires_at=now + ttl)
+                ).rowcount
+                db.session.commit()
+                if taken:
+                    return IdempotencyService.NEW, None
+                continue
+
+            if record.request_hash != request_hash:
+                return IdempotencyService.MISMATCH, record
+            if record.status_code is None:
+                return IdempotencyService.IN_PROGRESS, record
+            return IdempotencyService.REPLAY, record
+
+        return IdempotencyService.IN_PROGRESS, None
+
+    @staticmethod
+    def _is_abandoned(record, now):
+        """Requisição em processamento há mais tempo que o limite configurado"""
+        lock_timeout = current_app.config['IDEMPOTENCY_LOCK_TIMEOUT']
+        return record.status_code is None and record.created_at + lock_timeout <= now
+
+    @staticmethod
+    def complete(user_id, key, status_code, response_body, response_etag=None):
+        """Armazenar a resposta da requisição original"""
+        try:
+            db.session.execute(
+                update(IdempotencyRecord)
+                .where(IdempotencyRecord.user_id == user_id, IdempotencyRecord.key == key)
+                .values(status_code=status_code, response_body=response_body, response_etag=response_etag)
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+
+    @staticmethod
+    def release(user_id, key):
+        """Liberar a chave para que uma nova tentativa execute a operação"""
+        try:
+            db.session.execute(
+                delete(IdempotencyRecord)
+                .where(IdempotencyRecord.user_id == user_id, IdempotencyRecord.key == key)
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+
+    @staticmethod
+    def sweep_expired(batch_size=500, max_batches=None):
+        """
+        Remover chaves expiradas em lotes
+
+        Cada lote é uma transação curta, para não segurar o lock de escrita.
+
+        Args:
+            batch_size (int): Registros removidos por transação
+            max_batches (int): Limite de lotes nesta chamada (None = até acabar)
+
+        Returns:
+            int: Quantidade de registros removidos
+        """
+        table = IdempotencyRecord.__table__
+        rowid = literal_column('rowid')
+        removed = 0
+        batches = 0
+
+        while max_batches is None or batches < max_batches:
+            expired = select(rowid).select_from(table) \
+                .where(table.c.expires_at <= datetime.now()).limit(batch_size)
+            count = db.session.execute(delete(table).where(rowid.in_(expired))).rowcount
+            db.session.commit()
+            removed += count
+            batches += 1
+            if count < batch_size:
+                break
+
+        return removed
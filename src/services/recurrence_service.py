@@ -0,0 +1,122 @@
+"""
+Serviço de tarefas recorrentes (ocorrências geradas na leitura)
+"""
+
+from datetime import date, timedelta
+
+from sqlalchemy import delete, select
+from src.models import Task, TaskOccurrence
+
+class RecurrenceService:
+    """Serviço responsável pelas regras de recorrência e pelas ocorrências gravadas"""
+
+    # Regra -> dias entre duas ocorrências
+    RULES = {'diaria': 1, 'semanal': 7}
+
+    # Maior período de ocorrências em uma listagem, em dias
+    MAX_WINDOW_DAYS = 62
+
+    @staticmethod
+    def parse_window(start, end=None):
+        """
+        Validar o período de ocorrências de uma listagem
+
+        Args:
+            start (str): Primeiro dia (AAAA-MM-DD)
+            end (str): Último dia, inclusive (padrão: o próprio start)
+
+        Returns:
+            tuple: (is_valid: bool, message: str, window: tuple(date, date)|None)
+        """
+        try:
+            start = date.fromisoformat(start)
+            end = date.fromisoformat(end) if end is not None else start
+        except (TypeError, ValueError):
+            return False, "Data de ocorrência inválida. Use o formato AAAA-MM-DD", None
+        if end < start:
+            return False, "O fim do período de ocorrências deve ser depois do início", None
+        if (end - start).days >= RecurrenceService.MAX_WINDOW_DAYS:
+            return False, f"Consulte no máximo {RecurrenceService.MAX_WINDOW_DAYS} dias de ocorrências", None
+        return True, "Período válido", (start, end)
+
+    @staticmethod
+    def occurs_on(rule, first_day, day):
+        """Indica se uma regra iniciada em first_day tem ocorrência no dia"""
+        return day >= first_day and (day - first_day).days % RecurrenceService.RULES[rule] == 0
+
+    @staticmethod
+    def expand(session, user_id, window, status=None):
+        """
+        Ocorrências das tarefas recorrentes do usuário em um período
+
+        Uma consulta lê as regras e outra as ocorrências gravadas no período;
+        as demais são geradas aqui, sem gravar nada. A série começa no dia
+        de criação da tarefa e termina no dia em que a tarefa recorrente é
+        concluída.
+
+        Args:
+            session: Sessão de leitura
+            user_id (int): ID do usuário
+            window (tuple): (primeiro dia, último dia), já validados
+            status (str): Filtro por status (opcional)
+
+        Returns:
+            list: Ocorrências (dicionários) por dia e tarefa
+        """
+        start, end = window
+        tasks = Task.__table__
+        rules = {row.id: row for row in session.execute(
+            select(
+                tasks.c.id, tasks.c.name, tasks.c.description, tasks.c.recurrence,
+                tasks.c.created_at, tasks.c.completed_at
+            ).where(tasks.c.user_id == user_id, tasks.c.recurrence.is_not(None))
+        )}
+        if not rules:
+            return []
+
+        occurrences = TaskOccurrence.__table__
+        stored = {(row.day, row.task_id): row for row in session.execute(
+            select(occurrences).where(occurrences.c.user_id == user_id, occurrences.c.day.between(start, end))
+        )}
+
+        last_days = {
+            rule.id: min(end, rule.completed_at.date()) if rule.completed_at else end
+            for rule in rules.values()
+        }
+        # Ocorrências gravadas para depois do fim da série não aparecem mais
+        keys = {(day, task_id) for day, task_id in stored if task_id in rules and day <= last_days[task_id]}
+        for rule in rules.values():
+            step = RecurrenceService.RULES[rule.recurrence]
+            first_day = rule.created_at.date()
+            last_day = last_days[rule.id]
+            day = max(first_day, start)
+            day += timedelta(days=-(day - first_day).days % step)
+            while day <= last_day:
+                keys.add((day, rule.id))
+                day += timedelta(days=step)
+
+        result = []
+        for day, task_id in sorted(keys):
+            occurrence = RecurrenceService.occurrence_dict(rules[task_id], day, stored.get((day, task_id)))
+            if status is None or occurrence['status'] == status:
+                result.append(occurrence)
+        return result
+
+    @staticmethod
+    def occurrence_dict(rule, day, row):
+        """Ocorrência no formato da API (row None = ainda não alterada)"""
+        return {
+            'task_id': rule.id,
+            'date': day.isoformat(),
+            'name': row.name if row is not None and row.name is not None else rule.name,
+            'description': row.description if row is not None and row.description is not None else rule.description,
+            'status': row.status if row is not None else 'pendente',
+            'completed_at': row.completed_at.isoformat() if row is not None and row.completed_at else None,
+            'recurrence': rule.recurrence
+        }
+
+    @staticmethod
+    def purge_occurrences(session, task_ids):
+        """Remover as ocorrências gravadas de tarefas excluídas em lote"""
+        occurrences = TaskOccurrence.__table__
+        session.execute(delete(occurrences).where(occurrences.c.task_id.in_(task_ids)))
@@ -0,0 +1,226 @@
+"""
+Lembretes de prazo (due_at) das tarefas, disparados por um agendador em processo
+"""
+
+import heapq
+import importlib
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import select, update
+from src.models import Task
+
+logger = logging.getLogger(__name__)
+
+def log_sink(reminder):
+    """Destino padrão dos lembretes: uma linha no log da aplicação"""
+    logger.info('Lembrete: tarefa %s (%s) do usuário %s vence em %s',
+                reminder['task_id'], reminder['name'], reminder['user_id'], reminder['due_at'])
+
+def load_sink(spec):
+    """
+    Destino dos lembretes a partir da configuração REMINDER_SINK
+
+    Args:
+        spec: None (log_sink), uma função ou o caminho 'modulo:funcao'
+
+    Returns:
+        callable: Função que recebe o lembrete (dicionário)
+    """
+    if spec is None:
+        return log_sink
+    if callable(spec):
+        return spec
+    module_name, _, name = spec.replace(':', '.').rpartition('.')
+    return getattr(importlib.import_module(module_name), name)
+
+class ReminderScheduler:
+    """
+    Agendador dos lembretes de prazo
+
+    Mantém em memória um heap (due_at, shard, task_id) só com os lembretes
+    que vencem dentro da janela lookahead_seconds: a cada poll_seconds o
+    banco é consultado pelo índice parcial ix_tasks_status_due_at_pending, em
+    lotes de batch_size por shard, e as escritas deste processo entram no
+    heap na hora (schedule). Inserir e retirar do heap é O(log n); o banco
+    é a fonte da verdade, então um reinício só recarrega a janela.
+
+    O disparo reivindica os lembretes vencidos com um único UPDATE
+    condicional (reminded_at IS NULL) com RETURNING: com vários processos
+    (ou um agendador por worker), cada lembrete é entregue por quem o
+    reivindicou, uma única vez. Tarefas concluídas, excluídas ou com o
+    prazo adiado ficam de fora da reivindicação e são descartadas.
+    """
+
+    def __init__(self, app, sink=None, lookahead_seconds=300, poll_seconds=30, batch_size=1000):
+        self.app = app
+        self.sink = sink or log_sink
+        self.lookahead = timedelta(seconds=lookahead_seconds)
+        self.poll = timedelta(seconds=poll_seconds)
+        self.batch_size = batch_size
+        self._heap = []
+        self._queued = set()
+        self._loaded_until = None
+        self._next_load = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._heap)
+
+    def start(self):
+        """Iniciar a thread do agendador"""
+        self._thread = threading.Thread(target=self._run, name='reminders', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        """Parar a thread do agendador"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            with self.app.app_context():
+                try:
+                    wait = self.run_pending()
+                except Exception:
+                    self.app.logger.exception('Falha no agendador de lembretes')
+                    wait = self.poll.total_seconds()
+            self._wakeup.wait(wait)
+            self._wakeup.clear()
+
+    def _push(self, due_at, shard, task_id):
+        """Colocar um lembrete no heap (chamar com o lock)"""
+        key = (due_at, shard, task_id)
+        if key in self._queued:
+            return False
+        self._queued.add(key)
+        heapq.heappush(self._heap, key)
+        return self._heap[0] == key
+
+    def schedule(self, shard, task_id, due_at):
+        """
+        Agendar o lembrete de uma tarefa gravada neste processo
+
+        Prazos além da janela já carregada ficam para a próxima carga.
+        """
+        with self._lock:
+            if self._loaded_until is None or due_at > self._loaded_until:
+                return
+            earliest = self._push(due_at, shard, task_id)
+        if earliest:
+            self._wakeup.set()
+
+    def load(self, now):
+        """
+        Carregar do banco os lembretes pendentes que vencem até now + lookahead
+
+        Um shard que devolve o lote cheio limita a janela carregada ao
+        último prazo lido; o restante vem nas próximas cargas.
+        """
+        from src.models.sharding import shard_count, shard_engine
+
+        tasks = Task.__table__
+        horizon = now + self.lookahead
+        loaded_until = horizon
+        for shard in range(shard_count()):
+            with shard_engine(shard).connect() as conn:
+                rows = conn.execute(
+                    select(tasks.c.id, tasks.c.due_at)
+                    .where(*self._pending(tasks), tasks.c.due_at <= horizon)
+                    .order_by(tasks.c.due_at)
+                    .limit(self.batch_size)
+                ).all()
+            with self._lock:
+                for row in rows:
+                    self._push(row.due_at, shard, row.id)
+            if len(rows) == self.batch_size:
+                loaded_until = min(loaded_until, rows[-1].due_at)
+
+        with self._lock:
+            self._loaded_until = loaded_until
+        self._next_load = min(now + self.poll, loaded_until)
+
+    @staticmethod
+    def _pending(tasks):
+        """Lembrete ainda não disparado de tarefa pendente (condições do índice parcial)"""
+        return (tasks.c.reminded_at.is_(None), tasks.c.status == 'pendente')
+
+    def run_pending(self, now=None):
+        """
+        Disparar os lembretes vencidos
+
+        Args:
+            now (datetime): Momento atual (padrão: datetime.now())
+
+        Returns:
+            float: Segundos até o próximo lembrete ou a próxima carga
+        """
+        now = now or datetime.now()
+        if self._next_load is None or now >= self._next_load:
+            self.load(now)
+
+        due = {}
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                key = heapq.heappop(self._heap)
+                self._queued.discard(key)
+                due.setdefault(key[1], []).append(key[2])
+
+        for shard, task_ids in due.items():
+            for reminder in self.claim(shard, task_ids, now):
+                try:
+                    self.sink(reminder)
+                except Exception:
+                    logger.exception('Falha ao entregar o lembrete da tarefa %s', reminder['task_id'])
+
+        with self._lock:
+            next_at = min(self._heap[0][0], self._next_load) if self._heap else self._next_load
+        return max((next_at - now).total_seconds(), 0)
+
+    def claim(self, shard, task_ids, now):
+        """
+        Reivindicar lembretes vencidos, marcando reminded_at
+
+        Returns:
+            list: Lembretes reivindicados por este agendador
+        """
+        from src.models.sharding import shard_engine
+
+        tasks = Task.__table__
+        with shard_engine(shard).begin() as conn:
+            rows = conn.execute(
+                update(tasks)
+                .where(tasks.c.id.in_(task_ids), *self._pending(tasks), tasks.c.due_at <= now)
+                .values(reminded_at=now, updated_at=tasks.c.updated_at)
+                .returning(tasks.c.id, tasks.c.user_id, tasks.c.name, tasks.c.due_at)
+            ).all()
+        return [
+            {'task_id': row.id, 'user_id': row.user_id, 'name': row.name, 'due_at': row.due_at.isoformat()}
+            for row in sorted(rows, key=lambda row: (row.due_at, row.id))
+        ]
+
+def start_reminders(app):
+    """Iniciar o agendador de lembretes da aplicação (REMINDERS_ENABLED)"""
+    scheduler = ReminderScheduler(
+        app,
+        sink=load_sink(app.config.get('REMINDER_SINK')),
+        lookahead_seconds=app.config.get('REMINDER_LOOKAHEAD_SECONDS', 300),
+        poll_seconds=app.config.get('REMINDER_POLL_SECONDS', 30),
+        batch_size=app.config.get('REMINDER_BATCH_SIZE', 1000)
+    )
+    app.extensions['reminders'] = scheduler
+    scheduler.start()
+    return scheduler
+
+def schedule_reminder(shard, task_id, due_at):
+    """Avisar o agendador da aplicação atual de um prazo gravado (sem agendador, nada muda)"""
+    scheduler = current_app.extensions.get('reminders')
+    if scheduler is not None and due_at is not None:
+        scheduler.schedule(shard, task_id, due_at)
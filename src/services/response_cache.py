@@ -0,0 +1,158 @@
+"""
+Cache de respostas por usuário, invalidado por versão
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+# Custo aproximado de uma entrada além do corpo (chave, tupla, nó do OrderedDict)
+ENTRY_OVERHEAD = 200
+
+class ResponseCache:
+    """
+    Cache LRU de respostas limitado pelo total de bytes
+
+    Cada usuário tem uma versão dos seus dados, incluída na chave das
+    entradas. Qualquer escrita do usuário incrementa a versão: as entradas
+    antigas deixam de ser encontradas, sem varrer chaves, e saem do cache
+    pela ordem LRU. As entradas também expiram após ttl segundos, o que
+    limita o atraso em relação a escritas feitas por outros processos.
+
+    As versões vêm de um relógio único e só ficam guardadas enquanto o
+    usuário tem entradas no cache, então a memória das versões acompanha o
+    limite de entradas. Um usuário sem entradas tem como versão o relógio
+    atual; _floor é a maior versão esquecida (ou escrita sem entradas), e
+    uma resposta calculada com versão anterior a ela não é guardada, pois
+    pode ser de antes de uma escrita.
+    """
+
+    def __init__(self, max_bytes, ttl=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        # user_id -> [versão, entradas no cache]
+        self._users = {}
+        self._clock = 0
+        self._floor = 0
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def version(self, user_id):
+        """Versão atual dos dados do usuário"""
+        with self._lock:
+            state = self._users.get(user_id)
+            return state[0] if state is not None else self._clock
+
+    def bump(self, user_id):
+        """Invalidar as respostas guardadas do usuário"""
+        with self._lock:
+            self._clock += 1
+            state = self._users.get(user_id)
+            if state is not None:
+                state[0] = self._clock
+            else:
+                self._floor = self._clock
+
+    def _release(self, key, size):
+        """Descontar uma entrada removida e esquecer a versão do usuário sem entradas (chamar com o lock)"""
+        self.bytes -= size
+        state = self._users[key[0]]
+        state[1] -= 1
+        if not state[1]:
+            self._floor = max(self._floor, state[0])
+            del self._users[key[0]]
+
+    def get(self, key):
+        """Resposta guardada (body, status, mimetype) ou None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                response, size, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return response
+                del self._entries[key]
+                self._release(key, size)
+            self.misses += 1
+            return None
+
+    def put(self, key, response):
+        """
+        Guardar uma resposta
+
+        Args:
+            key (tuple): (user_id, caminho, argumentos da query, versão)
+            response (tuple): (body: bytes, status: int, mimetype: str)
+        """
+        user_id, path, args, version = key
+        size = len(response[0]) + len(path) + ENTRY_OVERHEAD \
+            + sum(len(name) + len(value) for name, value in args)
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            # Resposta calculada antes de uma escrita do usuário: não guardar
+            state = self._users.get(user_id)
+            if state is None:
+                if version < self._floor:
+                    return
+                state = self._users[user_id] = [version, 0]
+            elif version != state[0]:
+                return
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            else:
+                state[1] += 1
+            self._entries[key] = (response, size, expires_at)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self._release(evicted_key, evicted[1])
+                self.evictions += 1
+
+    def stats(self):
+        """Métricas do cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'users': len(self._users),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0
+            }
+
+def response_cache():
+    """
+    Cache de respostas da aplicação atual
+
+    Returns:
+        ResponseCache|None: None quando RESPONSE_CACHE_MAX_BYTES é 0
+    """
+    cache = current_app.extensions.get('response_cache')
+    if cache is None:
+        max_bytes = current_app.config.get('RESPONSE_CACHE_MAX_BYTES', 0)
+        if not max_bytes:
+            return None
+        cache = current_app.extensions.setdefault(
+            'response_cache',
+            ResponseCache(max_bytes, current_app.config.get('RESPONSE_CACHE_TTL'))
+        )
+    return cache
+
+def bump_user_version(user_id):
+    """Invalidar o cache de respostas do usuário (chamar depois de cada escrita)"""
+    cache = response_cache()
+    if cache is not None:
+        cache.bump(user_id)
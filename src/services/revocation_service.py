@@ -0,0 +1,178 @@
+"""
+Serviço de revogação de tokens JWT (logout e troca de senha)
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from src.models import db, RevokedToken, UserRevocation
+
+# Margem na sincronização incremental para revogações gravadas com relógio adiantado
+SYNC_OVERLAP = timedelta(seconds=5)
+
+class RevocationList:
+    """
+    Cópia em memória das revogações, consultada a cada requisição
+
+    tokens: jti -> expiração (timestamp) dos tokens revogados
+    cutoffs: user_id (str, como no claim 'sub') -> iat mínimo aceito
+    """
+
+    def __init__(self):
+        self.tokens = {}
+        self.cutoffs = {}
+        self.watermark = None
+        self.synced_at = None
+        self.lock = threading.Lock()
+
+class RevocationService:
+    """Serviço responsável pela lista de tokens revogados"""
+
+    @staticmethod
+    def _state():
+        state = current_app.extensions.get('token_revocations')
+        if state is None:
+            state = current_app.extensions.setdefault('token_revocations', RevocationList())
+        return state
+
+    @staticmethod
+    def is_revoked(jwt_payload):
+        """
+        Verificar se um token foi revogado, sem consultar o banco
+
+        A lista em memória é sincronizada com o banco a cada
+        TOKEN_REVOCATION_SYNC_SECONDS; revogações feitas neste processo
+        valem imediatamente.
+
+        Args:
+            jwt_payload (dict): Claims do token decodificado
+
+        Returns:
+            bool: True se o token foi revogado
+        """
+        state = RevocationService._state()
+        interval = current_app.config['TOKEN_REVOCATION_SYNC_SECONDS']
+        if state.synced_at is None or time.monotonic() - state.synced_at >= interval:
+            RevocationService.sync(state)
+
+        if jwt_payload.get('jti') in state.tokens:
+            return True
+        cutoff = state.cutoffs.get(jwt_payload.get('sub'))
+        return cutoff is not None and jwt_payload.get('iat', 0) < cutoff
+
+    @staticmethod
+    def _max_token_age():
+        """Validade máxima de um token emitido (access ou refresh)"""
+        return max(current_app.config['JWT_ACCESS_TOKEN_EXPIRES'],
+                   current_app.config['JWT_REFRESH_TOKEN_EXPIRES'])
+
+    @staticmethod
+    def sync(state=None):
+        """Trazer do banco as revogações novas e descartar da memória as que não têm mais efeito"""
+        state = state or RevocationService._state()
+        if not state.lock.acquire(blocking=False):
+            return  # outra thread já está sincronizando
+        try:
+            started = datetime.now()
+            since = state.watermark - SYNC_OVERLAP if state.watermark else datetime.min
+            with db.engine.connect() as conn:
+                tokens = conn.execute(
+                    select(RevokedToken.jti, RevokedToken.expires_at)
+                    .where(RevokedToken.revoked_at >= since)
+                ).all()
+                cutoffs = conn.execute(
+                    select(UserRevocation.user_id, UserRevocation.revoked_before)
+                    .where(UserRevocation.updated_at >= since)
+                ).all()
+
+            for jti, expires_at in tokens:
+                state.tokens[jti] = expires_at.timestamp()
+            for user_id, revoked_before in cutoffs:
+                state.cutoffs[str(user_id)] = revoked_before
+
+            now = time.time()
+            for jti in [jti for jti, expires in state.tokens.items() if expires < now]:
+                del state.tokens[jti]
+            # Mesmo critério de sweep_expired: todo token anterior ao corte já expirou
+            oldest = now - RevocationService._max_token_age().total_seconds()
+            for user_id in [user_id for user_id, cutoff in state.cutoffs.items() if cutoff <= oldest]:
+                del state.cutoffs[user_id]
+
+            state.watermark = started
+            state.synced_at = time.monotonic()
+        except Exception:
+            # Banco indisponível: seguir com a lista atual e tentar na próxima requisição
+            pass
+        finally:
+            state.lock.release()
+
+    @staticmethod
+    def revoke_token(jwt_payload):
+        """
+        Revogar um token (logout)
+
+        Args:
+            jwt_payload (dict): Claims do token a revogar
+        """
+        expires_at = datetime.fromtimestamp(jwt_payload['exp'])
+        try:
+            db.session.add(RevokedToken(
+                jti=jwt_payload['jti'],
+                user_id=int(jwt_payload['sub']),
+                expires_at=expires_at
+            ))
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()  # já revogado
+
+        RevocationService._state().tokens[jwt_payload['jti']] = expires_at.timestamp()
+
+    @staticmethod
+    def revoke_user_tokens(user_id, account_deleted=False):
+        """
+        Revogar todos os tokens do usuário emitidos até agora (troca de senha)
+
+        A comparação usa o 'iat' do token, que tem resolução de segundos:
+        tokens emitidos no mesmo segundo da revogação continuam válidos,
+        exceto na exclusão da conta, que revoga também o segundo atual.
+
+        Args:
+            user_id (int): ID do usuário
+            account_deleted (bool): Conta excluída (nenhum token novo será emitido)
+        """
+        revoked_before = int(time.time()) + (1 if account_deleted else 0)
+        db.session.merge(UserRevocation(
+            user_id=user_id,
+            revoked_before=revoked_before,
+            updated_at=datetime.now()
+        ))
+        db.session.commit()
+
+        RevocationService._state().cutoffs[str(user_id)] = revoked_before
+
+    @staticmethod
+    def sweep_expired():
+        """
+        Remover do banco revogações que não têm mais efeito
+
+        Tokens revogados já expirados e revogações por usuário mais antigas
+        que a validade máxima de um token (refresh) são descartados.
+
+        Returns:
+            int: Quantidade de registros removidos
+        """
+        max_age = RevocationService._max_token_age()
+        removed = db.session.execute(
+            delete(RevokedToken).where(RevokedToken.expires_at <= datetime.now())
+        ).rowcount
+        removed += db.session.execute(
+            delete(UserRevocation).where(
+                UserRevocation.revoked_before <= int(time.time() - max_age.total_seconds())
+            )
+        ).rowcount
+        db.session.commit()
+        return removed
@@ -0,0 +1,136 @@
+"""
+Serviço de rebalanceamento de usuários entre shards
+"""
+
+from datetime import datetime
+
+from sqlalchemy import delete, insert, or_, select, update
+from src.models import db, User, UserDirectory
+from src.models.sharding import (
+    move_lock_cutoff, owner_column, shard_engine, shard_ring, sharded_tables, sharding_enabled
+)
+
+class ShardService:
+    """Serviço responsável por mover usuários entre shards"""
+
+    @staticmethod
+    def rebalance(batch_size=500, copy_batch_size=5000):
+        """
+        Mover para o shard indicado pelo anel todos os usuários fora do lugar
+
+        Depois de aumentar DATABASE_SHARDS, apenas a fração de usuários cujo
+        destino mudou no anel de hashing consistente é movida.
+
+        Args:
+            batch_size (int): Entradas do diretório lidas por vez
+            copy_batch_size (int): Linhas copiadas por insert ao mover um usuário
+
+        Returns:
+            tuple: (success: bool, message: str, stats: dict|None)
+        """
+        if not sharding_enabled():
+            return False, "Particionamento desativado (DATABASE_SHARDS=1)", None
+
+        ring = shard_ring()
+        stats = {'scanned': 0, 'moved': 0, 'failed': 0}
+        last_id = 0
+
+        while True:
+            with db.engine.connect() as conn:
+                entries = conn.execute(
+                    select(UserDirectory.user_id, UserDirectory.shard)
+                    .where(UserDirectory.user_id > last_id)
+                    .order_by(UserDirectory.user_id)
+                    .limit(batch_size)
+                ).all()
+            if not entries:
+                break
+
+            for user_id, shard in entries:
+                stats['scanned'] += 1
+                target = ring.shard_for(user_id)
+                if target == shard:
+                    continue
+                success, message = ShardService.move_user(user_id, shard, target, copy_batch_size)
+                stats['moved' if success else 'failed'] += 1
+            last_id = entries[-1][0]
+
+        return True, "Rebalanceamento concluído", stats
+
+    @staticmethod
+    def move_user(user_id, source, target, copy_batch_size=5000):
+        """
+        Mover todas as linhas de um usuário de um shard para outro
+
+        O usuário fica bloqueado no diretório durante a cópia, então
+        requisições novas falham em vez de escrever no shard antigo. As
+        que já passaram pelo diretório são cobertas pelo lock de escrita do
+        usuário no shard de origem (o mesmo de TaskService._lock_user),
+        mantido da cópia até a remoção das linhas antigas: escritas em
+        andamento terminam antes da cópia, e as seguintes não encontram mais
+        o usuário na origem e são recusadas. A troca no diretório só
+        acontece depois da cópia confirmada. A trava no diretório vence
+        depois de SHARD_MOVE_LOCK_SECONDS, então uma migração interrompida
+        não deixa o usuário bloqueado e pode ser repetida.
+
+        Args:
+            user_id (int): ID do usuário
+            source (int): Shard atual
+            target (int): Shard de destino
+            copy_batch_size (int): Linhas por insert
+
+        Returns:
+            tuple: (success: bool, message: str)
+        """
+        directory = UserDirectory.__table__
+        tables = sharded_tables()
+
+        # Uma trava vencida é de uma migração interrompida e pode ser retomada
+        with db.engine.begin() as conn:
+            locked = conn.execute(
+                update(directory)
+                .where(directory.c.user_id == user_id, directory.c.shard == source,
+                       or_(directory.c.locked.is_(False), directory.c.locked_at.is_(None),
+                           directory.c.locked_at < move_lock_cutoff()))
+                .values(locked=True, locked_at=datetime.now())
+            ).rowcount
+        if not locked:
+            return False, "Usuário já está sendo movido"
+
+        users = User.__table__
+        try:
+            with shard_engine(source).begin() as source_conn:
+                found = source_conn.execute(
+                    update(users).where(users.c.id == user_id).values(updated_at=users.c.updated_at)
+                ).rowcount
+                if not found:
+                    raise RuntimeError(f"usuário não está no shard {source}")
+                with shard_engine(target).begin() as target_conn:
+                    for table in tables:
+                        # Sobras de uma tentativa anterior interrompida
+                        target_conn.execute(delete(table).where(owner_column(table) == user_id))
+                        result = source_conn.execution_options(yield_per=copy_batch_size).execute(
+                            select(table).where(owner_column(table) == user_id)
+                        )
+                        for rows in result.mappings().partitions():
+                            target_conn.execute(insert(table), [dict(row) for row in rows])
+
+                for table in reversed(tables):
+                    source_conn.execute(delete(table).where(owner_column(table) == user_id))
+
+                # O shard 0 guarda o diretório: a troca entra na transação que já tem o lock
+                switch = update(directory).where(directory.c.user_id == user_id) \
+                    .values(shard=target, locked=False, locked_at=None)
+                if source == 0:
+                    source_conn.execute(switch)
+                else:
+                    with db.engine.begin() as conn:
+                        conn.execute(switch)
+        except Exception as e:
+            with db.engine.begin() as conn:
+                conn.execute(
+                    update(directory).where(directory.c.user_id == user_id).values(locked=False, locked_at=None)
+                )
+            return False, f"Erro ao mover usuário: {str(e)}"
+
+        return True, "Usuário movido com sucesso"
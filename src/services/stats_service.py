@@ -0,0 +1,172 @@
+"""
+Serviço de estatísticas de produtividade (tarefas concluídas por dia)
+"""
+
+from collections import Counter
+from datetime import date, timedelta
+
+from sqlalchemy import delete, func, insert, select, union_all, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from src.models import db, Task, TaskArchive, TaskDailyStat, TaskOccurrence
+from src.models.routing import read_only
+from src.models.sharding import shard_count, shard_engine, use_user_shard
+
+class StatsService:
+    """Serviço responsável pelos agregados diários de tarefas concluídas"""
+
+    BUCKETS = ['day', 'week']
+
+    # Período padrão e máximo de uma série
+    DEFAULT_DAYS = 90
+    MAX_DAYS = 731
+
+    @staticmethod
+    def record_completion(session, user_id, moment, delta):
+        """
+        Somar delta às conclusões do usuário no dia de moment
+
+        Chamado dentro da transação da escrita da tarefa (upsert com
+        ON CONFLICT), então o agregado nunca diverge da tabela de tarefas.
+
+        Args:
+            session: Sessão da escrita em andamento
+            user_id (int): ID do usuário
+            moment (datetime): Momento da conclusão
+            delta (int): +1 ao concluir, -1 ao reabrir ou excluir
+        """
+        table = TaskDailyStat.__table__
+        statement = sqlite_insert(table).values(user_id=user_id, day=moment.date(), completed=delta)
+        session.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.day],
+            set_={'completed': table.c.completed + statement.excluded.completed}
+        ))
+
+    @staticmethod
+    def record_purged_completions(session, task_ids):
+        """Descontar as conclusões de tarefas (e das ocorrências delas) que serão excluídas em lote"""
+        rows = session.execute(
+            select(Task.user_id, Task.completed_at).where(
+                Task.id.in_(task_ids), Task.completed_at.is_not(None)
+            )
+        ).all()
+        rows += session.execute(
+            select(TaskOccurrence.user_id, TaskOccurrence.completed_at).where(
+                TaskOccurrence.task_id.in_(task_ids), TaskOccurrence.completed_at.is_not(None)
+            )
+        ).all()
+        days = Counter((row.user_id, row.completed_at.date()) for row in rows)
+        table = TaskDailyStat.__table__
+        for (user_id, day), count in days.items():
+            session.execute(
+                update(table)
+                .where(table.c.user_id == user_id, table.c.day == day)
+                .values(completed=table.c.completed - count)
+            )
+
+    @staticmethod
+    @read_only
+    def get_completion_timeseries(user_id, start=None, end=None, bucket='day'):
+        """
+        Tarefas concluídas por dia ou semana em um período
+
+        Lê apenas o agregado diário: o custo depende da quantidade de dias,
+        não da quantidade de tarefas. Dias sem conclusões aparecem com zero.
+
+        Args:
+            user_id (int): ID do usuário
+            start (str): Primeiro dia (ISO 8601, padrão: DEFAULT_DAYS dias antes de end)
+            end (str): Último dia (ISO 8601, padrão: hoje)
+            bucket (str): 'day' ou 'week' (semanas começando na segunda-feira)
+
+        Returns:
+            tuple: (success: bool, message: str, data: dict|None)
+        """
+        try:
+            if bucket not in StatsService.BUCKETS:
+                return False, f"Agrupamento inválido. Use: {', '.join(StatsService.BUCKETS)}", None
+            try:
+                end = date.fromisoformat(end) if end else date.today()
+                start = date.fromisoformat(start) if start else end - timedelta(days=StatsService.DEFAULT_DAYS - 1)
+            except (TypeError, ValueError):
+                return False, "Data inválida. Use o formato AAAA-MM-DD", None
+            if start > end:
+                return False, "A data inicial deve ser anterior à final", None
+            if (end - start).days >= StatsService.MAX_DAYS:
+                return False, f"Período máximo de {StatsService.MAX_DAYS} dias", None
+
+            use_user_shard(user_id)
+            rows = db.session.execute(
+                select(TaskDailyStat.day, TaskDailyStat.completed).where(
+                    TaskDailyStat.user_id == user_id,
+                    TaskDailyStat.day >= start,
+                    TaskDailyStat.day <= end
+                )
+            ).all()
+
+            step = timedelta(days=7 if bucket == 'week' else 1)
+            first = start - timedelta(days=start.weekday()) if bucket == 'week' else start
+            counts = Counter()
+            for row in rows:
+                counts[row.day - timedelta(days=row.day.weekday()) if bucket == 'week' else row.day] += row.completed
+
+            series = []
+            current = first
+            while current <= end:
+                series.append({'date': current.isoformat(), 'completed': counts[current]})
+                current += step
+
+            data = {
+                'bucket': bucket,
+                'from': start.isoformat(),
+                'to': end.isoformat(),
+                'series': series,
+                'total': sum(point['completed'] for point in series)
+            }
+            return True, "Série obtida com sucesso", data
+
+        except Exception as e:
+            return False, f"Erro interno: {str(e)}", None
+
+    @staticmethod
+    def backfill_completions():
+        """
+        Reconstruir o agregado diário a partir das tarefas (ativas e
+        arquivadas) e das ocorrências concluídas de tarefas recorrentes
+
+        Tarefas concluídas antes da existência de completed_at recebem
+        updated_at como momento de conclusão. Cada shard é reconstruído em uma
+        transação, que bloqueia as escritas desse shard durante a execução.
+
+        Returns:
+            tuple: (success: bool, message: str, stats: dict)
+        """
+        stats = {'tasks': 0, 'days': 0}
+        stats_table = TaskDailyStat.__table__
+
+        try:
+            for shard in range(shard_count()):
+                with shard_engine(shard).begin() as conn:
+                    for model in (Task, TaskArchive):
+                        stats['tasks'] += conn.execute(
+                            update(model.__table__)
+                            .where(model.status == 'concluida', model.completed_at.is_(None))
+                            .values(completed_at=model.updated_at)
+                        ).rowcount
+
+                    completed = union_all(*(
+                        select(model.user_id, model.completed_at).where(model.completed_at.is_not(None))
+                        for model in (Task, TaskArchive, TaskOccurrence)
+                    )).subquery()
+                    day = func.date(completed.c.completed_at)
+                    conn.execute(delete(stats_table))
+                    stats['days'] += conn.execute(
+                        insert(stats_table).from_select(
+                            ['user_id', 'day', 'completed'],
+                            select(completed.c.user_id, day, func.count()).group_by(completed.c.user_id, day)
+                        )
+                    ).rowcount
+
+            return True, "Estatísticas reconstruídas", stats
+
+        except Exception as e:
+            return False, f"Erro interno: {str(e)}", stats
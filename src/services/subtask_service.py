@@ -0,0 +1,224 @@
+"""
+Serviço de subtarefas (hierarquia mantida na tabela de fechamento task_closure)
+"""
+
+from sqlalchemy import delete, func, insert, literal, or_, select, true, union_all
+from src.models import db, TaskClosure
+from src.models.routing import read_only
+from src.models.sharding import use_user_shard
+from src.services.tag_service import TagService
+from src.services.task_queries import (
+    TaskRow, ancestors_statement, find_statement, subtree_statement, subtree_stats_statement
+)
+
+class SubtaskService:
+    """Serviço responsável pela hierarquia de subtarefas"""
+
+    # Níveis de subtarefas abaixo de uma tarefa de primeiro nível
+    MAX_DEPTH = 10
+
+    @staticmethod
+    def check_parent(session, user_id, task_id, parent_id):
+        """
+        Verificar se a tarefa (com a subárvore dela) pode ficar sob parent_id
+
+        Args:
+            session: Sessão da escrita em andamento
+            user_id (int): ID do usuário
+            task_id (int): ID da tarefa movida (None para uma tarefa nova)
+            parent_id (int): ID da nova tarefa mãe, já verificada
+
+        Returns:
+            tuple: (is_valid: bool, message: str)
+        """
+        closure = TaskClosure.__table__
+        height = 0
+        if task_id is not None:
+            if task_id == parent_id or session.execute(
+                select(closure.c.depth).where(
+                    closure.c.user_id == user_id,
+                    closure.c.ancestor_id == task_id,
+                    closure.c.descendant_id == parent_id
+                )
+            ).first():
+                return False, "Uma tarefa não pode ficar sob ela mesma ou sob uma subtarefa dela"
+            height = session.execute(
+                select(func.coalesce(func.max(closure.c.depth), 0)).where(
+                    closure.c.user_id == user_id, closure.c.ancestor_id == task_id
+                )
+            ).scalar()
+
+        depth = session.execute(
+            select(func.count()).select_from(closure).where(
+                closure.c.user_id == user_id, closure.c.descendant_id == parent_id
+            )
+        ).scalar()
+        if depth + 1 + height > SubtaskService.MAX_DEPTH:
+            return False, f"Subtarefas podem ter no máximo {SubtaskService.MAX_DEPTH} níveis"
+        return True, "Tarefa mãe válida"
+
+    @staticmethod
+    def attach(session, user_id, task_id, parent_id):
+        """
+        Colocar a tarefa, com todas as descendentes, sob parent_id
+
+        A nova mãe e cada ancestral dela passam a ser ancestrais de toda a
+        subárvore, com as profundidades somadas: um único INSERT ... SELECT.
+        """
+        closure = TaskClosure.__table__
+        uppers = union_all(
+            select(literal(parent_id).label('ancestor_id'), literal(0).label('depth')),
+            select(closure.c.ancestor_id, closure.c.depth).where(
+                closure.c.user_id == user_id, closure.c.descendant_id == parent_id
+            )
+        ).subquery('uppers')
+        lowers = union_all(
+            select(literal(task_id).label('descendant_id'), literal(0).label('depth')),
+            select(closure.c.descendant_id, closure.c.depth).where(
+                closure.c.user_id == user_id, closure.c.ancestor_id == task_id
+            )
+        ).subquery('lowers')
+        session.execute(insert(closure).from_select(
+            ['user_id', 'ancestor_id', 'depth', 'descendant_id'],
+            select(
+                literal(user_id), uppers.c.ancestor_id,
+                uppers.c.depth + lowers.c.depth + 1, lowers.c.descendant_id
+            ).select_from(uppers.join(lowers, true()))
+        ))
+
+    @staticmethod
+    def detach(session, user_id, task_id):
+        """Desligar a tarefa, com todas as descendentes, dos ancestrais atuais"""
+        closure = TaskClosure.__table__
+        links = closure.alias('links')
+        session.execute(delete(closure).where(
+            closure.c.user_id == user_id,
+            closure.c.ancestor_id.in_(
+                select(links.c.ancestor_id).where(links.c.user_id == user_id, links.c.descendant_id == task_id)
+            ),
+            or_(
+                closure.c.descendant_id == task_id,
+                closure.c.descendant_id.in_(
+                    select(links.c.descendant_id).where(links.c.user_id == user_id, links.c.ancestor_id == task_id)
+                )
+            )
+        ))
+
+    @staticmethod
+    def descendants_query(user_id, task_id):
+        """Subconsulta com os IDs das descendentes, para comandos em conjunto"""
+        closure = TaskClosure.__table__
+        return select(closure.c.descendant_id).where(
+            closure.c.user_id == user_id, closure.c.ancestor_id == task_id
+        )
+
+    @staticmethod
+    def subtree_ids(session, user_id, task_id):
+        """IDs da tarefa e de todas as descendentes"""
+        return [task_id, *session.execute(SubtaskService.descendants_query(user_id, task_id)).scalars()]
+
+    @staticmethod
+    def purge_links(session, task_ids):
+        """Remover da hierarquia as tarefas excluídas em lote"""
+        closure = TaskClosure.__table__
+        session.execute(delete(closure).where(closure.c.descendant_id.in_(task_ids)))
+
+    @staticmethod
+    @read_only
+    def get_subtree(task_id, user_id):
+        """
+        Tarefa com todas as subtarefas, em qualquer nível, em uma consulta
+
+        Args:
+            task_id (int): ID da tarefa raiz
+            user_id (int): ID do usuário
+
+        Returns:
+            tuple: (success: bool, message: str, data: dict|None) com 'task' e
+            'subtasks' (por nível, cada uma com 'depth' e 'parent_id')
+        """
+        try:
+            use_user_shard(user_id)
+            parameters = {'task_id': task_id, 'user_id': user_id}
+            row = db.session.execute(find_statement(), parameters).first()
+            if not row:
+                return False, "Tarefa não encontrada", None
+
+            root = TaskRow(*row)
+            rows = db.session.execute(subtree_statement(), parameters).all()
+            subtasks = [TaskRow(*row[:-1]) for row in rows]
+            TagService.attach_tags([root, *subtasks])
+
+            data = {
+                'task': root.to_dict(),
+                'subtasks': [
+                    {**task.to_dict(), 'depth': row[-1]} for task, row in zip(subtasks, rows)
+                ]
+            }
+            return True, "Subtarefas obtidas com sucesso", data
+
+        except Exception as e:
+            return False, f"Erro interno: {str(e)}", None
+
+    @staticmethod
+    @read_only
+    def get_ancestors(task_id, user_id):
+        """
+        Ancestrais de uma tarefa, da mãe até a tarefa de primeiro nível
+
+        Args:
+            task_id (int): ID da tarefa
+            user_id (int): ID do usuário
+
+        Returns:
+            tuple: (success: bool, message: str, tasks: list|None)
+        """
+        try:
+            use_user_shard(user_id)
+            parameters = {'task_id': task_id, 'user_id': user_id}
+            if not db.session.execute(find_statement(), parameters).first():
+                return False, "Tarefa não encontrada", None
+
+            tasks = [TaskRow(*row) for row in db.session.execute(ancestors_statement(), parameters)]
+            TagService.attach_tags(tasks)
+            return True, "Ancestrais obtidos com sucesso", [task.to_dict() for task in tasks]
+
+        except Exception as e:
+            return False, f"Erro interno: {str(e)}", None
+
+    @staticmethod
+    @read_only
+    def get_subtree_statistics(task_id, user_id):
+        """
+        Conclusão da subárvore de uma tarefa (ela e todas as descendentes)
+
+        Args:
+            task_id (int): ID da tarefa raiz
+            user_id (int): ID do usuário
+
+        Returns:
+            tuple: (success: bool, message: str, stats: dict|None)
+        """
+        try:
+            use_user_shard(user_id)
+            parameters = {'task_id': task_id, 'user_id': user_id}
+            row = db.session.execute(find_statement(), parameters).first()
+            if not row:
+                return False, "Tarefa não encontrada", None
+
+            root = TaskRow(*row)
+            descendants, completed, depth = db.session.execute(subtree_stats_statement(), parameters).one()
+            total = descendants + 1
+            completed += root.status == 'concluida'
+
+            stats = {
+                'total': total,
+                'pendente': total - completed,
+                'concluida': completed,
+                'completion_rate': round(completed / total * 100, 2),
+                'depth': depth
+            }
+            return True, "Estatísticas obtidas com sucesso", stats
+
+        except Exception as e:
+            return False, f"Erro interno: {str(e)}", None
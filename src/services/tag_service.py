@@ -0,0 +1,175 @@
+"""
+Serviço de etiquetas (tags) das tarefas
+"""
+
+from collections import Counter, defaultdict
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from src.models import db, TaskTag, TagCount
+from src.models.routing import read_only
+from src.models.sharding import use_user_shard
+
+class TagService:
+    """Serviço responsável pelas etiquetas e pela contagem por etiqueta"""
+
+    MAX_TAG_LENGTH = 50
+    MAX_TAGS_PER_TASK = 20
+    MAX_FILTER_TAGS = 10
+    TAG_MODES = ['all', 'any']
+
+    @staticmethod
+    def normalize_tags(tags):
+        """
+        Validar e normalizar uma lista de etiquetas
+
+        As etiquetas são comparadas sem diferenciar maiúsculas: ficam em
+        minúsculas, sem espaços nas pontas e sem repetição.
+
+        Returns:
+            tuple: (is_valid: bool, message: str, tags: list|None)
+        """
+        if not isinstance(tags, (list, tuple)):
+            return False, "Tags devem ser uma lista", None
+        normalized = []
+        for tag in tags:
+            if not isinstance(tag, str) or not tag.strip():
+                return False, "Tags devem ser textos não vazios", None
+            tag = tag.strip().lower()
+            if len(tag) > TagService.MAX_TAG_LENGTH:
+                return False, f"Tags devem ter no máximo {TagService.MAX_TAG_LENGTH} caracteres", None
+            if tag not in normalized:
+                normalized.append(tag)
+        if len(normalized) > TagService.MAX_TAGS_PER_TASK:
+            return False, f"Use no máximo {TagService.MAX_TAGS_PER_TASK} tags por tarefa", None
+        return True, "Tags válidas", sorted(normalized)
+
+    @staticmethod
+    def set_task_tags(session, user_id, task_id, tags):
+        """
+        Substituir as etiquetas de uma tarefa, ajustando as contagens
+
+        Executado na transação da escrita da tarefa; só as etiquetas que
+        mudaram são gravadas.
+
+        Args:
+            session: Sessão da escrita em andamento
+            user_id (int): ID do usuário
+            task_id (int): ID da tarefa
+            tags (list): Etiquetas já normalizadas
+
+        Returns:
+            bool: True se alguma etiqueta mudou
+        """
+        current = set(session.execute(
+            select(TaskTag.tag).where(TaskTag.task_id == task_id)
+        ).scalars())
+        added = set(tags) - current
+        removed = current - set(tags)
+
+        if removed:
+            session.execute(delete(TaskTag).where(
+                TaskTag.user_id == user_id, TaskTag.tag.in_(removed), TaskTag.task_id == task_id
+            ))
+        if added:
+            session.execute(TaskTag.__table__.insert(), [
+                {'user_id': user_id, 'tag': tag, 'task_id': task_id} for tag in added
+            ])
+        TagService._adjust_counts(session, {(user_id, tag): 1 for tag in added})
+        TagService._adjust_counts(session, {(user_id, tag): -1 for tag in removed})
+        return bool(added or removed)
+
+    @staticmethod
+    def purge_task_tags(session, task_ids):
+        """Remover as etiquetas de tarefas excluídas em lote, descontando as contagens"""
+        rows = session.execute(
+            select(TaskTag.user_id, TaskTag.tag).where(TaskTag.task_id.in_(task_ids))
+        ).all()
+        if not rows:
+            return
+        session.execute(delete(TaskTag).where(TaskTag.task_id.in_(task_ids)))
+        removed = Counter((row.user_id, row.tag) for row in rows)
+        TagService._adjust_counts(session, {key: -count for key, count in removed.items()})
+
+    @staticmethod
+    def _adjust_counts(session, deltas):
+        """Somar deltas às contagens por (usuário, etiqueta), removendo as que zeram"""
+        table = TagCount.__table__
+        emptied = defaultdict(list)
+        for (user_id, tag), delta in deltas.items():
+            if delta > 0:
+                statement = sqlite_insert(table).values(user_id=user_id, tag=tag, count=delta)
+                session.execute(statement.on_conflict_do_update(
+                    index_elements=[table.c.user_id, table.c.tag],
+                    set_={'count': table.c.count + statement.excluded.count}
+                ))
+            elif delta < 0:
+                session.execute(
+                    update(table)
+                    .where(table.c.user_id == user_id, table.c.tag == tag)
+                    .values(count=table.c.count + delta)
+                )
+                emptied[user_id].append(tag)
+        for user_id, tags in emptied.items():
+            session.execute(delete(table).where(
+                table.c.user_id == user_id, table.c.tag.in_(tags), table.c.count <= 0
+            ))
+
+    @staticmethod
+    def load_tags(task_ids, session=None):
+        """
+        Etiquetas de várias tarefas em uma consulta
+
+        Args:
+            task_ids (list): IDs das tarefas
+            session: Sessão a usar (padrão: a sessão da requisição)
+
+        Returns:
+            dict: task_id -> lista de etiquetas em ordem alfabética
+        """
+        tags = defaultdict(list)
+        if task_ids:
+            rows = (session or db.session).execute(
+                select(TaskTag.task_id, TaskTag.tag)
+                .where(TaskTag.task_id.in_(task_ids))
+                .order_by(TaskTag.task_id, TaskTag.tag)
+            )
+            for task_id, tag in rows:
+                tags[task_id].append(tag)
+        return tags
+
+    @staticmethod
+    def attach_tags(tasks):
+        """Preencher as etiquetas de uma lista de TaskRow com uma consulta"""
+        tags = TagService.load_tags([task.id for task in tasks])
+        for task in tasks:
+            task.tags = tags.get(task.id, [])
+
+    @staticmethod
+    @read_only
+    def get_tag_cloud(user_id, limit=100):
+        """
+        Etiquetas do usuário com a quantidade de tarefas de cada uma
+
+        Lê as contagens mantidas a cada escrita, das mais usadas para as
+        menos usadas.
+
+        Args:
+            user_id (int): ID do usuário
+            limit (int): Máximo de etiquetas
+
+        Returns:
+            tuple: (success: bool, message: str, tags: list|None)
+        """
+        try:
+            use_user_shard(user_id)
+            rows = db.session.execute(
+                select(TagCount.tag, TagCount.count)
+                .where(TagCount.user_id == user_id)
+                .order_by(TagCount.count.desc(), TagCount.tag.desc())
+                .limit(limit)
+            ).all()
+            return True, "Tags obtidas com sucesso", [{'tag': row.tag, 'count': row.count} for row in rows]
+
+        except Exception as e:
+            return False, f"Erro interno: {str(e)}", None
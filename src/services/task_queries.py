@@ -0,0 +1,241 @@
+"""
+Consultas de leitura de tarefas em SQLAlchemy Core
+"""
+
+import threading
+
+from sqlalchemy import and_, bindparam, case, func, literal_column, select, union_all
+from src.models import Task, TaskArchive, TaskClosure, TaskTag
+
+# Colunas lidas pelas rotas, na ordem dos argumentos de TaskRow
+TASK_COLUMNS = ('id', 'name', 'description', 'status', 'user_id', 'created_at', 'updated_at', 'completed_at', 'parent_id',
+                'recurrence', 'due_at', 'version')
+
+class TaskRow:
+    """
+    Tarefa somente leitura devolvida pelas consultas de leitura
+
+    Não passa pelo ORM: não entra no identity map da sessão nem guarda estado
+    de instrumentação, apenas os valores das colunas e as etiquetas. archived
+    é None nas consultas que não incluem o arquivo (e então não aparece no
+    dicionário).
+    """
+    __slots__ = TASK_COLUMNS + ('archived', 'tags')
+
+    def __init__(self, id, name, description, status, user_id, created_at, updated_at, completed_at,
+                 parent_id, recurrence, due_at, version, archived=None):
+        self.id = id
+        self.name = name
+        self.description = description
+        self.status = status
+        self.user_id = user_id
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.completed_at = completed_at
+        self.parent_id = parent_id
+        self.recurrence = recurrence
+        self.due_at = due_at
+        self.version = version
+        self.archived = archived
+        self.tags = []
+
+    def to_dict(self):
+        """Converte a tarefa para dicionário (mesmo formato de Task.to_dict)"""
+        data = {
+            'id': self.id,
+            'name': self.name,
+            'description': self.description,
+            'status': self.status,
+            'user_id': self.user_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'parent_id': self.parent_id,
+            'recurrence': self.recurrence,
+            'due_at': self.due_at.isoformat() if self.due_at else None,
+            'version': self.version,
+            'tags': self.tags
+        }
+        if self.archived is not None:
+            data['archived'] = bool(self.archived)
+        return data
+
+# Statements montados uma única vez por formato; os valores vão nos parâmetros
+_statements = {}
+_statements_lock = threading.Lock()
+
+def _cached(key, build):
+    statement = _statements.get(key)
+    if statement is None:
+        with _statements_lock:
+            statement = _statements.get(key)
+            if statement is None:
+                statement = _statements[key] = build()
+    return statement
+
+def _columns(table, archived=None):
+    columns = [table.c[name] for name in TASK_COLUMNS]
+    if archived is not None:
+        columns.append(literal_column('1' if archived else '0').label('archived'))
+    return columns
+
+def _conditions(table, with_status, ranges, tags=(0, 'all')):
+    conditions = [table.c.user_id == bindparam('user_id')]
+    if with_status:
+        conditions.append(table.c.status == bindparam('status'))
+    for index, (column, operator) in enumerate(ranges):
+        value = bindparam(f'range_{index}')
+        conditions.append(table.c[column] > value if operator == '>' else table.c[column] < value)
+    if tags[0]:
+        conditions.append(table.c.id.in_(_tagged_ids(*tags)))
+    return conditions
+
+def _tagged_ids(count, mode):
+    """
+    IDs das tarefas com todas ('all') ou alguma ('any') das etiquetas
+
+    Cada etiqueta é uma busca na chave primária (user_id, tag, task_id) de
+    task_tags. Para 'all', as etiquetas seguintes são junções na mesma chave
+    (interseção pelo índice, sem materializar um INTERSECT); para 'any', um
+    único IN sobre a etiqueta.
+    """
+    table = TaskTag.__table__
+    if mode == 'any' or count == 1:
+        return select(table.c.task_id).where(
+            table.c.user_id == bindparam('user_id'),
+            table.c.tag.in_([bindparam(f'tag_{index}') for index in range(count)])
+        )
+    first = table.alias('tag_0')
+    query = select(first.c.task_id).where(first.c.user_id == bindparam('user_id'), first.c.tag == bindparam('tag_0'))
+    for index in range(1, count):
+        other = table.alias(f'tag_{index}')
+        query = query.join(other, and_(
+            other.c.user_id == first.c.user_id,
+            other.c.tag == bindparam(f'tag_{index}'),
+            other.c.task_id == first.c.task_id
+        ))
+    return query
+
+def _order(columns, sort):
+    """Ordenação do formato, com o ID como desempate (também coberto pelo índice)"""
+    order = [columns[column].desc() if descending else columns[column].asc() for column, descending in sort]
+    order.append(columns.id.desc() if sort[-1][1] else columns.id.asc())
+    return order
+
+def page_statements(with_status, shape, include_archived=False):
+    """
+    Consultas de uma página da listagem e da contagem total
+
+    Args:
+        with_status (bool): Filtrar pelo parâmetro 'status'
+        shape (dict): Formato validado por TaskService.parse_list_shape
+        include_archived (bool): Incluir tasks_archive (UNION ALL)
+
+    Returns:
+        tuple: (página, contagem) com parâmetros user_id, status, range_N, tag_N, limit e offset
+    """
+    sort = tuple(shape['sort'])
+    ranges = tuple((column, operator) for column, operator, moment in shape['ranges'])
+    tags = (len(shape.get('tags', ())), shape.get('tag_mode', 'all'))
+
+    def build():
+        tasks = Task.__table__
+        if include_archived:
+            archive = TaskArchive.__table__
+            source = union_all(
+                select(*_columns(tasks, False)).where(*_conditions(tasks, with_status, ranges, tags)),
+                select(*_columns(archive, True)).where(*_conditions(archive, with_status, ranges, tags))
+            ).subquery()
+            rows = select(source)
+            count = select(func.count()).select_from(source)
+        else:
+            source = tasks
+            rows = select(*_columns(tasks)).where(*_conditions(tasks, with_status, ranges, tags))
+            count = select(func.count()).select_from(tasks).where(*_conditions(tasks, with_status, ranges, tags))
+        rows = rows.order_by(*_order(source.c, sort)).limit(bindparam('limit')).offset(bindparam('offset'))
+        return rows, count
+
+    return _cached(('page', with_status, sort, ranges, tags, include_archived), build)
+
+def page_parameters(user_id, status, shape, page, per_page):
+    """Parâmetros de page_statements para a página solicitada"""
+    parameters = {'user_id': user_id, 'limit': per_page, 'offset': (page - 1) * per_page}
+    if status:
+        parameters['status'] = status
+    for index, (column, operator, moment) in enumerate(shape['ranges']):
+        parameters[f'range_{index}'] = moment
+    for index, tag in enumerate(shape.get('tags', ())):
+        parameters[f'tag_{index}'] = tag
+    return parameters
+
+def find_statement():
+    """Consulta de uma tarefa do usuário (parâmetros task_id e user_id)"""
+    def build():
+        tasks = Task.__table__
+        return select(*_columns(tasks)).where(
+            tasks.c.id == bindparam('task_id'),
+            tasks.c.user_id == bindparam('user_id')
+        )
+
+    return _cached(('find',), build)
+
+def export_statement(archived):
+    """Todas as tarefas ativas (ou arquivadas) do usuário, por data de criação (parâmetro user_id)"""
+    def build():
+        table = TaskArchive.__table__ if archived else Task.__table__
+        return select(*_columns(table, archived)).where(
+            table.c.user_id == bindparam('user_id')
+        ).order_by(table.c.created_at, table.c.id)
+
+    return _cached(('export', archived), build)
+
+def subtree_statement():
+    """
+    Descendentes de uma tarefa, nível a nível (parâmetros task_id e user_id)
+
+    Uma busca na chave primária de task_closure, que já está na ordem
+    (profundidade, ID); a última coluna é a profundidade.
+    """
+    def build():
+        tasks = Task.__table__
+        closure = TaskClosure.__table__
+        return select(*_columns(tasks), closure.c.depth).select_from(
+            closure.join(tasks, tasks.c.id == closure.c.descendant_id)
+        ).where(
+            closure.c.user_id == bindparam('user_id'),
+            closure.c.ancestor_id == bindparam('task_id')
+        ).order_by(closure.c.depth, closure.c.descendant_id)
+
+    return _cached(('subtree',), build)
+
+def ancestors_statement():
+    """Ancestrais de uma tarefa, da mãe para a raiz (parâmetros task_id e user_id)"""
+    def build():
+        tasks = Task.__table__
+        closure = TaskClosure.__table__
+        return select(*_columns(tasks)).select_from(
+            closure.join(tasks, tasks.c.id == closure.c.ancestor_id)
+        ).where(
+            closure.c.descendant_id == bindparam('task_id'),
+            closure.c.user_id == bindparam('user_id')
+        ).order_by(closure.c.depth)
+
+    return _cached(('ancestors',), build)
+
+def subtree_stats_statement():
+    """Total e concluídas entre os descendentes de uma tarefa (parâmetros task_id e user_id)"""
+    def build():
+        tasks = Task.__table__
+        closure = TaskClosure.__table__
+        return select(
+            func.count(),
+            func.coalesce(func.sum(case((tasks.c.status == 'concluida', 1), else_=0)), 0),
+            func.coalesce(func.max(closure.c.depth), 0)
+        ).select_from(
+            closure.join(tasks, tasks.c.id == closure.c.descendant_id)
+        ).where(
+            closure.c.user_id == bindparam('user_id'),
+            closure.c.ancestor_id == bindparam('task_id')
+        )
+
+    return _cached(('subtree_stats',), build)
@@ -2,14 +2,50 @@
 Serviço de gerenciamento de tarefas
 """
 
-from src.models import db, Task, User
-from sqlalchemy import and_
+from datetime import date, datetime
+
+from flask import current_app
+from src.models import db, Task, TaskOccurrence, User
+from src.models.routing import read_only
+from src.models.sharding import allocate_id, check_user_shard, sharding_enabled, use_user_shard
+from src.services.background import submit_job
+from src.services.fractional_index import key_between
+from src.services.group_commit import group_committer
+from src.services.recurrence_service import RecurrenceService
+from src.services.reminders import schedule_reminder
+from src.services.response_cache import bump_user_version
+from src.services.stats_service import StatsService
+from src.services.subtask_service import SubtaskService
+from src.services.tag_service import TagService
+from src.services.task_queries import (
+    TaskRow, export_statement, find_statement, page_parameters, page_statements
+)
+from sqlalchemy import and_, bindparam, delete, func, or_, select, update
+from sqlalchemy.orm.exc import StaleDataError
 
 class TaskService:
     """Serviço responsável pelo gerenciamento de tarefas"""
     
     VALID_STATUSES = ['pendente', 'concluida']
     
+    # A tarefa mudou desde a versão lida pelo cliente (If-Match) ou durante a escrita
+    VERSION_CONFLICT = "A tarefa foi alterada por outra requisição"
+    
+    # Ordenações da listagem: uma coluna ou 'status' seguido de uma coluna,
+    # com '-' para ordem decrescente. Cada formato é atendido por um índice
+    # (user_id, [status,] coluna), sem varrer a tabela nem ordenar em memória;
+    # 'position' (ordem manual) só tem o índice (user_id, position).
+    SORT_COLUMNS = ['name', 'created_at', 'updated_at', 'position']
+    DEFAULT_SORT = '-created_at'
+    
+    # Filtros de período: parâmetro -> (coluna, operador)
+    DATE_FILTERS = {
+        'created_after': ('created_at', '>'),
+        'created_before': ('created_at', '<'),
+        'updated_after': ('updated_at', '>'),
+        'updated_before': ('updated_at', '<')
+    }
+    
     @staticmethod
     def validate_task_data(name, description=None, status=None):
         """
@@ -23,10 +59,11 @@ class TaskService:
         Returns:
             tuple: (is_valid: bool, message: str)
         """
-        if not name or not name.strip():
+        name = name.strip() if name else name
+        if not name:
             return False, "Nome da tarefa é obrigatório"
         
-        if len(name.strip()) > 200:
+        if len(name) > 200:
             return False, "Nome da tarefa deve ter no máximo 200 caracteres"
         
         if description and len(description) > 1000:
@@ -38,7 +75,29 @@ class TaskService:
         return True, "Dados válidos"
     
     @staticmethod
-    def create_task(user_id, name, description=None, status='pendente'):
+    def parse_due_at(value):
+        """
+        Validar o prazo de uma tarefa
+        
+        Args:
+            value (str): Data e hora ISO 8601; texto vazio remove o prazo
+            
+        Returns:
+            tuple: (is_valid: bool, message: str, due_at: datetime|None)
+        """
+        if value == '':
+            return True, "Prazo removido", None
+        try:
+            due_at = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            return False, "Prazo inválido. Use o formato ISO 8601", None
+        if due_at.tzinfo is not None:
+            due_at = due_at.astimezone().replace(tzinfo=None)
+        return True, "Prazo válido", due_at
+    
+    @staticmethod
+    def create_task(user_id, name, description=None, status='pendente', tags=None, parent_id=None,
+                    recurrence=None, due_at=None):
         """
         Criar nova tarefa
         
@@ -47,6 +106,10 @@ class TaskService:
             name (str): Nome da tarefa
             description (str): Descrição da tarefa
             status (str): Status da tarefa
+            tags (list): Etiquetas da tarefa
+            parent_id (int): Tarefa mãe, para criar uma subtarefa
+            recurrence (str): Regra de recorrência ('diaria' ou 'semanal')
+            due_at (str): Prazo (ISO 8601), com lembrete quando vencer
             
         Returns:
             tuple: (success: bool, message: str, task: Task|None)
@@ -57,75 +120,158 @@ class TaskService:
             if not is_valid:
                 return False, message, None
             
-            # Verificar se usuário existe
-            user = User.query.get(user_id)
-            if not user:
-                return False, "Usuário não encontrado", None
-            
-            # Criar tarefa
-            task = Task(
-                name=name.strip(),
-                description=description.strip() if description else None,
-                status=status,
-                user_id=user_id
-            )
+            is_valid, message, tags = TagService.normalize_tags(tags or [])
+            if not is_valid:
+                return False, message, None
             
-            db.session.add(task)
-            db.session.commit()
+            if recurrence is not None and recurrence not in RecurrenceService.RULES:
+                return False, f"Recorrência deve ser uma das seguintes: {', '.join(RecurrenceService.RULES)}", None
             
-            return True, "Tarefa criada com sucesso", task
+            if due_at is not None:
+                is_valid, message, due_at = TaskService.parse_due_at(due_at)
+                if not is_valid:
+                    return False, message, None
+            
+            shard = use_user_shard(user_id)
+            # IDs de tarefas são globais para que um usuário possa mudar de shard.
+            # Reservar antes da escrita: no group commit do shard 0, a transação
+            # do lote já segura o lock de escrita do banco primário
+            task_id = allocate_id('tasks') if sharding_enabled() else None
+            
+            def operation(session):
+                # Verificar se usuário existe
+                user = session.get(User, user_id)
+                if not user:
+                    return False, "Usuário não encontrado", None
+                
+                if parent_id is not None:
+                    success, message, parent = TaskService._find_user_task(parent_id, user_id, session)
+                    if not success:
+                        return False, "Tarefa mãe não encontrada", None
+                    is_valid, message = SubtaskService.check_parent(session, user_id, None, parent_id)
+                    if not is_valid:
+                        return False, message, None
+                
+                # Criar tarefa
+                task = Task(
+                    name=name.strip(),
+                    description=description.strip() if description else None,
+                    status=status,
+                    user_id=user_id,
+                    parent_id=parent_id,
+                    recurrence=recurrence,
+                    due_at=due_at
+                )
+                if status == 'concluida':
+                    task.completed_at = datetime.now()
+                    StatsService.record_completion(session, user_id, task.completed_at, 1)
+                if task_id is not None:
+                    task.id = task_id
+                # Novas tarefas entram no fim da ordem manual
+                task.position = key_between(
+                    session.execute(select(func.max(Task.position)).where(Task.user_id == user_id)).scalar(),
+                    None
+                )
+                
+                session.add(task)
+                task.tags = tags
+                if tags or parent_id is not None:
+                    session.flush()
+                if tags:
+                    TagService.set_task_tags(session, user_id, task.id, tags)
+                if parent_id is not None:
+                    SubtaskService.attach(session, user_id, task.id, parent_id)
+                return True, "Tarefa criada com sucesso", task
+            
+            result = TaskService._run_write(user_id, shard, operation, lock_user=True)
+            if result[0]:
+                schedule_reminder(shard, result[2].id, result[2].due_at)
+            return result
             
         except Exception as e:
             db.session.rollback()
             return False, f"Erro interno: {str(e)}", None
     
     @staticmethod
-    def get_user_tasks(user_id, status=None, page=1, per_page=20):
+    @read_only
+    def get_user_tasks(user_id, status=None, page=1, per_page=20, include_archived=False,
+                       sort=None, date_filters=None, tags=None, tag_mode='all',
+                       occurrences_from=None, occurrences_to=None):
         """
         Obter tarefas do usuário
         
+        Com occurrences_from, o resultado traz também 'occurrences': as
+        ocorrências das tarefas recorrentes no período, geradas pela regra
+        (apenas as concluídas ou alteradas existem no banco).
+        
         Args:
             user_id (int): ID do usuário
             status (str): Filtro por status (opcional)
             page (int): Página para paginação
             per_page (int): Itens por página
+            include_archived (bool): Incluir tarefas arquivadas
+            sort (str): Ordenação, ex.: 'name', '-updated_at', 'status,-created_at'
+            date_filters (dict): Filtros de período (chaves de DATE_FILTERS, datas ISO 8601)
+            tags (list): Etiquetas exigidas
+            tag_mode (str): 'all' (todas as etiquetas) ou 'any' (qualquer uma)
+            occurrences_from (str): Primeiro dia de ocorrências (AAAA-MM-DD)
+            occurrences_to (str): Último dia de ocorrências (padrão: occurrences_from)
             
         Returns:
             tuple: (success: bool, message: str, data: dict|None)
         """
         try:
-            # Construir query base
-            query = Task.query.filter_by(user_id=user_id)
-            
-            # Aplicar filtro de status se fornecido
-            if status:
-                if status not in TaskService.VALID_STATUSES:
-                    return False, f"Status inválido. Use: {', '.join(TaskService.VALID_STATUSES)}", None
-                query = query.filter_by(status=status)
-            
-            # Ordenar por data de criação (mais recentes primeiro)
-            query = query.order_by(Task.created_at.desc())
-            
-            # Aplicar paginação
-            pagination = query.paginate(
-                page=page,
-                per_page=per_page,
-                error_out=False
+            use_user_shard(user_id)
+            
+            if status and status not in TaskService.VALID_STATUSES:
+                return False, f"Status inválido. Use: {', '.join(TaskService.VALID_STATUSES)}", None
+            
+            is_valid, message, shape = TaskService.parse_list_shape(
+                status, sort, date_filters, include_archived
             )
+            if not is_valid:
+                return False, message, None
             
-            tasks = [task.to_dict() for task in pagination.items]
+            if tags:
+                is_valid, message, shape['tags'] = TagService.normalize_tags(tags)
+                if not is_valid:
+                    return False, message, None
+                if len(shape['tags']) > TagService.MAX_FILTER_TAGS:
+                    return False, f"Filtre por no máximo {TagService.MAX_FILTER_TAGS} tags", None
+                if tag_mode not in TagService.TAG_MODES:
+                    return False, f"Modo de tags inválido. Use: {', '.join(TagService.TAG_MODES)}", None
+                shape['tag_mode'] = tag_mode
+            
+            window = None
+            if occurrences_from is not None or occurrences_to is not None:
+                is_valid, message, window = RecurrenceService.parse_window(occurrences_from, occurrences_to)
+                if not is_valid:
+                    return False, message, None
+            
+            # Consultas Core pré-montadas por formato: as linhas não passam pelo ORM
+            page = max(page, 1)
+            per_page = per_page if per_page >= 1 else 20
+            rows_query, count_query = page_statements(bool(status), shape, include_archived)
+            parameters = page_parameters(user_id, status, shape, page, per_page)
+            
+            total = db.session.execute(count_query, parameters).scalar()
+            tasks = [TaskRow(*row) for row in db.session.execute(rows_query, parameters)]
+            pages = -(-total // per_page) if total else 0
+            TagService.attach_tags(tasks)
             
             data = {
-                'tasks': tasks,
+                'tasks': [task.to_dict() for task in tasks],
                 'pagination': {
-                    'page': pagination.page,
-                    'pages': pagination.pages,
-                    'per_page': pagination.per_page,
-                    'total': pagination.total,
-                    'has_next': pagination.has_next,
-                    'has_prev': pagination.has_prev
+                    'page': page,
+                    'pages': pages,
+                    'per_page': per_page,
+                    'total': total,
+                    'has_next': page < pages,
+                    'has_prev': page > 1
                 }
             }
+            if window is not None:
+                data['occurrences'] = RecurrenceService.expand(db.session, user_id, window, status)
             
             return True, "Tarefas obtidas com sucesso", data
             
@@ -133,6 +279,100 @@ class TaskService:
             return False, f"Erro interno: {str(e)}", None
     
     @staticmethod
+    def parse_list_shape(status=None, sort=None, date_filters=None, include_archived=False):
+        """
+        Validar a ordenação e os filtros de período de uma listagem
+        
+        Apenas formatos atendidos por um índice são aceitos: o filtro de
+        período deve ser em uma única coluna, e a mesma coluna deve ser a da
+        ordenação (sem 'sort', ela passa a ser a ordenação, decrescente).
+        
+        Args:
+            status (str): Filtro por status já validado
+            sort (str): Ordenação solicitada
+            date_filters (dict): Filtros de período solicitados
+            include_archived (bool): Listagem incluindo tarefas arquivadas
+            
+        Returns:
+            tuple: (is_valid: bool, message: str, shape: dict|None)
+        """
+        ranges = []
+        for name, value in (date_filters or {}).items():
+            if name not in TaskService.DATE_FILTERS:
+                return False, f"Filtro inválido: {name}", None
+            try:
+                moment = datetime.fromisoformat(value)
+            except (TypeError, ValueError):
+                return False, f"Data inválida em {name}. Use o formato ISO 8601", None
+            if moment.tzinfo is not None:
+                moment = moment.astimezone().replace(tzinfo=None)
+            column, operator = TaskService.DATE_FILTERS[name]
+            ranges.append((column, operator, moment))
+        
+        range_columns = {column for column, operator, moment in ranges}
+        if len(range_columns) > 1:
+            return False, "Use filtros de período de apenas uma coluna (created_* ou updated_*)", None
+        
+        if sort is None and range_columns:
+            keys = [(range_columns.pop(), True)]
+        else:
+            keys = []
+            for part in (sort or TaskService.DEFAULT_SORT).split(','):
+                column = part.strip().lstrip('-+')
+                if column != 'status' and column not in TaskService.SORT_COLUMNS:
+                    return False, f"Ordenação inválida. Use: status, {', '.join(TaskService.SORT_COLUMNS)}", None
+                keys.append((column, part.strip().startswith('-')))
+            
+            if keys[0][0] == 'status' and len(keys) == 1:
+                keys.append(('created_at', keys[0][1]))
+            if len(keys) > 2 or (len(keys) == 2 and (keys[0][0] != 'status' or keys[1][0] == 'status')):
+                return False, "Ordene por uma coluna ou por status seguido de uma coluna", None
+            if len(keys) == 2 and keys[0][1] != keys[1][1]:
+                return False, "Status e a segunda coluna devem ser ordenados na mesma direção", None
+            
+            # Com filtro de status, ordenar por status não muda nada
+            if status and len(keys) == 2:
+                keys = keys[1:]
+            if len(keys) == 2 and keys[1][0] == 'position':
+                return False, "A ordem manual (position) não pode ser combinada com status", None
+            
+            if range_columns:
+                column = next(iter(range_columns))
+                if len(keys) != 1 or keys[0][0] != column:
+                    return False, f"Filtros por {column} exigem ordenar por {column}", None
+        
+        if include_archived and any(column != 'created_at' for column, descending in keys):
+            return False, "Com include_archived, apenas ordenação e filtros por created_at são suportados", None
+        
+        return True, "Formato válido", {'sort': keys, 'ranges': ranges}
+    
+    @staticmethod
+    def iter_user_tasks(user_id, include_archived=False, batch_size=500):
+        """
+        Percorrer todas as tarefas do usuário para exportação
+        
+        As linhas são lidas em lotes (yield_per), então a memória não cresce
+        com a quantidade de tarefas.
+        
+        Args:
+            user_id (int): ID do usuário
+            include_archived (bool): Incluir tarefas arquivadas (depois das ativas)
+            batch_size (int): Linhas lidas por vez
+            
+        Yields:
+            dict: Tarefa no formato de Task.to_dict (com 'archived')
+        """
+        use_user_shard(user_id)
+        for archived in ((False, True) if include_archived else (False,)):
+            query = export_statement(archived).execution_options(yield_per=batch_size)
+            for rows in db.session.execute(query, {'user_id': user_id}).partitions():
+                tasks = [TaskRow(*row) for row in rows]
+                TagService.attach_tags(tasks)
+                for task in tasks:
+                    yield task.to_dict()
+    
+    @staticmethod
+    @read_only
     def get_task_by_id(task_id, user_id):
         """
         Obter tarefa por ID (verificando se pertence ao usuário)
@@ -142,10 +382,32 @@ class TaskService:
             user_id (int): ID do usuário
             
         Returns:
-            tuple: (success: bool, message: str, task: Task|None)
+            tuple: (success: bool, message: str, task: TaskRow|None)
         """
         try:
-            task = Task.query.filter(
+            use_user_shard(user_id)
+            row = db.session.execute(
+                find_statement(), {'task_id': task_id, 'user_id': user_id}
+            ).first()
+            
+            if not row:
+                return False, "Tarefa não encontrada", None
+            
+            task = TaskRow(*row)
+            TagService.attach_tags([task])
+            return True, "Tarefa encontrada", task
+            
+        except Exception as e:
+            return False, f"Erro interno: {str(e)}", None
+    
+    @staticmethod
+    def _find_user_task(task_id, user_id, session=None):
+        """Buscar tarefa do usuário sem roteamento para réplica (usado em escritas)"""
+        try:
+            if session is None:
+                use_user_shard(user_id)
+                session = db.session
+            task = session.query(Task).filter(
                 and_(Task.id == task_id, Task.user_id == user_id)
             ).first()
             
@@ -158,79 +420,494 @@ class TaskService:
             return False, f"Erro interno: {str(e)}", None
     
     @staticmethod
-    def update_task(task_id, user_id, name=None, description=None, status=None):
+    def _run_write(user_id, shard, operation, lock_user=False):
+        """
+        Executar uma operação de escrita e confirmar a transação
+        
+        Com GROUP_COMMIT_WINDOW_MS configurado, a operação entra no lote do
+        group committer do shard e compartilha o COMMIT com as escritas
+        concorrentes; caso contrário, roda na sessão da requisição. Depois
+        do COMMIT, as respostas do usuário em cache são invalidadas.
+        
+        Com lock_user, ou com o particionamento ativo, a transação começa
+        pelo lock do usuário (_lock_user) e a operação só roda depois dele.
+        
+        Args:
+            user_id (int): ID do usuário dono dos dados
+            shard (int): Shard do usuário (0 = banco principal)
+            operation (callable): Função que recebe a sessão e devolve o resultado
+            lock_user (bool): Travar o usuário mesmo sem particionamento
+            
+        Returns:
+            tuple: Resultado da operação (o primeiro item indica sucesso)
+        """
+        if lock_user or sharding_enabled():
+            unlocked = operation
+            
+            def operation(session):
+                TaskService._lock_user(session, user_id, shard)
+                return unlocked(session)
+        
+        committer = group_committer(shard)
+        if committer is not None:
+            result = committer.submit(operation)
+            # A escrita foi em outra sessão: as leituras seguintes da requisição ficam no primário
+            db.session.info['wrote'] = True
+        else:
+            result = operation(db.session)
+            if result[0]:
+                db.session.commit()
+            else:
+                db.session.rollback()
+        
+        if result[0]:
+            bump_user_version(user_id)
+        return result
+    
+    @staticmethod
+    def _lock_user(session, user_id, shard):
+        """
+        Abrir a transação com o lock de escrita na linha do usuário
+        
+        O UPDATE sem efeito trava o usuário (no SQLite, o banco inteiro) até
+        o COMMIT, então as escritas do mesmo usuário ficam em série:
+        - chaves de posição calculadas a partir das chaves lidas não se
+          repetem (ix_tasks_user_id_position);
+        - ShardService.move_user segura o mesmo lock no shard de origem da
+          cópia até a remoção das linhas. Se o usuário não está mais no
+          shard, o diretório é conferido de novo e uma escrita que passou
+          por use_user_shard antes da migração é recusada.
+        """
+        users = User.__table__
+        found = session.execute(
+            update(users).where(users.c.id == user_id).values(updated_at=users.c.updated_at)
+        ).rowcount
+        if not found and sharding_enabled():
+            check_user_shard(user_id, shard)
+    
+    @staticmethod
+    def update_task(task_id, user_id, name=None, description=None, status=None, tags=None,
+                    due_at=None, expected_version=None):
         """
         Atualizar tarefa
         
+        O UPDATE é condicional à versão lida (UPDATE ... WHERE id = ? AND
+        version = ?): se outra escrita mudou a tarefa no meio tempo, nada é
+        gravado e VERSION_CONFLICT é devolvido, sem lock nem nova leitura.
+        
         Args:
             task_id (int): ID da tarefa
             user_id (int): ID do usuário
             name (str): Novo nome da tarefa
             description (str): Nova descrição da tarefa
             status (str): Novo status da tarefa
+            tags (list): Novas etiquetas (substituem as atuais)
+            due_at (str): Novo prazo (ISO 8601); texto vazio remove o prazo
+            expected_version (int): Versão que o cliente leu (If-Match); None para não exigir
             
         Returns:
             tuple: (success: bool, message: str, task: Task|None)
         """
         try:
-            # Buscar tarefa
-            success, message, task = TaskService.get_task_by_id(task_id, user_id)
-            if not success:
-                return success, message, task
+            if tags is not None:
+                is_valid, message, tags = TagService.normalize_tags(tags)
+                if not is_valid:
+                    return False, message, None
             
-            # Validar novos dados se fornecidos
-            if name is not None:
-                is_valid, validation_message = TaskService.validate_task_data(name, description, status)
+            if due_at is not None:
+                is_valid, message, new_due_at = TaskService.parse_due_at(due_at)
                 if not is_valid:
-                    return False, validation_message, None
-                task.name = name.strip()
+                    return False, message, None
+            
+            shard = use_user_shard(user_id)
+            
+            def operation(session):
+                # Buscar tarefa
+                success, message, task = TaskService._find_user_task(task_id, user_id, session)
+                if not success:
+                    return success, message, task
+                if expected_version is not None and task.version != expected_version:
+                    return False, TaskService.VERSION_CONFLICT, None
+                
+                # Validar novos dados se fornecidos
+                if name is not None:
+                    is_valid, validation_message = TaskService.validate_task_data(name, description, status)
+                    if not is_valid:
+                        return False, validation_message, None
+                    task.name = name.strip()
+                
+                if description is not None:
+                    if description and len(description) > 1000:
+                        return False, "Descrição deve ter no máximo 1000 caracteres", None
+                    task.description = description.strip() if description else None
+                
+                if status is not None:
+                    if status not in TaskService.VALID_STATUSES:
+                        return False, f"Status deve ser um dos seguintes: {', '.join(TaskService.VALID_STATUSES)}", None
+                    if status != task.status:
+                        TaskService._track_completion(session, task, status)
+                    task.status = status
+                
+                if due_at is not None and new_due_at != task.due_at:
+                    # Novo prazo, novo lembrete
+                    task.due_at = new_due_at
+                    task.reminded_at = None
+                
+                if tags is not None:
+                    # As etiquetas ficam em task_tags: tocar a linha da tarefa para mudar a versão
+                    if TagService.set_task_tags(session, user_id, task.id, tags):
+                        task.updated_at = datetime.now()
+                    task.tags = tags
+                else:
+                    task.tags = TagService.load_tags([task.id], session)[task.id]
+                
+                # Aplicar o UPDATE condicional aqui, e não no COMMIT do lote
+                session.flush()
+                return True, "Tarefa atualizada com sucesso", task
+            
+            result = TaskService._run_write(user_id, shard, operation)
+            if result[0] and due_at is not None:
+                schedule_reminder(shard, task_id, result[2].due_at)
+            return result
+            
+        except StaleDataError:
+            db.session.rollback()
+            return False, TaskService.VERSION_CONFLICT, None
+        except Exception as e:
+            db.session.rollback()
+            return False, f"Erro interno: {str(e)}", None
+    
+    @staticmethod
+    def delete_task(task_id, user_id):
+        """
+        Excluir tarefa com todas as subtarefas
+        
+        A subárvore inteira sai de task_closure e é removida com comandos em
+        conjunto, sem carregar as subtarefas.
+        
+        Args:
+            task_id (int): ID da tarefa
+            user_id (int): ID do usuário
             
-            if description is not None:
-                if description and len(description) > 1000:
-                    return False, "Descrição deve ter no máximo 1000 caracteres", None
-                task.description = description.strip() if description else None
+        Returns:
+            tuple: (success: bool, message: str)
+        """
+        try:
+            shard = use_user_shard(user_id)
             
-            if status is not None:
-                if status not in TaskService.VALID_STATUSES:
-                    return False, f"Status deve ser um dos seguintes: {', '.join(TaskService.VALID_STATUSES)}", None
-                task.status = status
+            def operation(session):
+                # Buscar tarefa
+                success, message, task = TaskService._find_user_task(task_id, user_id, session)
+                if not success:
+                    return success, message
+                
+                TaskService.purge_task_ids(session, SubtaskService.subtree_ids(session, user_id, task.id))
+                return True, "Tarefa excluída com sucesso"
             
-            db.session.commit()
+            return TaskService._run_write(user_id, shard, operation)
             
-            return True, "Tarefa atualizada com sucesso", task
+        except Exception as e:
+            db.session.rollback()
+            return False, f"Erro interno: {str(e)}"
+    
+    @staticmethod
+    def move_task(task_id, user_id, parent_id):
+        """
+        Mover tarefa (com todas as subtarefas) para outra tarefa mãe
+        
+        Args:
+            task_id (int): ID da tarefa
+            user_id (int): ID do usuário
+            parent_id (int): Nova tarefa mãe (None para primeiro nível)
+            
+        Returns:
+            tuple: (success: bool, message: str, task: Task|None)
+        """
+        try:
+            shard = use_user_shard(user_id)
+            
+            def operation(session):
+                success, message, task = TaskService._find_user_task(task_id, user_id, session)
+                if not success:
+                    return success, message, task
+                
+                if parent_id is not None:
+                    success, message, parent = TaskService._find_user_task(parent_id, user_id, session)
+                    if not success:
+                        return False, "Tarefa mãe não encontrada", None
+                    is_valid, message = SubtaskService.check_parent(session, user_id, task.id, parent_id)
+                    if not is_valid:
+                        return False, message, None
+                
+                if parent_id != task.parent_id:
+                    SubtaskService.detach(session, user_id, task.id)
+                    if parent_id is not None:
+                        SubtaskService.attach(session, user_id, task.id, parent_id)
+                    task.parent_id = parent_id
+                task.tags = TagService.load_tags([task.id], session)[task.id]
+                return True, "Tarefa movida com sucesso", task
+            
+            return TaskService._run_write(user_id, shard, operation)
             
         except Exception as e:
             db.session.rollback()
             return False, f"Erro interno: {str(e)}", None
     
     @staticmethod
-    def delete_task(task_id, user_id):
+    def reorder_task(task_id, user_id, after_id=None):
         """
-        Excluir tarefa
+        Mudar a tarefa de lugar na ordem manual (sort=position)
+        
+        Só a chave da tarefa movida é gravada: ela recebe uma chave
+        fracionária entre a de after_id e a da tarefa seguinte. Chaves que
+        passam de POSITION_REBALANCE_LENGTH disparam o reequilíbrio das
+        posições do usuário em segundo plano.
         
         Args:
             task_id (int): ID da tarefa
             user_id (int): ID do usuário
+            after_id (int): Tarefa que ficará imediatamente antes (None = primeira posição)
             
         Returns:
-            tuple: (success: bool, message: str)
+            tuple: (success: bool, message: str, task: Task|None)
+        """
+        try:
+            if after_id == task_id:
+                return False, "Uma tarefa não pode ser posicionada depois dela mesma", None
+            
+            shard = use_user_shard(user_id)
+            
+            def operation(session):
+                # Tarefas de antes da ordem manual recebem posições antes da primeira movimentação
+                if session.execute(
+                    select(Task.id).where(Task.user_id == user_id, Task.position.is_(None)).limit(1)
+                ).first():
+                    TaskService._assign_positions(session, user_id)
+                
+                success, message, task = TaskService._find_user_task(task_id, user_id, session)
+                if not success:
+                    return success, message, task
+                
+                before = None
+                if after_id is not None:
+                    success, message, anchor = TaskService._find_user_task(after_id, user_id, session)
+                    if not success:
+                        return False, "Tarefa de referência não encontrada", None
+                    before = anchor.position
+                
+                query = select(Task.position).where(Task.user_id == user_id, Task.id != task.id)
+                if before is not None:
+                    query = query.where(Task.position > before)
+                after = session.execute(query.order_by(Task.position).limit(1)).scalar()
+                
+                task.position = key_between(before, after)
+                task.tags = TagService.load_tags([task.id], session)[task.id]
+                return True, "Tarefa reposicionada com sucesso", task
+            
+            result = TaskService._run_write(user_id, shard, operation, lock_user=True)
+            if result[0] and len(result[2].position) > current_app.config['POSITION_REBALANCE_LENGTH']:
+                submit_job(TaskService.rebalance_positions, user_id)
+            return result
+            
+        except Exception as e:
+            db.session.rollback()
+            return False, f"Erro interno: {str(e)}", None
+    
+    @staticmethod
+    def rebalance_positions(user_id):
+        """
+        Regravar as posições do usuário com chaves curtas, mantendo a ordem
+        
+        Args:
+            user_id (int): ID do usuário
+            
+        Returns:
+            tuple: (success: bool, message: str, count: int|None)
         """
         try:
-            # Buscar tarefa
-            success, message, task = TaskService.get_task_by_id(task_id, user_id)
-            if not success:
-                return success, message
+            shard = use_user_shard(user_id)
             
-            db.session.delete(task)
-            db.session.commit()
+            def operation(session):
+                count = TaskService._assign_positions(session, user_id)
+                return True, "Posições reequilibradas", count
             
-            return True, "Tarefa excluída com sucesso"
+            return TaskService._run_write(user_id, shard, operation)
             
         except Exception as e:
             db.session.rollback()
-            return False, f"Erro interno: {str(e)}"
+            return False, f"Erro interno: {str(e)}", None
+    
+    @staticmethod
+    def _assign_positions(session, user_id):
+        """Dar chaves sequenciais às tarefas do usuário na ordem atual (as sem posição primeiro)"""
+        tasks = Task.__table__
+        task_ids = session.execute(
+            select(tasks.c.id).where(tasks.c.user_id == user_id).order_by(tasks.c.position, tasks.c.id)
+        ).scalars().all()
+        if not task_ids:
+            return 0
+        
+        # A ordem visível não muda, então a versão e o updated_at das tarefas
+        # são mantidos. As chaves são únicas por usuário: limpar antes de regravar
+        session.execute(
+            update(tasks).where(tasks.c.user_id == user_id).values(position=None, updated_at=tasks.c.updated_at)
+        )
+        positions = []
+        key = None
+        for task_id in task_ids:
+            key = key_between(key, None)
+            positions.append({'task_id': task_id, 'new_position': key})
+        session.execute(
+            update(tasks).where(tasks.c.id == bindparam('task_id'))
+            .values(position=bindparam('new_position'), updated_at=tasks.c.updated_at),
+            positions
+        )
+        return len(task_ids)
+    
+    @staticmethod
+    def complete_subtree(task_id, user_id):
+        """
+        Concluir a tarefa e todas as subtarefas pendentes com um único UPDATE
+        
+        Args:
+            task_id (int): ID da tarefa raiz
+            user_id (int): ID do usuário
+            
+        Returns:
+            tuple: (success: bool, message: str, data: dict|None) com 'completed'
+        """
+        try:
+            shard = use_user_shard(user_id)
+            
+            def operation(session):
+                success, message, task = TaskService._find_user_task(task_id, user_id, session)
+                if not success:
+                    return success, message, None
+                
+                now = datetime.now()
+                tasks = Task.__table__
+                completed = session.execute(
+                    update(tasks)
+                    .where(
+                        or_(tasks.c.id == task.id,
+                            tasks.c.id.in_(SubtaskService.descendants_query(user_id, task.id))),
+                        tasks.c.user_id == user_id,
+                        tasks.c.status == 'pendente'
+                    )
+                    .values(status='concluida', completed_at=now, updated_at=now, version=tasks.c.version + 1)
+                ).rowcount
+                if completed:
+                    StatsService.record_completion(session, user_id, now, completed)
+                return True, "Subtarefas concluídas com sucesso", {'completed': completed}
+            
+            return TaskService._run_write(user_id, shard, operation)
+            
+        except Exception as e:
+            db.session.rollback()
+            return False, f"Erro interno: {str(e)}", None
+    
+    @staticmethod
+    def update_occurrence(task_id, user_id, day, name=None, description=None, status=None):
+        """
+        Concluir ou alterar uma ocorrência de tarefa recorrente
+        
+        A primeira alteração grava a ocorrência em task_occurrences; as
+        demais ocorrências continuam existindo apenas pela regra.
+        
+        Args:
+            task_id (int): ID da tarefa recorrente
+            user_id (int): ID do usuário
+            day (str): Dia da ocorrência (AAAA-MM-DD)
+            name (str): Nome desta ocorrência
+            description (str): Descrição desta ocorrência
+            status (str): Novo status da ocorrência
+            
+        Returns:
+            tuple: (success: bool, message: str, occurrence: dict|None)
+        """
+        try:
+            try:
+                day = date.fromisoformat(day)
+            except (TypeError, ValueError):
+                return False, "Data de ocorrência inválida. Use o formato AAAA-MM-DD", None
+            
+            if name is not None:
+                is_valid, message = TaskService.validate_task_data(name, description, status)
+                if not is_valid:
+                    return False, message, None
+            if description and len(description) > 1000:
+                return False, "Descrição deve ter no máximo 1000 caracteres", None
+            if status is not None and status not in TaskService.VALID_STATUSES:
+                return False, f"Status deve ser um dos seguintes: {', '.join(TaskService.VALID_STATUSES)}", None
+            
+            shard = use_user_shard(user_id)
+            
+            def operation(session):
+                success, message, task = TaskService._find_user_task(task_id, user_id, session)
+                if not success:
+                    return success, message, None
+                if task.recurrence is None:
+                    return False, "A tarefa não é recorrente", None
+                if not RecurrenceService.occurs_on(task.recurrence, task.created_at.date(), day) or (
+                    task.completed_at and day > task.completed_at.date()
+                ):
+                    return False, "A tarefa não tem ocorrência nesse dia", None
+                
+                occurrence = session.get(TaskOccurrence, (user_id, day, task.id))
+                if occurrence is None:
+                    occurrence = TaskOccurrence(user_id=user_id, day=day, task_id=task.id, status='pendente')
+                    session.add(occurrence)
+                if name is not None:
+                    occurrence.name = name.strip()
+                if description is not None:
+                    occurrence.description = description.strip() or None
+                if status is not None and status != occurrence.status:
+                    TaskService._track_completion(session, occurrence, status)
+                    occurrence.status = status
+                
+                return True, "Ocorrência atualizada com sucesso", RecurrenceService.occurrence_dict(task, day, occurrence)
+            
+            return TaskService._run_write(user_id, shard, operation)
+            
+        except Exception as e:
+            db.session.rollback()
+            return False, f"Erro interno: {str(e)}", None
+    
+    @staticmethod
+    def purge_task_ids(session, task_ids):
+        """
+        Excluir tarefas por ID com comandos em conjunto, sem carregá-las
+        
+        Ponto único para remover tarefas (e o que depender delas) em massa;
+        não confirma a transação.
+        
+        Args:
+            session: Sessão onde os comandos são executados
+            task_ids (list): IDs das tarefas
+            
+        Returns:
+            int: Quantidade de tarefas excluídas
+        """
+        if not task_ids:
+            return 0
+        StatsService.record_purged_completions(session, task_ids)
+        TagService.purge_task_tags(session, task_ids)
+        SubtaskService.purge_links(session, task_ids)
+        RecurrenceService.purge_occurrences(session, task_ids)
+        return session.execute(delete(Task).where(Task.id.in_(task_ids))).rowcount
+    
+    @staticmethod
+    def _track_completion(session, task, status):
+        """Atualizar completed_at e o agregado diário em uma mudança de status (tarefa ou ocorrência)"""
+        if status == 'concluida':
+            task.completed_at = datetime.now()
+            StatsService.record_completion(session, task.user_id, task.completed_at, 1)
+        elif task.completed_at:
+            StatsService.record_completion(session, task.user_id, task.completed_at, -1)
+            task.completed_at = None
     
     @staticmethod
+    @read_only
     def get_task_statistics(user_id):
         """
         Obter estatísticas das tarefas do usuário
@@ -242,6 +919,7 @@ class TaskService:
             tuple: (success: bool, message: str, stats: dict|None)
         """
         try:
+            use_user_shard(user_id)
             total_tasks = Task.query.filter_by(user_id=user_id).count()
             pending_tasks = Task.query.filter_by(user_id=user_id, status='pendente').count()
             completed_tasks = Task.query.filter_by(user_id=user_id, status='concluida').count()
@@ -0,0 +1,114 @@
+"""
+Testes para a exclusão de conta em lotes
+"""
+
+import pytest
+import sys
+import os
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import event
+from src.models import db, User, Task
+from src.services.auth_service import AuthService
+from src.services.background import background_executor
+from src.routes.user import user_bp
+from src.config import config
+from src.main import create_app
+from flask import Flask
+from flask_jwt_extended import JWTManager
+
+@pytest.fixture
+def app(tmp_path):
+    """Aplicação sobre SQLite em arquivo (os lotes em segundo plano usam outra conexão)"""
+    app = Flask(__name__)
+    app.config.from_object(config['testing'])
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'app.db'}"
+    app.config['ACCOUNT_DELETE_CHUNK_SIZE'] = 10
+    app.config['ACCOUNT_DELETE_SYNC_MAX_TASKS'] = 30
+
+    db.init_app(app)
+    JWTManager(app)
+    app.register_blueprint(user_bp, url_prefix='/api')
+
+    with app.app_context():
+        db.create_all()
+    return app
+
+@pytest.fixture
+def client(app):
+    """Cliente de teste"""
+    return app.test_client()
+
+def create_user_with_tasks(app, email, tasks):
+    """Registrar usuário com N tarefas e devolver os cabeçalhos de autenticação"""
+    with app.app_context():
+        success, message, user = AuthService.register_user('Usuário', email, 'senha123')
+        db.session.add_all(Task(name=f'Tarefa {i}', user_id=user.id) for i in range(tasks))
+        db.session.commit()
+        success, message, tokens = AuthService.authenticate_user(email, 'senha123')
+    return {'Authorization': f"Bearer {tokens['access_token']}"}
+
+class TestAccountDeletion:
+    """Testes para DELETE /api/profile"""
+
+    def test_delete_small_account(self, app, client):
+        """Testar exclusão imediata em lotes, sem afetar outros usuários"""
+        headers = create_user_with_tasks(app, 'joao@exemplo.com', 25)
+        create_user_with_tasks(app, 'maria@exemplo.com', 3)
+
+        deletes = []
+        with app.app_context():
+            event.listen(db.engine, 'before_cursor_execute',
+                         lambda conn, cursor, statement, *args: deletes.append(statement)
+                         if statement.startswith('DELETE FROM tasks WHERE') else None)
+
+        response = client.delete('/api/profile', headers=headers)
+
+        assert response.status_code == 200
+        assert response.get_json()['tasks'] == 25
+        assert len(deletes) == 3
+        with app.app_context():
+            assert User.query.filter_by(email='joao@exemplo.com').first() is None
+            assert Task.query.count() == 3
+
+        response = client.delete('/api/profile', headers=headers)
+        assert response.status_code == 404
+
+    def test_delete_large_account_in_background(self, app, client):
+        """Testar que contas grandes são excluídas em segundo plano"""
+        headers = create_user_with_tasks(app, 'joao@exemplo.com', 45)
+
+        response = client.delete('/api/profile', headers=headers)
+
+        assert response.status_code == 202
+        assert response.get_json()['tasks'] == 45
+
+        with app.app_context():
+            background_executor().shutdown(wait=True)
+            assert User.query.count() == 0
+            assert Task.query.count() == 0
+
+    def test_deleted_account_tokens_revoked(self):
+        """Testar que o token da conta excluída não vale para uma conta registrada depois"""
+        app = create_app('testing')
+        client = app.test_client()
+
+        def register(email):
+            client.post('/api/register', json={'name': 'Usuário', 'email': email, 'password': 'senha123'})
+            token = client.post('/api/login', json={'email': email, 'password': 'senha123'}).get_json()['access_token']
+            return {'Authorization': f'Bearer {token}'}
+
+        old_headers = register('a@exemplo.com')
+        old_id = client.get('/api/profile', headers=old_headers).get_json()['user']['id']
+        assert client.delete('/api/profile', headers=old_headers).status_code == 200
+
+        new_headers = register('b@exemplo.com')
+        client.post('/api/tasks', json={'name': 'Privada'}, headers=new_headers)
+
+        assert client.get('/api/profile', headers=new_headers).get_json()['user']['id'] != old_id
+        assert client.get('/api/profile', headers=old_headers).status_code == 401
+        assert client.get('/api/tasks', headers=old_headers).status_code == 401
+        with app.app_context():
+            db.drop_all()
@@ -0,0 +1,130 @@
+"""
+Testes para o arquivamento de tarefas concluídas
+"""
+
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.main import create_app
+from src.models import db, User, Task, TaskArchive
+from src.services.archive_service import ArchiveService
+
+@pytest.fixture
+def app():
+    """Criar aplicação Flask completa para testes"""
+    app = create_app('testing')
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Cliente de teste"""
+    return app.test_client()
+
+@pytest.fixture
+def auth_headers(client):
+    """Cabeçalhos de autenticação de um usuário registrado"""
+    client.post('/api/register', json={
+        'name': 'João', 'email': 'joao@exemplo.com', 'password': 'senha123'
+    })
+    response = client.post('/api/login', json={
+        'email': 'joao@exemplo.com', 'password': 'senha123'
+    })
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+@pytest.fixture
+def tasks(app, auth_headers):
+    """Tarefas antigas concluídas, uma concluída recente e uma pendente antiga"""
+    old = datetime.now() - timedelta(days=200)
+    with app.app_context():
+        user = User.query.filter_by(email='joao@exemplo.com').first()
+        db.session.add_all([
+            *(Task(name=f'Antiga {i}', status='concluida', user_id=user.id,
+                   created_at=old + timedelta(minutes=i), updated_at=old) for i in range(5)),
+            Task(name='Recente', status='concluida', user_id=user.id),
+            Task(name='Pendente', status='pendente', user_id=user.id,
+                 created_at=old - timedelta(days=1), updated_at=old),
+        ])
+        db.session.commit()
+
+class TestArchive:
+    """Testes para o arquivamento e a consulta do histórico"""
+
+    def test_archive_moves_old_completed_tasks(self, app, tasks):
+        """Testar que apenas tarefas concluídas antigas são movidas, em lotes"""
+        with app.app_context():
+            success, message, stats = ArchiveService.archive_completed_tasks(older_than_days=90, batch_size=2)
+
+            assert success is True
+            assert stats == {'archived': 5, 'batches': 3}
+            assert Task.query.count() == 2
+            assert TaskArchive.query.count() == 5
+            assert {task.name for task in Task.query.all()} == {'Recente', 'Pendente'}
+
+    def test_age_counts_from_completion(self, app, tasks):
+        """Testar que editar uma tarefa concluída há muito tempo não adia o arquivamento"""
+        old = datetime.now() - timedelta(days=200)
+        with app.app_context():
+            user = User.query.filter_by(email='joao@exemplo.com').first()
+            db.session.add_all([
+                Task(name='Editada', status='concluida', user_id=user.id, completed_at=old),
+                Task(name='Concluída agora', status='concluida', user_id=user.id,
+                     completed_at=datetime.now(), updated_at=old),
+            ])
+            db.session.commit()
+
+            success, message, stats = ArchiveService.archive_completed_tasks(older_than_days=90)
+
+            assert stats['archived'] == 6
+            assert {task.name for task in Task.query.all()} == {'Recente', 'Pendente', 'Concluída agora'}
+
+    def test_list_include_archived(self, app, client, auth_headers, tasks):
+        """Testar listagem com e sem tarefas arquivadas"""
+        with app.app_context():
+            ArchiveService.archive_completed_tasks(older_than_days=90)
+
+        response = client.get('/api/tasks', headers=auth_headers)
+        assert response.get_json()['pagination']['total'] == 2
+
+        response = client.get('/api/tasks?include_archived=true&per_page=3&page=2', headers=auth_headers)
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data['pagination']['total'] == 7
+        assert data['pagination']['pages'] == 3
+        assert data['pagination']['has_next'] is True
+        assert [task['name'] for task in data['tasks']] == ['Antiga 2', 'Antiga 1', 'Antiga 0']
+        assert all(task['archived'] for task in data['tasks'])
+
+        response = client.get('/api/tasks/completed?include_archived=true', headers=auth_headers)
+        assert response.get_json()['pagination']['total'] == 6
+
+    def test_export(self, app, client, auth_headers, tasks):
+        """Testar exportação com e sem tarefas arquivadas"""
+        with app.app_context():
+            ArchiveService.archive_completed_tasks(older_than_days=90)
+
+        response = client.get('/api/tasks/export', headers=auth_headers)
+        assert response.status_code == 200
+        assert len(response.get_json()['tasks']) == 2
+
+        response = client.get('/api/tasks/export?include_archived=true', headers=auth_headers)
+        exported = response.get_json()['tasks']
+        assert len(exported) == 7
+        assert sum(task['archived'] for task in exported) == 5
+
+    def test_delete_account_removes_archive(self, app, client, auth_headers, tasks):
+        """Testar que a exclusão da conta também remove o histórico arquivado"""
+        with app.app_context():
+            ArchiveService.archive_completed_tasks(older_than_days=90)
+
+        response = client.delete('/api/profile', headers=auth_headers)
+
+        assert response.status_code == 200
+        with app.app_context():
+            assert TaskArchive.query.count() == 0
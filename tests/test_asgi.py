@@ -0,0 +1,224 @@
+"""
+Testes para o modo de execução ASGI
+"""
+
+import asyncio
+import json
+import pytest
+import sys
+import os
+import threading
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.asgi import AsgiAdapter
+from src.main import create_app
+from src.models import db
+
+@pytest.fixture
+def app():
+    """Criar aplicação Flask completa para testes"""
+    app = create_app('testing')
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+@pytest.fixture
+def asgi_app(app):
+    """Aplicação ASGI sobre a aplicação de teste"""
+    adapter = AsgiAdapter(app, max_workers=4)
+    yield adapter
+    adapter.executor.shutdown(wait=True)
+
+def asgi_request(asgi_app, method, path, body=None, headers=None, query_string=b''):
+    """Executar uma requisição ASGI e devolver (status, headers, json)"""
+    payload = json.dumps(body).encode() if body is not None else b''
+    raw_headers = [(b'content-type', b'application/json')]
+    for name, value in (headers or {}).items():
+        raw_headers.append((name.lower().encode(), value.encode()))
+    scope = {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': method,
+        'path': path,
+        'query_string': query_string,
+        'headers': raw_headers,
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 12345),
+    }
+    # Enviar o corpo em duas partes para exercitar more_body
+    messages = [
+        {'type': 'http.request', 'body': payload[:5], 'more_body': True},
+        {'type': 'http.request', 'body': payload[5:], 'more_body': False},
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi_app(scope, receive, send))
+    start, *body_messages = sent
+    return start['status'], dict(start['headers']), json.loads(b''.join(message['body'] for message in body_messages))
+
+def plain_scope(path='/'):
+    """Scope de um GET sem corpo"""
+    return {'type': 'http', 'method': 'GET', 'path': path, 'headers': []}
+
+async def no_body():
+    return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+class TestAsgiAdapter:
+    """Testes para o adaptador ASGI"""
+
+    def test_health_matches_wsgi(self, app, asgi_app):
+        """Testar que a resposta ASGI é idêntica à resposta WSGI"""
+        status, headers, data = asgi_request(asgi_app, 'GET', '/api/health')
+        expected = app.test_client().get('/api/health')
+
+        assert status == expected.status_code
+        assert data == expected.get_json()
+        assert headers[b'content-type'] == b'application/json'
+
+    def test_task_flow(self, asgi_app):
+        """Testar registro, login e criação/listagem de tarefas via ASGI"""
+        status, _, data = asgi_request(asgi_app, 'POST', '/api/register', {
+            'name': 'João', 'email': 'joao@exemplo.com', 'password': 'senha123'
+        })
+        assert status == 201
+
+        status, _, data = asgi_request(asgi_app, 'POST', '/api/login', {
+            'email': 'joao@exemplo.com', 'password': 'senha123'
+        })
+        assert status == 200
+        auth = {'Authorization': f"Bearer {data['access_token']}"}
+
+        status, _, data = asgi_request(asgi_app, 'POST', '/api/tasks', {
+            'name': 'Tarefa ASGI', 'status': 'pendente'
+        }, headers=auth)
+        assert status == 201
+        assert data['task']['name'] == 'Tarefa ASGI'
+
+        status, _, data = asgi_request(asgi_app, 'GET', '/api/tasks', headers=auth,
+                                       query_string=b'status=pendente')
+        assert status == 200
+        assert data['pagination']['total'] == 1
+
+    @pytest.mark.parametrize('declare_length', [True, False])
+    def test_body_too_large(self, app, asgi_app, declare_length):
+        """Testar 413 antes de acumular o corpo, com e sem Content-Length"""
+        limit = app.config['MAX_CONTENT_LENGTH']
+        chunk = b'x' * (limit // 2 + 1)
+        headers = [(b'content-length', str(len(chunk) * 10).encode())] if declare_length else []
+        scope = {'type': 'http', 'method': 'POST', 'path': '/api/tasks', 'headers': headers}
+        messages = [{'type': 'http.request', 'body': chunk, 'more_body': True} for _ in range(10)]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(asgi_app(scope, receive, send))
+
+        assert sent[0]['status'] == 413
+        # Sem Content-Length, a leitura para no primeiro pedaço acima do limite
+        assert len(messages) == (10 if declare_length else 8)
+
+    def test_missing_token(self, asgi_app):
+        """Testar erro de autenticação via ASGI"""
+        status, _, data = asgi_request(asgi_app, 'GET', '/api/tasks')
+
+        assert status == 401
+        assert data['message'] == 'Token de autorização necessário'
+
+class TestAsgiStreaming:
+    """Testes para o envio da resposta em partes e o limite de requisições"""
+
+    def test_chunks_sent_as_produced(self):
+        """Testar que cada parte é enviada antes de a próxima ser produzida"""
+        events = []
+
+        def wsgi_app(environ, start_response):
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            for chunk in (b'a', b'', b'b', b'c'):
+                events.append(('produced', chunk))
+                yield chunk
+
+        async def send(message):
+            if message['type'] == 'http.response.body':
+                events.append(('sent', message['body'], message.get('more_body', False)))
+
+        adapter = AsgiAdapter(wsgi_app, max_workers=2)
+        asyncio.run(adapter(plain_scope(), no_body, send))
+        adapter.executor.shutdown(wait=True)
+
+        assert events == [
+            ('produced', b'a'), ('sent', b'a', True),
+            ('produced', b''), ('produced', b'b'), ('sent', b'b', True),
+            ('produced', b'c'), ('sent', b'c', True),
+            ('sent', b'', False),
+        ]
+
+    def test_disconnect_closes_response(self):
+        """Testar que o iterável da aplicação é fechado quando o cliente cai no meio do envio"""
+        closed = threading.Event()
+
+        def wsgi_app(environ, start_response):
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            try:
+                while True:
+                    yield b'x'
+            finally:
+                closed.set()
+
+        async def send(message):
+            if message.get('more_body'):
+                raise OSError('conexão encerrada')
+
+        adapter = AsgiAdapter(wsgi_app, max_workers=2)
+        with pytest.raises(OSError):
+            asyncio.run(adapter(plain_scope(), no_body, send))
+        adapter.executor.shutdown(wait=True)
+
+        assert closed.is_set()
+
+    def test_overload_returns_503(self):
+        """Testar 503 quando o pool e a fila estão cheios, sem enfileirar a requisição"""
+        release = threading.Event()
+        calls = []
+
+        def wsgi_app(environ, start_response):
+            calls.append(environ['PATH_INFO'])
+            release.wait(5)
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            return [b'ok']
+
+        adapter = AsgiAdapter(wsgi_app, max_workers=1, max_queue=0)
+        first, second = [], []
+
+        def send_to(sent):
+            async def send(message):
+                sent.append(message)
+            return send
+
+        async def main():
+            running = asyncio.create_task(adapter(plain_scope('/lenta'), no_body, send_to(first)))
+            while adapter.in_flight == 0:
+                await asyncio.sleep(0.01)
+            await adapter(plain_scope('/recusada'), no_body, send_to(second))
+            release.set()
+            await running
+
+        asyncio.run(main())
+        adapter.executor.shutdown(wait=True)
+
+        assert calls == ['/lenta']
+        assert first[0]['status'] == 200
+        assert second[0]['status'] == 503
+        assert (b'retry-after', b'1') in second[0]['headers']
+        assert adapter.in_flight == 0
@@ -0,0 +1,159 @@
+"""
+Testes para o backup online e a restauração verificada
+"""
+
+import pytest
+import sys
+import os
+import threading
+from datetime import datetime
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from flask import Flask
+from src.config import config
+from src.main import create_app
+from src.models import db, Task
+from src.services.auth_service import AuthService
+from src.services.backup_service import BackupSchedule, BackupService
+from src.services.task_service import TaskService
+
+@pytest.fixture
+def app(tmp_path):
+    """Criar aplicação Flask com banco em arquivo"""
+    app = Flask(__name__)
+    app.config.from_object(config['testing'])
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'app.db'}"
+    app.config['BACKUP_DIR'] = str(tmp_path / 'backups')
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        AuthService.register_user('João', 'joao@exemplo.com', 'senha123')
+        for index in range(20):
+            TaskService.create_task(1, f'Tarefa {index}')
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def task_count():
+    """Tarefas no banco, lidas em uma sessão nova"""
+    db.session.remove()
+    return Task.query.count()
+
+class TestBackup:
+    """Testes para a criação dos snapshots"""
+
+    def test_compressed_snapshot(self, app):
+        """Testar snapshot comprimido e conferido"""
+        success, message, stats = BackupService.create_backup()
+
+        assert success is True, message
+        assert stats['shards'] == 1
+        assert os.listdir(stats['snapshot']) == ['shard0.db.gz']
+        assert BackupService.list_backups() == [stats['snapshot']]
+        assert BackupService.restore_backup(stats['snapshot'], verify_only=True)[0] is True
+
+    def test_uncompressed_snapshot(self, app):
+        """Testar snapshot sem compressão"""
+        success, message, stats = BackupService.create_backup(compress=False)
+
+        assert os.listdir(stats['snapshot']) == ['shard0.db']
+
+    def test_writes_during_backup(self, app):
+        """Testar o backup em passos de uma página com escritas concorrentes"""
+        errors = []
+
+        def writer():
+            with app.app_context():
+                for index in range(50):
+                    success, message, task = TaskService.create_task(1, f'Concorrente {index}')
+                    if not success:
+                        errors.append(message)
+                db.session.remove()
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        success, message, stats = BackupService.create_backup(pages=1)
+        thread.join()
+
+        assert success is True, message
+        assert errors == []
+        assert BackupService.restore_backup(stats['snapshot'], verify_only=True)[0] is True
+
+    def test_retention(self, app):
+        """Testar que só os snapshots mais recentes são mantidos"""
+        for hour in range(4):
+            success, message, stats = BackupService.create_backup(keep=2, stamp=datetime(2026, 3, 2, hour))
+
+        assert stats['pruned'] == 1
+        assert [os.path.basename(path) for path in BackupService.list_backups()] == [
+            '20260302T020000', '20260302T030000'
+        ]
+
+    def test_schedule_once_per_interval(self, app):
+        """Testar que dois processos no mesmo intervalo fazem um único backup"""
+        now = datetime(2026, 3, 2, 9, 17).timestamp()
+        schedules = [BackupSchedule(app, 60), BackupSchedule(app, 60)]
+
+        results = [schedule.run_once(now) for schedule in schedules]
+
+        assert [success for success, message, stats in results] == [True, False]
+        assert [os.path.basename(path) for path in BackupService.list_backups()] == ['20260302T090000']
+
+class TestRestore:
+    """Testes para a restauração verificada"""
+
+    def test_restore(self, app):
+        """Testar que restaurar traz de volta o banco do snapshot"""
+        snapshot = BackupService.create_backup()[2]['snapshot']
+        db.session.execute(db.delete(Task))
+        db.session.commit()
+        assert task_count() == 0
+
+        success, message, stats = BackupService.restore_backup(snapshot)
+
+        assert success is True, message
+        assert stats['restored'] == 1
+        assert task_count() == 20
+
+    def test_corrupted_snapshot(self, app):
+        """Testar que um snapshot corrompido não é restaurado"""
+        snapshot = BackupService.create_backup(compress=False)[2]['snapshot']
+        with open(os.path.join(snapshot, 'shard0.db'), 'r+b') as file:
+            file.seek(0)
+            file.write(b'x' * 4096)
+        db.session.execute(db.delete(Task))
+        db.session.commit()
+
+        success, message, stats = BackupService.restore_backup(snapshot)
+
+        assert success is False
+        assert task_count() == 0
+
+    def test_missing_snapshot(self, app):
+        """Testar snapshot inexistente"""
+        assert BackupService.restore_backup(os.path.join(app.config['BACKUP_DIR'], 'nada'))[0] is False
+
+class TestBackupCommands:
+    """Testes para os comandos backup-db e restore-db"""
+
+    def test_commands(self, tmp_path):
+        """Testar backup e conferência do snapshot mais recente pela CLI"""
+        app = create_app('testing')
+        app.config['BACKUP_DIR'] = str(tmp_path)
+        runner = app.test_cli_runner()
+
+        result = runner.invoke(args=['restore-db'])
+        assert result.exit_code != 0
+
+        result = runner.invoke(args=['backup-db', '--keep', '3'])
+        assert result.exit_code == 0, result.output
+        assert 'Backup concluído' in result.output
+
+        result = runner.invoke(args=['restore-db', '--verify-only'])
+        assert result.exit_code == 0, result.output
+        assert 'Snapshot íntegro' in result.output
+        with app.app_context():
+            db.drop_all()
@@ -0,0 +1,137 @@
+"""
+Testes para o group commit das escritas de tarefas
+"""
+
+import pytest
+import sys
+import os
+import threading
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import event
+from src.models import db, Task
+from src.services.auth_service import AuthService
+from src.services.task_service import TaskService
+from src.services.group_commit import group_committer
+from src.config import config
+from flask import Flask
+
+@pytest.fixture
+def app(tmp_path):
+    """Aplicação sobre SQLite em arquivo com group commit ativado"""
+    app = Flask(__name__)
+    app.config.from_object(config['testing'])
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'app.db'}"
+    app.config['GROUP_COMMIT_WINDOW_MS'] = 50
+
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        success, message, user = AuthService.register_user('Test User', 'test@example.com', 'password123')
+        assert success
+    return app
+
+def run_concurrently(app, calls):
+    """Executar as chamadas em threads simultâneas e devolver os resultados"""
+    results = [None] * len(calls)
+    barrier = threading.Barrier(len(calls))
+
+    def worker(index, call):
+        with app.app_context():
+            barrier.wait()
+            results[index] = call()
+            db.session.remove()
+
+    threads = [threading.Thread(target=worker, args=(index, call)) for index, call in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+class TestGroupCommit:
+    """Testes para escritas concorrentes compartilhando o COMMIT"""
+
+    def test_disabled_by_default(self, app):
+        """Testar que sem janela configurada as escritas usam a sessão da requisição"""
+        app.config['GROUP_COMMIT_WINDOW_MS'] = 0
+        with app.app_context():
+            assert group_committer() is None
+
+            success, message, task = TaskService.create_task(1, 'Tarefa')
+            assert success is True
+            assert Task.query.count() == 1
+
+    def test_concurrent_creates_share_commit(self, app):
+        """Testar que criações concorrentes são confirmadas em poucos commits"""
+        commits = []
+        with app.app_context():
+            engine = group_committer().engine
+        event.listen(engine, 'commit', lambda conn: commits.append(1))
+
+        calls = [lambda i=i: TaskService.create_task(1, f'Tarefa {i}') for i in range(8)]
+        results = run_concurrently(app, calls)
+
+        assert all(success for success, message, task in results)
+        assert len({task.id for success, message, task in results}) == 8
+        assert results[0][2].to_dict()['name'].startswith('Tarefa')
+        assert len(commits) < 8
+
+        with app.app_context():
+            assert Task.query.count() == 8
+
+    def test_failure_isolated_within_batch(self, app):
+        """Testar que uma escrita inválida não desfaz as outras do mesmo lote"""
+        with app.app_context():
+            success, message, task = TaskService.create_task(1, 'Existente')
+            task_id = task.id
+
+        calls = [
+            lambda: TaskService.update_task(task_id, 1, name='Renomeada', status='invalido'),
+            lambda: TaskService.create_task(1, 'Nova'),
+            lambda: TaskService.create_task(999, 'Sem usuário'),
+            lambda: TaskService.update_task(task_id, 1, status='concluida'),
+        ]
+        results = run_concurrently(app, calls)
+
+        assert results[0][0] is False
+        assert results[1][0] is True
+        assert results[2] == (False, "Usuário não encontrado", None)
+        assert results[3][0] is True
+
+        with app.app_context():
+            existing = db.session.get(Task, task_id)
+            assert existing.name == 'Existente'
+            assert existing.status == 'concluida'
+            assert Task.query.count() == 2
+
+    def test_delete_through_committer(self, app):
+        """Testar exclusão de tarefa pelo group committer"""
+        with app.app_context():
+            success, message, task = TaskService.create_task(1, 'Tarefa')
+
+            assert TaskService.delete_task(task.id, 1) == (True, "Tarefa excluída com sucesso")
+            assert TaskService.delete_task(task.id, 1) == (False, "Tarefa não encontrada")
+            assert Task.query.count() == 0
+
+    def test_version_conflict_within_batch(self, app):
+        """Testar que, entre escritas com a mesma versão no If-Match, apenas uma é aplicada"""
+        with app.app_context():
+            success, message, task = TaskService.create_task(1, 'Tarefa')
+            task_id = task.id
+
+        calls = [
+            lambda i=i: TaskService.update_task(task_id, 1, name=f'Versão {i}', expected_version=1)
+            for i in range(4)
+        ] + [lambda: TaskService.create_task(1, 'Nova')]
+        results = run_concurrently(app, calls)
+
+        assert [result[0] for result in results[:4]].count(True) == 1
+        assert {result[1] for result in results[:4] if not result[0]} == {TaskService.VERSION_CONFLICT}
+        assert results[4][0] is True
+
+        with app.app_context():
+            assert db.session.get(Task, task_id).version == 2
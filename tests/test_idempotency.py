@@ -0,0 +1,122 @@
+"""
+Testes para o suporte a Idempotency-Key
+"""
+
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.main import create_app
+from src.models import db, Task, IdempotencyRecord
+from src.services.idempotency_service import IdempotencyService
+
+@pytest.fixture
+def app():
+    """Criar aplicação Flask completa para testes"""
+    app = create_app('testing')
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Cliente de teste"""
+    return app.test_client()
+
+@pytest.fixture
+def auth_headers(client):
+    """Cabeçalhos de autenticação de um usuário registrado"""
+    client.post('/api/register', json={
+        'name': 'João', 'email': 'joao@exemplo.com', 'password': 'senha123'
+    })
+    response = client.post('/api/login', json={
+        'email': 'joao@exemplo.com', 'password': 'senha123'
+    })
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+class TestIdempotency:
+    """Testes para o decorator idempotent"""
+
+    def test_retry_replays_response(self, app, client, auth_headers):
+        """Testar que a repetição devolve a mesma resposta sem criar outra tarefa"""
+        headers = {**auth_headers, 'Idempotency-Key': 'chave-1'}
+        body = {'name': 'Tarefa', 'status': 'pendente'}
+
+        first = client.post('/api/tasks', json=body, headers=headers)
+        second = client.post('/api/tasks', json=body, headers=headers)
+
+        assert first.status_code == 201
+        assert second.status_code == 201
+        assert second.get_json() == first.get_json()
+        assert second.headers['Idempotent-Replayed'] == 'true'
+        with app.app_context():
+            assert Task.query.count() == 1
+
+    def test_key_reused_with_different_body(self, client, auth_headers):
+        """Testar rejeição de chave reutilizada em outra requisição"""
+        headers = {**auth_headers, 'Idempotency-Key': 'chave-2'}
+
+        client.post('/api/tasks', json={'name': 'Tarefa A'}, headers=headers)
+        response = client.post('/api/tasks', json={'name': 'Tarefa B'}, headers=headers)
+
+        assert response.status_code == 422
+
+    def test_conditional_update_replay(self, client, auth_headers):
+        """Testar que a repetição devolve a ETag e que outro If-Match não reaproveita a chave"""
+        task_id = client.post('/api/tasks', json={'name': 'Tarefa'}, headers=auth_headers).get_json()['task']['id']
+        headers = {**auth_headers, 'Idempotency-Key': 'chave-etag', 'If-Match': '"1"'}
+
+        first = client.put(f'/api/tasks/{task_id}', json={'name': 'Nova'}, headers=headers)
+        second = client.put(f'/api/tasks/{task_id}', json={'name': 'Nova'}, headers=headers)
+        other = client.put(f'/api/tasks/{task_id}', json={'name': 'Nova'}, headers={**headers, 'If-Match': '"2"'})
+
+        assert first.headers['ETag'] == '"2"'
+        assert second.headers['Idempotent-Replayed'] == 'true'
+        assert second.headers['ETag'] == '"2"'
+        assert other.status_code == 422
+
+    def test_in_progress_key(self, app, client, auth_headers):
+        """Testar conflito quando a requisição original ainda não terminou"""
+        headers = {**auth_headers, 'Idempotency-Key': 'chave-3'}
+        body = {'name': 'Tarefa'}
+
+        with app.test_request_context('/api/tasks', method='POST', json=body):
+            from src.middleware.idempotency import request_fingerprint
+            state, record = IdempotencyService.begin(1, 'chave-3', request_fingerprint())
+            assert state == IdempotencyService.NEW
+
+        response = client.post('/api/tasks', json=body, headers=headers)
+
+        assert response.status_code == 409
+
+    def test_without_key_is_not_deduplicated(self, app, client, auth_headers):
+        """Testar que sem o cabeçalho cada requisição é executada"""
+        client.post('/api/tasks', json={'name': 'Tarefa'}, headers=auth_headers)
+        client.post('/api/tasks', json={'name': 'Tarefa'}, headers=auth_headers)
+
+        with app.app_context():
+            assert Task.query.count() == 2
+
+    def test_sweep_expired(self, app):
+        """Testar remoção em lotes de chaves expiradas"""
+        with app.app_context():
+            past = datetime.now() - timedelta(hours=1)
+            for index in range(5):
+                db.session.add(IdempotencyRecord(
+                    user_id=1, key=f'velha-{index}', request_hash='x',
+                    status_code=201, response_body=b'{}', expires_at=past
+                ))
+            db.session.add(IdempotencyRecord(
+                user_id=1, key='nova', request_hash='x', status_code=201,
+                response_body=b'{}', expires_at=datetime.now() + timedelta(hours=1)
+            ))
+            db.session.commit()
+
+            removed = IdempotencyService.sweep_expired(batch_size=2)
+
+            assert removed == 5
+            assert IdempotencyRecord.query.count() == 1
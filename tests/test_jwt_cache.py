@@ -0,0 +1,104 @@
+"""
+Testes para o cache de tokens JWT verificados
+"""
+
+import inspect
+import pytest
+import sys
+import os
+import time
+from unittest.mock import patch
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import flask_jwt_extended.jwt_manager
+from src.main import create_app
+from src.models import db
+from src.middleware.jwt_cache import TokenCache
+
+@pytest.fixture
+def app():
+    """Criar aplicação Flask completa para testes"""
+    app = create_app('testing')
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Cliente de teste"""
+    return app.test_client()
+
+@pytest.fixture
+def auth_headers(client):
+    """Cabeçalhos de autenticação de um usuário registrado"""
+    client.post('/api/register', json={
+        'name': 'João', 'email': 'joao@exemplo.com', 'password': 'senha123'
+    })
+    response = client.post('/api/login', json={
+        'email': 'joao@exemplo.com', 'password': 'senha123'
+    })
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+class TestTokenCache:
+    """Testes para o cache LRU de claims"""
+
+    def test_lru_eviction_and_expiration(self):
+        """Testar limite de tamanho e expiração pelo 'exp'"""
+        cache = TokenCache(max_size=2)
+        future = time.time() + 60
+
+        cache.put(b'a', {'sub': '1'}, future)
+        cache.put(b'b', {'sub': '2'}, future)
+        assert cache.get(b'a') == {'sub': '1'}
+        cache.put(b'c', {'sub': '3'}, future)
+
+        assert cache.get(b'b') is None
+        assert cache.get(b'a') is not None
+        cache.put(b'd', {'sub': '4'}, time.time() - 1)
+        assert cache.get(b'd') is None
+
+        stats = cache.stats()
+        assert stats['hits'] == 2
+        assert stats['misses'] == 2
+        assert stats['evictions'] == 2
+
+class TestCachedJWTManager:
+    """Testes para a verificação única por token"""
+
+    def test_signature_verified_once_per_token(self, client, auth_headers):
+        """Testar que requisições repetidas reutilizam as claims verificadas"""
+        real_decode = flask_jwt_extended.jwt_manager._decode_jwt
+        with patch.object(flask_jwt_extended.jwt_manager, '_decode_jwt', wraps=real_decode) as decode:
+            for _ in range(5):
+                assert client.get('/api/profile', headers=auth_headers).status_code == 200
+            assert decode.call_count == 1
+
+        stats = client.get('/api/metrics', headers=auth_headers).get_json()['jwt_decode_cache']
+        assert stats['hits'] >= 4
+        assert stats['hit_rate'] > 0
+
+    def test_metrics_require_token(self, client):
+        """Testar que as métricas não ficam expostas sem autenticação"""
+        assert client.get('/api/metrics').status_code == 401
+
+    def test_overridden_method_signature(self):
+        """Testar que o método privado sobrescrito por CachedJWTManager não mudou"""
+        method = flask_jwt_extended.JWTManager._decode_jwt_from_config
+
+        assert list(inspect.signature(method).parameters) == ['self', 'encoded_token', 'csrf_value', 'allow_expired']
+
+    def test_tampered_token_is_not_served_from_cache(self, client, auth_headers):
+        """Testar que um token alterado passa pela verificação e é rejeitado"""
+        assert client.get('/api/profile', headers=auth_headers).status_code == 200
+
+        tampered = {'Authorization': auth_headers['Authorization'] + 'x'}
+        response = client.get('/api/profile', headers=tampered)
+        assert response.status_code == 401
+
+    def test_revocation_still_checked(self, client, auth_headers):
+        """Testar que um token em cache ainda é rejeitado após o logout"""
+        assert client.get('/api/profile', headers=auth_headers).status_code == 200
+        client.post('/api/logout', headers=auth_headers)
+        assert client.get('/api/profile', headers=auth_headers).status_code == 401
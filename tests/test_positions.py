@@ -0,0 +1,215 @@
+"""
+Testes para a ordem manual com chaves fracionárias
+"""
+
+import pytest
+import random
+import sys
+import os
+import threading
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from flask import Flask
+from sqlalchemy import event
+from src.config import config
+from src.main import create_app
+from src.models import db, Task
+from src.services import task_service
+from src.services.auth_service import AuthService
+from src.services.fractional_index import key_between
+from src.services.task_service import TaskService
+
+@pytest.fixture
+def app():
+    """Criar aplicação Flask para testes"""
+    app = Flask(__name__)
+    app.config.from_object(config['testing'])
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        AuthService.register_user('João', 'joao@exemplo.com', 'senha123')
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def tasks(app):
+    """Tarefas A, B, C e D criadas nessa ordem"""
+    return {name: TaskService.create_task(1, name)[2].id for name in 'ABCD'}
+
+def manual_order():
+    """Nomes das tarefas na ordem manual"""
+    success, message, data = TaskService.get_user_tasks(1, sort='position')
+    assert success is True, message
+    return ''.join(task['name'] for task in data['tasks'])
+
+def positions():
+    """Chave de posição de cada tarefa"""
+    return {task.name: task.position for task in Task.query.filter_by(user_id=1)}
+
+class TestKeyBetween:
+    """Testes para a geração de chaves"""
+
+    def test_random_inserts_stay_ordered(self):
+        """Testar inserções aleatórias, no início e no fim"""
+        rng = random.Random(7)
+        keys = []
+        for _ in range(2000):
+            index = rng.randint(0, len(keys))
+            before = keys[index - 1] if index else None
+            after = keys[index] if index < len(keys) else None
+            key = key_between(before, after)
+            assert (before is None or before < key) and (after is None or key < after)
+            keys.insert(index, key)
+
+        assert len(set(keys)) == len(keys)
+
+    def test_appends_grow_slowly(self):
+        """Testar que acrescentar no fim mantém as chaves curtas"""
+        key = None
+        for _ in range(10000):
+            key = key_between(key, None)
+
+        assert len(key) <= 4
+
+    @pytest.mark.parametrize('before,after', [('a1', 'a0'), ('a1', 'a1'), ('a10', None), ('!', None)])
+    def test_invalid_keys(self, before, after):
+        """Testar chaves fora de ordem ou malformadas"""
+        with pytest.raises(ValueError):
+            key_between(before, after)
+
+class TestReorder:
+    """Testes para a movimentação e o reequilíbrio"""
+
+    def test_new_tasks_are_appended(self, tasks):
+        """Testar que novas tarefas entram no fim da ordem manual"""
+        assert manual_order() == 'ABCD'
+
+        success, message, data = TaskService.get_user_tasks(1, sort='-position')
+        assert [task['name'] for task in data['tasks']] == list('DCBA')
+
+    def test_move_updates_single_row(self, app, tasks):
+        """Testar que mover grava apenas a chave da tarefa movida"""
+        before = positions()
+        updates = []
+        listener = lambda conn, cursor, statement, *args: updates.append(statement) \
+            if statement.startswith('UPDATE tasks') else None
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            success, message, task = TaskService.reorder_task(tasks['D'], 1, after_id=tasks['A'])
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+        assert success is True
+        assert len(updates) == 1
+        assert manual_order() == 'ADBC'
+        after = positions()
+        assert {name for name in before if before[name] != after[name]} == {'D'}
+
+        TaskService.reorder_task(tasks['C'], 1)
+        assert manual_order() == 'CADB'
+        TaskService.reorder_task(tasks['C'], 1, after_id=tasks['B'])
+        assert manual_order() == 'ADBC'
+
+    @pytest.mark.parametrize('after', ['self', 'missing'])
+    def test_invalid_moves(self, tasks, after):
+        """Testar referência à própria tarefa ou inexistente"""
+        after_id = tasks['B'] if after == 'self' else 999
+
+        success, message, task = TaskService.reorder_task(tasks['B'], 1, after_id=after_id)
+
+        assert success is False
+        assert manual_order() == 'ABCD'
+
+    def test_tasks_without_position(self, tasks):
+        """Testar que tarefas anteriores à ordem manual recebem posições no primeiro movimento"""
+        Task.query.filter(Task.id.in_([tasks['A'], tasks['B']])).update({'position': None})
+        db.session.commit()
+
+        TaskService.reorder_task(tasks['A'], 1, after_id=tasks['D'])
+
+        assert None not in positions().values()
+        assert manual_order() == 'BCDA'
+
+    def test_long_keys_trigger_rebalance(self, app, tasks, monkeypatch):
+        """Testar que chaves longas disparam o reequilíbrio, que mantém a ordem"""
+        jobs = []
+        monkeypatch.setattr(task_service, 'submit_job', lambda fn, *args: jobs.append((fn, args)))
+        app.config['POSITION_REBALANCE_LENGTH'] = 4
+
+        # Inserir sempre no mesmo intervalo faz a chave crescer
+        for _ in range(12):
+            TaskService.reorder_task(tasks['D'], 1, after_id=tasks['A'])
+            TaskService.reorder_task(tasks['C'], 1, after_id=tasks['A'])
+        assert jobs
+        assert jobs[0] == (TaskService.rebalance_positions, (1,))
+        order = manual_order()
+        updated = {task.name: task.updated_at for task in Task.query.filter_by(user_id=1)}
+
+        success, message, count = TaskService.rebalance_positions(1)
+
+        assert success is True
+        assert count == 4
+        assert manual_order() == order
+        assert {task.name: task.updated_at for task in Task.query.filter_by(user_id=1)} == updated
+        assert max(len(key) for key in positions().values()) == 2
+
+    @pytest.mark.parametrize('window', [0, 5])
+    def test_concurrent_creates(self, tmp_path, window):
+        """Testar criações simultâneas do mesmo usuário, com e sem group commit"""
+        app = Flask(__name__)
+        app.config.from_object(config['testing'])
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'app.db'}"
+        app.config['GROUP_COMMIT_WINDOW_MS'] = window
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            AuthService.register_user('João', 'joao@exemplo.com', 'senha123')
+            db.session.remove()
+
+        results = []
+        barrier = threading.Barrier(16)
+
+        def worker(index):
+            with app.app_context():
+                barrier.wait()
+                results.append(TaskService.create_task(1, f'Tarefa {index}'))
+                db.session.remove()
+
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with app.app_context():
+            assert [message for success, message, task in results if not success] == []
+            assert len(set(positions().values())) == 16
+            db.drop_all()
+
+class TestPositionRoute:
+    """Testes para a rota de reposicionamento"""
+
+    def test_route(self):
+        """Testar PUT /tasks/<id>/position e ?sort=position"""
+        app = create_app('testing')
+        client = app.test_client()
+        client.post('/api/register', json={'name': 'João', 'email': 'joao@exemplo.com', 'password': 'senha123'})
+        token = client.post('/api/login', json={'email': 'joao@exemplo.com', 'password': 'senha123'}).get_json()['access_token']
+        headers = {'Authorization': f'Bearer {token}'}
+        ids = [client.post('/api/tasks', json={'name': name}, headers=headers).get_json()['task']['id'] for name in 'ABC']
+
+        response = client.put(f'/api/tasks/{ids[2]}/position', json={'after_id': None}, headers=headers)
+        assert response.status_code == 200
+
+        response = client.get('/api/tasks?sort=position', headers=headers)
+        assert [task['name'] for task in response.get_json()['tasks']] == ['C', 'A', 'B']
+
+        response = client.put(f'/api/tasks/{ids[0]}/position', json={'after_id': 'B'}, headers=headers)
+        assert response.status_code == 400
+        response = client.get('/api/tasks?sort=status,position', headers=headers)
+        assert response.status_code == 400
+        with app.app_context():
+            db.drop_all()
@@ -0,0 +1,249 @@
+"""
+Testes dos planos de consulta da listagem de tarefas
+"""
+
+import pytest
+import re
+import sys
+import os
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import event
+from src.models import db
+from src.services.archive_service import ArchiveService
+from src.services.auth_service import AuthService
+from src.services.recurrence_service import RecurrenceService
+from src.services.reminders import ReminderScheduler
+from src.services.stats_service import StatsService
+from src.services.subtask_service import SubtaskService
+from src.services.tag_service import TagService
+from src.services.task_service import TaskService
+from src.config import config
+from flask import Flask, current_app
+
+# Formatos aceitos pela listagem: (status, sort, filtros de período)
+LIST_SHAPES = [
+    (None, None, {}),
+    ('pendente', None, {}),
+    (None, 'name', {}),
+    (None, '-name', {}),
+    ('concluida', 'name', {}),
+    (None, 'updated_at', {}),
+    ('pendente', '-updated_at', {}),
+    (None, 'status', {}),
+    (None, '-status,-updated_at', {}),
+    (None, 'status,name', {}),
+    (None, None, {'created_after': '2025-01-01T00:00:00'}),
+    (None, 'created_at', {'created_after': '2025-01-01', 'created_before': '2025-12-31'}),
+    ('pendente', None, {'updated_before': '2025-06-01T12:00:00'}),
+    ('concluida', '-updated_at', {'updated_after': '2025-01-01', 'updated_before': '2025-02-01'}),
+    (None, 'position', {}),
+    ('pendente', '-position', {}),
+]
+
+@pytest.fixture
+def app():
+    """Criar aplicação Flask para testes"""
+    app = Flask(__name__)
+    app.config.from_object(config['testing'])
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        success, message, user = AuthService.register_user('Test User', 'test@example.com', 'password123')
+        for index in range(5):
+            TaskService.create_task(user.id, f'Tarefa {index}')
+        yield app
+        db.drop_all()
+
+# Tabelas cujas consultas precisam usar índice
+CHECKED_TABLES = re.compile(r'\b(?:FROM|JOIN|UPDATE|INTO)\s+(tasks|tasks_archive|task_daily_stats|task_tags|tag_counts|task_closure|task_occurrences|users)\b')
+# Passos do plano que indicam varredura completa ou ordenação em memória
+BAD_STEPS = re.compile(r'^SCAN (tasks|tasks_archive|task_daily_stats|task_tags|tag_counts|task_closure|task_occurrences|users)\b|TEMP B-TREE')
+
+def explain(statement, parameters):
+    """Linhas do EXPLAIN QUERY PLAN de uma consulta"""
+    with db.engine.connect() as conn:
+        rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+    return [row[-1] for row in rows]
+
+def capture_queries(call):
+    """Executar a chamada e devolver as consultas feitas nas tabelas verificadas"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and CHECKED_TABLES.search(statement):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        result = call()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    return result, statements
+
+def assert_indexed(statements):
+    """Falhar se alguma consulta varrer uma tabela verificada ou ordenar em memória"""
+    for statement, parameters in statements:
+        plan = explain(statement, parameters)
+        bad = [step for step in plan if BAD_STEPS.search(step)]
+        assert not bad, f"{statement}\n{plan}"
+
+class TestListQueryPlans:
+    """Testes que garantem que cada formato aceito usa um índice"""
+
+    @pytest.mark.parametrize('status,sort,date_filters', LIST_SHAPES)
+    def test_shape_uses_index(self, app, status, sort, date_filters):
+        """Testar que a consulta não varre a tabela nem ordena em memória"""
+        (success, message, data), statements = capture_queries(
+            lambda: TaskService.get_user_tasks(1, status=status, sort=sort, date_filters=date_filters)
+        )
+
+        assert success is True, message
+        assert statements
+        assert_indexed(statements)
+
+    def test_sorting_results(self, app):
+        """Testar a ordem dos resultados e o desempate estável"""
+        success, message, data = TaskService.get_user_tasks(1, sort='name')
+        assert [task['name'] for task in data['tasks']] == [f'Tarefa {i}' for i in range(5)]
+
+        success, message, data = TaskService.get_user_tasks(1, sort='-name')
+        assert [task['name'] for task in data['tasks']] == [f'Tarefa {i}' for i in reversed(range(5))]
+
+    @pytest.mark.parametrize('status,sort,date_filters', [
+        (None, 'description', {}),
+        (None, 'name,created_at', {}),
+        (None, 'status,-name', {}),
+        (None, 'name', {'created_after': '2025-01-01'}),
+        (None, None, {'created_after': '2025-01-01', 'updated_before': '2025-01-01'}),
+        (None, 'status,created_at', {'created_after': '2025-01-01'}),
+        (None, None, {'created_after': 'ontem'}),
+        (None, 'status,position', {}),
+    ])
+    def test_rejected_shapes(self, app, status, sort, date_filters):
+        """Testar que formatos sem índice adequado são rejeitados"""
+        success, message, data = TaskService.get_user_tasks(1, status=status, sort=sort, date_filters=date_filters)
+
+        assert success is False
+        assert data is None
+
+# Cenários do harness: cada um chama um método de serviço sobre o banco
+# populado pela fixture (usuário 1 com tarefas ativas e arquivadas). Um
+# método novo em TaskService, StatsService, TagService, SubtaskService,
+# RecurrenceService ou AuthService que acesse o banco deve ganhar um cenário aqui;
+# test_every_service_method_has_scenario garante isso.
+SERVICE_SCENARIOS = {
+    'AuthService.email_in_use': lambda: AuthService.email_in_use('test@example.com'),
+    'AuthService.find_user_by_email': lambda: AuthService.find_user_by_email('test@example.com'),
+    'AuthService.register_user': lambda: AuthService.register_user('Outro', 'outro@example.com', 'password123'),
+    'AuthService.authenticate_user': lambda: AuthService.authenticate_user('test@example.com', 'password123'),
+    'AuthService.get_user_by_id': lambda: AuthService.get_user_by_id(1),
+    'AuthService.update_user': lambda: AuthService.update_user(1, name='Novo', email='novo@example.com'),
+    'AuthService.update_user[if_match]': lambda: AuthService.update_user(1, name='Outro', expected_version=2),
+    'AuthService.delete_user': lambda: AuthService.delete_user(1),
+    'AuthService.purge_user': lambda: AuthService.purge_user(1, chunk_size=2),
+    'TaskService.create_task': lambda: TaskService.create_task(1, 'Nova tarefa'),
+    'TaskService.get_user_tasks': lambda: TaskService.get_user_tasks(1, page=2, per_page=2),
+    'TaskService.get_user_tasks[archived]': lambda: TaskService.get_user_tasks(1, include_archived=True),
+    'TaskService.iter_user_tasks': lambda: list(TaskService.iter_user_tasks(1, include_archived=True)),
+    'TaskService.get_task_by_id': lambda: TaskService.get_task_by_id(1, 1),
+    'TaskService.update_task': lambda: TaskService.update_task(1, 1, status='concluida'),
+    'TaskService.update_task[if_match]': lambda: TaskService.update_task(3, 1, name='Nova', expected_version=1),
+    'TaskService.delete_task': lambda: TaskService.delete_task(2, 1),
+    'TaskService.purge_task_ids': lambda: TaskService.purge_task_ids(db.session, [3, 4]),
+    'TaskService.get_task_statistics': lambda: TaskService.get_task_statistics(1),
+    'StatsService.record_completion': lambda: StatsService.record_completion(db.session, 1, datetime.now(), 1),
+    'StatsService.record_purged_completions': lambda: StatsService.record_purged_completions(db.session, [5, 6]),
+    'StatsService.get_completion_timeseries': lambda: StatsService.get_completion_timeseries(1, bucket='week'),
+    'TaskService.get_user_tasks[tags_all]': lambda: TaskService.get_user_tasks(1, tags=['casa', 'urgente']),
+    'TaskService.get_user_tasks[tags_any]': lambda: TaskService.get_user_tasks(1, tags=['casa', 'urgente'], tag_mode='any'),
+    'TaskService.get_user_tasks[tag_status]': lambda: TaskService.get_user_tasks(1, status='pendente', tags=['casa'], sort='name'),
+    'TagService.set_task_tags': lambda: TagService.set_task_tags(db.session, 1, 1, ['urgente', 'nova']),
+    'TagService.purge_task_tags': lambda: TagService.purge_task_tags(db.session, [1, 3]),
+    'TagService.load_tags': lambda: TagService.load_tags([1, 3, 7]),
+    'TagService.get_tag_cloud': lambda: TagService.get_tag_cloud(1),
+    'TagService.attach_tags': lambda: TagService.attach_tags([TaskService.get_task_by_id(1, 1)[2]]),
+    'TaskService.create_task[subtask]': lambda: TaskService.create_task(1, 'Nova subtarefa', parent_id=16),
+    'TaskService.move_task': lambda: TaskService.move_task(16, 1, 3),
+    'TaskService.move_task[root]': lambda: TaskService.move_task(16, 1, None),
+    'TaskService.complete_subtree': lambda: TaskService.complete_subtree(1, 1),
+    'TaskService.delete_task[subtree]': lambda: TaskService.delete_task(1, 1),
+    'TaskService.get_user_tasks[position]': lambda: TaskService.get_user_tasks(1, sort='position'),
+    'TaskService.reorder_task': lambda: TaskService.reorder_task(2, 1, after_id=4),
+    'TaskService.reorder_task[first]': lambda: TaskService.reorder_task(4, 1),
+    'TaskService.rebalance_positions': lambda: TaskService.rebalance_positions(1),
+    'SubtaskService.check_parent': lambda: SubtaskService.check_parent(db.session, 1, 16, 3),
+    'SubtaskService.attach': lambda: SubtaskService.attach(db.session, 1, 3, 17),
+    'SubtaskService.detach': lambda: SubtaskService.detach(db.session, 1, 16),
+    'SubtaskService.subtree_ids': lambda: SubtaskService.subtree_ids(db.session, 1, 1),
+    'SubtaskService.purge_links': lambda: SubtaskService.purge_links(db.session, [16, 17]),
+    'SubtaskService.get_subtree': lambda: SubtaskService.get_subtree(1, 1),
+    'SubtaskService.get_ancestors': lambda: SubtaskService.get_ancestors(17, 1),
+    'SubtaskService.get_subtree_statistics': lambda: SubtaskService.get_subtree_statistics(1, 1),
+    'TaskService.create_task[recurring]': lambda: TaskService.create_task(1, 'Semanal', recurrence='semanal'),
+    'TaskService.get_user_tasks[occurrences]': lambda: TaskService.get_user_tasks(
+        1, status='pendente', occurrences_from=date.today().isoformat(),
+        occurrences_to=(date.today() + timedelta(days=6)).isoformat()
+    ),
+    'TaskService.update_occurrence': lambda: TaskService.update_occurrence(18, 1, date.today().isoformat(), status='pendente'),
+    'TaskService.update_occurrence[new]': lambda: TaskService.update_occurrence(
+        18, 1, (date.today() + timedelta(days=1)).isoformat(), name='Amanhã'
+    ),
+    'RecurrenceService.expand': lambda: RecurrenceService.expand(db.session, 1, (date.today(), date.today())),
+    'RecurrenceService.purge_occurrences': lambda: RecurrenceService.purge_occurrences(db.session, [18]),
+    'TaskService.delete_task[recurring]': lambda: TaskService.delete_task(18, 1),
+    'TaskService.update_task[due_at]': lambda: TaskService.update_task(4, 1, due_at='2030-01-01T09:00:00'),
+    'ReminderScheduler.load': lambda: ReminderScheduler(current_app).load(datetime.now()),
+    'ReminderScheduler.claim': lambda: ReminderScheduler(current_app).claim(0, [2, 4], datetime.now()),
+}
+
+# Métodos que não acessam o banco
+PURE_METHODS = {'validate_email', 'validate_password', 'validate_task_data', 'parse_list_shape', 'normalize_tags',
+                'descendants_query', 'parse_window', 'occurs_on', 'occurrence_dict', 'parse_due_at'}
+# Manutenção que percorre as tabelas inteiras de propósito
+MAINTENANCE_METHODS = {'backfill_completions'}
+
+@pytest.fixture
+def seeded_app(app):
+    """Banco com vários usuários, tarefas de ambos os status, tarefas arquivadas e subtarefas"""
+    for index in range(2, 5):
+        success, message, user = AuthService.register_user(f'Usuário {index}', f'user{index}@example.com', 'password123')
+        for task_index in range(3):
+            TaskService.create_task(user.id, f'Tarefa {task_index}', status='concluida')
+    TaskService.update_task(5, 1, status='concluida')
+    ArchiveService.archive_completed_tasks(older_than_days=-1)
+    TaskService.create_task(1, 'Tarefa recente', tags=['casa', 'urgente'])
+    TaskService.update_task(1, 1, tags=['casa'])
+    success, message, subtask = TaskService.create_task(1, 'Subtarefa', parent_id=1)
+    TaskService.create_task(1, 'Subtarefa da subtarefa', parent_id=subtask.id)
+    assert subtask.id == 16
+    success, message, recurring = TaskService.create_task(1, 'Diária', recurrence='diaria')
+    TaskService.update_occurrence(recurring.id, 1, date.today().isoformat(), status='concluida')
+    assert recurring.id == 18
+    TaskService.update_task(2, 1, due_at=(datetime.now() - timedelta(minutes=1)).isoformat())
+    return app
+
+class TestServiceQueryPlans:
+    """Harness de planos de consulta para os serviços de tarefas, estatísticas e autenticação"""
+
+    def test_every_service_method_has_scenario(self):
+        """Testar que todo método público que acessa o banco tem cenário"""
+        covered = {name.split('[')[0] for name in SERVICE_SCENARIOS}
+        for service in (AuthService, TaskService, StatsService, TagService, SubtaskService, RecurrenceService):
+            for name, member in vars(service).items():
+                if (isinstance(member, staticmethod) and not name.startswith('_')
+                        and name not in PURE_METHODS | MAINTENANCE_METHODS):
+                    assert f'{service.__name__}.{name}' in covered, f'Sem cenário de plano: {service.__name__}.{name}'
+
+    @pytest.mark.parametrize('scenario', sorted(SERVICE_SCENARIOS))
+    def test_scenario_uses_indexes(self, seeded_app, scenario):
+        """Testar que as consultas do cenário não varrem tabelas nem ordenam em memória"""
+        result, statements = capture_queries(SERVICE_SCENARIOS[scenario])
+
+        assert statements, f'{scenario} não executou consultas'
+        assert_indexed(statements)
@@ -0,0 +1,215 @@
+"""
+Testes para as tarefas recorrentes e a expansão das ocorrências
+"""
+
+import pytest
+import sys
+import os
+from datetime import date, datetime, timedelta
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from flask import Flask
+from src.config import config
+from src.main import create_app
+from src.models import db, Task, TaskDailyStat, TaskOccurrence
+from src.services.auth_service import AuthService
+from src.services.recurrence_service import RecurrenceService
+from src.services.task_service import TaskService
+
+# Segunda-feira
+START = date(2026, 3, 2)
+
+@pytest.fixture
+def app():
+    """Criar aplicação Flask para testes"""
+    app = Flask(__name__)
+    app.config.from_object(config['testing'])
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        AuthService.register_user('João', 'joao@exemplo.com', 'senha123')
+        yield app
+        db.drop_all()
+
+def create(name, recurrence, created=START):
+    """Criar uma tarefa recorrente com a série começando em created"""
+    success, message, task = TaskService.create_task(1, name, recurrence=recurrence)
+    assert success is True, message
+    db.session.get(Task, task.id).created_at = datetime.combine(created, datetime.min.time())
+    db.session.commit()
+    return task.id
+
+def occurrences(start, end=None, status=None):
+    """Ocorrências da listagem no período"""
+    success, message, data = TaskService.get_user_tasks(
+        1, status=status, occurrences_from=start.isoformat(), occurrences_to=end and end.isoformat()
+    )
+    assert success is True, message
+    return data['occurrences']
+
+def completed_on(day):
+    """Conclusões do agregado diário no dia"""
+    row = db.session.get(TaskDailyStat, (1, day))
+    return row.completed if row else 0
+
+class TestExpansion:
+    """Testes para a geração das ocorrências na leitura"""
+
+    def test_daily_and_weekly(self, app):
+        """Testar as ocorrências do período sem gravar nenhuma"""
+        daily = create('Diária', 'diaria')
+        weekly = create('Semanal', 'semanal')
+
+        result = occurrences(START + timedelta(days=5), START + timedelta(days=8))
+
+        assert [(item['date'], item['task_id']) for item in result] == [
+            ('2026-03-07', daily), ('2026-03-08', daily), ('2026-03-09', daily), ('2026-03-09', weekly),
+            ('2026-03-10', daily)
+        ]
+        assert all(item['status'] == 'pendente' for item in result)
+        assert TaskOccurrence.query.count() == 0
+
+    def test_window_before_series(self, app):
+        """Testar que a série começa no dia de criação"""
+        create('Diária', 'diaria')
+
+        assert occurrences(START - timedelta(days=3), START - timedelta(days=1)) == []
+        assert len(occurrences(START - timedelta(days=3), START + timedelta(days=1))) == 2
+
+    def test_listing_without_window(self, app):
+        """Testar que sem período a listagem não traz ocorrências"""
+        create('Diária', 'diaria')
+
+        success, message, data = TaskService.get_user_tasks(1)
+
+        assert 'occurrences' not in data
+        assert data['tasks'][0]['recurrence'] == 'diaria'
+
+    def test_completed_series_ends(self, app):
+        """Testar que concluir a tarefa recorrente encerra a série"""
+        task_id = create('Diária', 'diaria')
+        TaskService.update_task(task_id, 1, status='concluida')
+        db.session.get(Task, task_id).completed_at = datetime.combine(START + timedelta(days=2), datetime.min.time())
+        db.session.commit()
+
+        assert [item['date'] for item in occurrences(START, START + timedelta(days=5))] == [
+            '2026-03-02', '2026-03-03', '2026-03-04'
+        ]
+
+    def test_completed_series_hides_later_edits(self, app):
+        """Testar que ocorrências alteradas depois do fim da série não aparecem"""
+        task_id = create('Diária', 'diaria')
+        TaskService.update_occurrence(task_id, 1, (START + timedelta(days=4)).isoformat(), name='Futura')
+        TaskService.update_task(task_id, 1, status='concluida')
+        db.session.get(Task, task_id).completed_at = datetime.combine(START + timedelta(days=2), datetime.min.time())
+        db.session.commit()
+
+        assert [item['date'] for item in occurrences(START, START + timedelta(days=5))] == [
+            '2026-03-02', '2026-03-03', '2026-03-04'
+        ]
+
+    @pytest.mark.parametrize('start,end', [('2026-03-10', '2026-03-01'), ('2026-01-01', '2026-03-31'), ('ontem', None)])
+    def test_invalid_window(self, app, start, end):
+        """Testar períodos invertidos, longos demais ou mal formados"""
+        success, message, data = TaskService.get_user_tasks(1, occurrences_from=start, occurrences_to=end)
+
+        assert success is False
+
+class TestOccurrenceWrites:
+    """Testes para a conclusão e a alteração de ocorrências"""
+
+    def test_complete_and_reopen(self, app):
+        """Testar que concluir grava só a ocorrência e conta no agregado do dia"""
+        task_id = create('Diária', 'diaria')
+        day = START + timedelta(days=1)
+
+        success, message, occurrence = TaskService.update_occurrence(task_id, 1, day.isoformat(), status='concluida')
+
+        assert success is True
+        assert occurrence['status'] == 'concluida'
+        assert TaskOccurrence.query.count() == 1
+        assert completed_on(date.today()) == 1
+        assert [item['status'] for item in occurrences(START, START + timedelta(days=2))] == [
+            'pendente', 'concluida', 'pendente'
+        ]
+        assert [item['date'] for item in occurrences(START, START + timedelta(days=2), status='pendente')] == [
+            '2026-03-02', '2026-03-04'
+        ]
+
+        TaskService.update_occurrence(task_id, 1, day.isoformat(), status='pendente')
+        assert completed_on(date.today()) == 0
+        assert db.session.get(Task, task_id).status == 'pendente'
+
+    def test_rename_single_occurrence(self, app):
+        """Testar que alterar uma ocorrência não muda as demais"""
+        task_id = create('Treino', 'semanal')
+
+        TaskService.update_occurrence(task_id, 1, (START + timedelta(days=7)).isoformat(), name='Treino leve')
+
+        assert [item['name'] for item in occurrences(START, START + timedelta(days=14))] == [
+            'Treino', 'Treino leve', 'Treino'
+        ]
+
+    @pytest.mark.parametrize('day,recurrence', [('2026-03-03', 'semanal'), ('2026-03-01', 'diaria'),
+                                                ('amanhã', 'diaria'), ('2026-03-02', None)])
+    def test_invalid_occurrence(self, app, day, recurrence):
+        """Testar dias fora da regra, datas inválidas e tarefas não recorrentes"""
+        task_id = create('Tarefa', recurrence)
+
+        success, message, occurrence = TaskService.update_occurrence(task_id, 1, day, status='concluida')
+
+        assert success is False
+        assert TaskOccurrence.query.count() == 0
+
+    def test_delete_purges_occurrences(self, app):
+        """Testar que excluir a tarefa remove as ocorrências e desconta as conclusões"""
+        task_id = create('Diária', 'diaria')
+        TaskService.update_occurrence(task_id, 1, START.isoformat(), status='concluida')
+        TaskService.update_occurrence(task_id, 1, (START + timedelta(days=1)).isoformat(), name='Outra')
+
+        TaskService.delete_task(task_id, 1)
+
+        assert TaskOccurrence.query.count() == 0
+        assert completed_on(date.today()) == 0
+
+    def test_window_helpers(self):
+        """Testar as regras e o período padrão de um dia"""
+        assert RecurrenceService.parse_window('2026-03-02')[2] == (START, START)
+        assert RecurrenceService.occurs_on('semanal', START, START + timedelta(days=14)) is True
+        assert RecurrenceService.occurs_on('semanal', START, START + timedelta(days=15)) is False
+
+class TestRecurrenceRoutes:
+    """Testes para as rotas de tarefas recorrentes"""
+
+    def test_routes(self):
+        """Testar criação com recorrência, listagem com ocorrências e conclusão de uma ocorrência"""
+        app = create_app('testing')
+        client = app.test_client()
+        client.post('/api/register', json={'name': 'João', 'email': 'joao@exemplo.com', 'password': 'senha123'})
+        token = client.post('/api/login', json={'email': 'joao@exemplo.com', 'password': 'senha123'}).get_json()['access_token']
+        headers = {'Authorization': f'Bearer {token}'}
+        today = date.today()
+
+        response = client.post('/api/tasks', json={'name': 'Diária', 'recurrence': 'diaria'}, headers=headers)
+        assert response.status_code == 201
+        task_id = response.get_json()['task']['id']
+        response = client.post('/api/tasks', json={'name': 'Mensal', 'recurrence': 'mensal'}, headers=headers)
+        assert response.status_code == 400
+
+        response = client.put(f'/api/tasks/{task_id}/occurrences/{today.isoformat()}',
+                              json={'status': 'concluida'}, headers=headers)
+        assert response.status_code == 200
+
+        end = (today + timedelta(days=2)).isoformat()
+        response = client.get(f'/api/tasks?occurrences_from={today.isoformat()}&occurrences_to={end}', headers=headers)
+        assert [item['status'] for item in response.get_json()['occurrences']] == ['concluida', 'pendente', 'pendente']
+        response = client.get(f'/api/tasks/pending?occurrences_from={today.isoformat()}', headers=headers)
+        assert response.get_json()['occurrences'] == []
+
+        response = client.put(f'/api/tasks/{task_id}/occurrences/ontem', json={'status': 'concluida'}, headers=headers)
+        assert response.status_code == 400
+        with app.app_context():
+            db.drop_all()
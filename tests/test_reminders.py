@@ -0,0 +1,241 @@
+"""
+Testes para os prazos das tarefas e o agendador de lembretes
+"""
+
+import pytest
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from flask import Flask
+from src.config import config
+from src.main import create_app
+from src.models import db, Task
+from src.services.auth_service import AuthService
+from src.services.reminders import ReminderScheduler, load_sink, log_sink, start_reminders
+from src.services.task_service import TaskService
+
+NOW = datetime(2026, 3, 2, 9, 0)
+
+@pytest.fixture
+def app():
+    """Criar aplicação Flask para testes"""
+    app = Flask(__name__)
+    app.config.from_object(config['testing'])
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        AuthService.register_user('João', 'joao@exemplo.com', 'senha123')
+        yield app
+        db.drop_all()
+
+def create(name, due_at, status='pendente'):
+    """Criar uma tarefa com prazo"""
+    success, message, task = TaskService.create_task(1, name, status=status, due_at=due_at.isoformat())
+    assert success is True, message
+    return task.id
+
+def scheduler(app, fired, **options):
+    """Agendador sem thread, disparado pelos testes com run_pending(now)"""
+    return ReminderScheduler(app, sink=fired.append, **options)
+
+class TestDueAt:
+    """Testes para o prazo nas escritas de tarefas"""
+
+    def test_create_and_update(self, app):
+        """Testar prazo com fuso convertido para o horário local e remoção com texto vazio"""
+        task_id = create('Tarefa', NOW)
+        assert TaskService.get_task_by_id(task_id, 1)[2].to_dict()['due_at'] == '2026-03-02T09:00:00'
+
+        success, message, task = TaskService.update_task(task_id, 1, due_at='2026-03-02T12:00:00+00:00')
+        assert task.due_at == datetime.fromisoformat('2026-03-02T12:00:00+00:00').astimezone().replace(tzinfo=None)
+
+        success, message, task = TaskService.update_task(task_id, 1, due_at='')
+        assert success is True
+        assert task.due_at is None
+
+    def test_invalid_due_at(self, app):
+        """Testar prazo mal formado"""
+        success, message, task = TaskService.create_task(1, 'Tarefa', due_at='amanhã')
+
+        assert success is False
+        assert Task.query.count() == 0
+
+    def test_new_due_at_rearms_reminder(self, app):
+        """Testar que mudar o prazo de um lembrete já disparado gera um novo lembrete"""
+        fired = []
+        task_id = create('Tarefa', NOW)
+        scheduler(app, fired).run_pending(NOW)
+
+        TaskService.update_task(task_id, 1, due_at=(NOW + timedelta(hours=1)).isoformat())
+        scheduler(app, fired).run_pending(NOW + timedelta(hours=1))
+
+        assert [reminder['due_at'] for reminder in fired] == ['2026-03-02T09:00:00', '2026-03-02T10:00:00']
+
+class TestReminderScheduler:
+    """Testes para o disparo dos lembretes"""
+
+    def test_fires_in_due_order(self, app):
+        """Testar que só os lembretes vencidos disparam, em ordem de prazo"""
+        fired = []
+        late = create('Depois', NOW + timedelta(minutes=2))
+        early = create('Antes', NOW + timedelta(minutes=1))
+        create('Amanhã', NOW + timedelta(days=1))
+        reminders = scheduler(app, fired, lookahead_seconds=600, poll_seconds=120)
+
+        wait = reminders.run_pending(NOW)
+        assert fired == []
+        assert len(reminders) == 2
+        assert wait == 60
+
+        reminders.run_pending(NOW + timedelta(minutes=5))
+        assert [reminder['task_id'] for reminder in fired] == [early, late]
+        assert fired[0] == {'task_id': early, 'user_id': 1, 'name': 'Antes', 'due_at': '2026-03-02T09:01:00'}
+        assert db.session.get(Task, early).reminded_at == NOW + timedelta(minutes=5)
+
+    def test_fires_once(self, app):
+        """Testar que um lembrete disparado não volta depois de recarregar"""
+        fired = []
+        create('Tarefa', NOW)
+        reminders = scheduler(app, fired, poll_seconds=1)
+
+        reminders.run_pending(NOW)
+        reminders.run_pending(NOW + timedelta(minutes=1))
+
+        assert len(fired) == 1
+
+    def test_two_schedulers_fire_once(self, app):
+        """Testar que dois agendadores (dois processos) entregam cada lembrete uma vez"""
+        first, second = [], []
+        for index in range(3):
+            create(f'Tarefa {index}', NOW)
+        schedulers = [scheduler(app, first), scheduler(app, second)]
+        for reminders in schedulers:
+            reminders.load(NOW)
+        assert [len(reminders) for reminders in schedulers] == [3, 3]
+
+        for reminders in schedulers:
+            reminders.run_pending(NOW)
+
+        assert len(first) == 3
+        assert second == []
+
+    def test_restart_fires_missed_reminders(self, app):
+        """Testar que um agendador novo dispara os lembretes vencidos enquanto estava parado"""
+        fired = []
+        create('Ontem', NOW - timedelta(days=1))
+        create('Concluída', NOW - timedelta(days=1), status='concluida')
+
+        scheduler(app, fired).run_pending(NOW)
+
+        assert [reminder['name'] for reminder in fired] == ['Ontem']
+
+    def test_completed_or_postponed_skipped(self, app):
+        """Testar que tarefas concluídas ou com prazo adiado depois da carga não disparam"""
+        fired = []
+        done = create('Concluída', NOW + timedelta(minutes=1))
+        postponed = create('Adiada', NOW + timedelta(minutes=1))
+        reminders = scheduler(app, fired)
+        reminders.load(NOW)
+
+        TaskService.update_task(done, 1, status='concluida')
+        TaskService.update_task(postponed, 1, due_at=(NOW + timedelta(days=1)).isoformat())
+        reminders.run_pending(NOW + timedelta(minutes=1))
+
+        assert fired == []
+
+    def test_batches_limit_loaded_window(self, app):
+        """Testar que a carga em lotes limita o heap e traz o restante depois"""
+        fired = []
+        for index in range(5):
+            create(f'Tarefa {index}', NOW + timedelta(seconds=index))
+        reminders = scheduler(app, fired, batch_size=2)
+
+        reminders.load(NOW)
+        assert len(reminders) == 2
+        while reminders.run_pending(NOW + timedelta(seconds=10)) == 0 and len(fired) < 5:
+            pass
+
+        assert [reminder['name'] for reminder in fired] == [f'Tarefa {index}' for index in range(5)]
+
+    def test_schedule_within_window(self, app):
+        """Testar que escritas do próprio processo entram no heap sem esperar a próxima carga"""
+        fired = []
+        reminders = scheduler(app, fired)
+        app.extensions['reminders'] = reminders
+        reminders.load(datetime.now())
+
+        task_id = create('Tarefa', datetime.now() + timedelta(seconds=30))
+        create('Longe', datetime.now() + timedelta(days=1))
+
+        assert len(reminders) == 1
+        reminders.run_pending(datetime.now() + timedelta(minutes=1))
+        assert [reminder['task_id'] for reminder in fired] == [task_id]
+
+    def test_failing_sink_does_not_stop_others(self, app):
+        """Testar que uma falha na entrega não impede os demais lembretes"""
+        fired = []
+
+        def sink(reminder):
+            if reminder['name'] == 'Falha':
+                raise RuntimeError('destino indisponível')
+            fired.append(reminder)
+
+        create('Falha', NOW)
+        create('Entregue', NOW)
+        ReminderScheduler(app, sink=sink).run_pending(NOW)
+
+        assert [reminder['name'] for reminder in fired] == ['Entregue']
+
+    def test_load_sink(self):
+        """Testar o destino padrão e o destino por caminho"""
+        assert load_sink(None) is log_sink
+        assert load_sink('src.services.reminders:log_sink') is log_sink
+        assert load_sink(print) is print
+
+    def test_thread(self, app):
+        """Testar que a thread do agendador dispara um lembrete vencido"""
+        fired = []
+        create('Vencida', datetime.now() - timedelta(minutes=1))
+        app.config['REMINDER_SINK'] = fired.append
+
+        reminders = start_reminders(app)
+        try:
+            for attempt in range(100):
+                if fired:
+                    break
+                time.sleep(0.05)
+        finally:
+            reminders.stop()
+
+        assert [reminder['name'] for reminder in fired] == ['Vencida']
+
+class TestDueAtRoutes:
+    """Testes para o prazo nas rotas de tarefas"""
+
+    def test_routes(self):
+        """Testar criação com prazo, prazo inválido e remoção do prazo"""
+        app = create_app('testing')
+        client = app.test_client()
+        client.post('/api/register', json={'name': 'João', 'email': 'joao@exemplo.com', 'password': 'senha123'})
+        token = client.post('/api/login', json={'email': 'joao@exemplo.com', 'password': 'senha123'}).get_json()['access_token']
+        headers = {'Authorization': f'Bearer {token}'}
+
+        response = client.post('/api/tasks', json={'name': 'Tarefa', 'due_at': '2026-03-02T09:00:00'}, headers=headers)
+        assert response.status_code == 201
+        task = response.get_json()['task']
+        assert task['due_at'] == '2026-03-02T09:00:00'
+        response = client.post('/api/tasks', json={'name': 'Tarefa', 'due_at': 'amanhã'}, headers=headers)
+        assert response.status_code == 400
+
+        response = client.put(f"/api/tasks/{task['id']}", json={'due_at': ''}, headers=headers)
+        assert response.status_code == 200
+        assert response.get_json()['task']['due_at'] is None
+        assert 'reminders' not in app.extensions
+        with app.app_context():
+            db.drop_all()
@@ -0,0 +1,144 @@
+"""
+Testes para o cache de respostas por usuário
+"""
+
+import pytest
+import sys
+import os
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import event
+from src.main import create_app
+from src.models import db
+from src.services.response_cache import ResponseCache
+
+@pytest.fixture
+def app():
+    """Criar aplicação Flask completa com o cache de respostas ativado"""
+    app = create_app('testing')
+    app.config['RESPONSE_CACHE_MAX_BYTES'] = 1024 * 1024
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Cliente de teste"""
+    return app.test_client()
+
+def login(client, email):
+    """Registrar e autenticar um usuário, devolvendo os cabeçalhos"""
+    client.post('/api/register', json={'name': 'Usuário', 'email': email, 'password': 'senha123'})
+    response = client.post('/api/login', json={'email': email, 'password': 'senha123'})
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+class TestResponseCache:
+    """Testes para o cache LRU com versões por usuário"""
+
+    def test_memory_bound(self):
+        """Testar que o total de bytes respeita o limite com despejo LRU"""
+        cache = ResponseCache(max_bytes=1200)
+        for index in range(10):
+            cache.put((1, 'tasks.get_tasks', (('page', str(index)),), 0), (b'x' * 300, 200, 'application/json'))
+
+        stats = cache.stats()
+        assert stats['bytes'] <= 1200
+        assert stats['entries'] == 2
+        assert stats['evictions'] == 8
+
+    def test_versions_bounded_by_entries(self):
+        """Testar que a versão de um usuário é esquecida com a última entrada dele"""
+        cache = ResponseCache(max_bytes=1200)
+        for user_id in range(100):
+            cache.bump(user_id)
+            cache.put((user_id, '/api/tasks', (), cache.version(user_id)), (b'x' * 300, 200, 'application/json'))
+
+        stats = cache.stats()
+        assert stats['entries'] == 2
+        assert stats['users'] == 2
+
+    def test_forgotten_version_rejects_stale_put(self):
+        """Testar que uma resposta calculada antes de uma escrita não volta depois de a versão ser esquecida"""
+        cache = ResponseCache(max_bytes=1200)
+        stale_key = (1, '/api/tasks', (), cache.version(1))
+        cache.put((1, '/api/profile', (), cache.version(1)), (b'x' * 300, 200, 'application/json'))
+        cache.bump(1)
+        # Outros usuários despejam a única entrada do usuário 1
+        for user_id in range(2, 6):
+            cache.put((user_id, '/api/tasks', (), cache.version(user_id)), (b'x' * 300, 200, 'application/json'))
+        assert cache.stats()['users'] == 2
+
+        cache.put(stale_key, (b'antiga', 200, 'application/json'))
+
+        assert cache.get((1, '/api/tasks', (), cache.version(1))) is None
+        cache.put((1, '/api/tasks', (), cache.version(1)), (b'nova', 200, 'application/json'))
+        assert cache.get((1, '/api/tasks', (), cache.version(1)))[0] == b'nova'
+
+    def test_reads_served_from_cache(self, app, client):
+        """Testar que leituras repetidas não tocam o banco"""
+        headers = login(client, 'joao@exemplo.com')
+        client.post('/api/tasks', json={'name': 'Tarefa'}, headers=headers)
+
+        first = client.get('/api/tasks', headers=headers)
+        assert first.headers['X-Cache'] == 'MISS'
+
+        statements = []
+        with app.app_context():
+            event.listen(db.engine, 'before_cursor_execute',
+                         lambda conn, cursor, statement, *args: statements.append(statement))
+
+        second = client.get('/api/tasks', headers=headers)
+        assert second.headers['X-Cache'] == 'HIT'
+        assert second.get_json() == first.get_json()
+        assert statements == []
+
+        # Parâmetros diferentes são outra entrada
+        assert client.get('/api/tasks?page=2', headers=headers).headers['X-Cache'] == 'MISS'
+
+    def test_writes_invalidate_user_entries(self, client):
+        """Testar que escritas do usuário invalidam apenas as respostas dele"""
+        headers = login(client, 'joao@exemplo.com')
+        other = login(client, 'maria@exemplo.com')
+
+        client.get('/api/tasks/stats', headers=headers)
+        client.get('/api/tasks/stats', headers=other)
+        response = client.post('/api/tasks', json={'name': 'Tarefa'}, headers=headers)
+        task_id = response.get_json()['task']['id']
+
+        response = client.get('/api/tasks/stats', headers=headers)
+        assert response.headers['X-Cache'] == 'MISS'
+        assert response.get_json()['statistics']['total'] == 1
+        assert client.get('/api/tasks/stats', headers=other).headers['X-Cache'] == 'HIT'
+
+        client.put(f'/api/tasks/{task_id}', json={'status': 'concluida'}, headers=headers)
+        response = client.get('/api/tasks/stats', headers=headers)
+        assert response.get_json()['statistics']['concluida'] == 1
+
+        client.get('/api/profile', headers=headers)
+        client.put('/api/profile', json={'name': 'Novo Nome'}, headers=headers)
+        response = client.get('/api/profile', headers=headers)
+        assert response.headers['X-Cache'] == 'MISS'
+        assert response.get_json()['user']['name'] == 'Novo Nome'
+
+    def test_errors_not_cached(self, client):
+        """Testar que respostas de erro não são guardadas"""
+        headers = login(client, 'joao@exemplo.com')
+
+        client.get('/api/tasks?status=invalido', headers=headers)
+        response = client.get('/api/tasks?status=invalido', headers=headers)
+        assert response.status_code == 400
+        assert response.headers['X-Cache'] == 'MISS'
+
+    def test_disabled_by_default(self):
+        """Testar que sem configuração as rotas não usam o cache"""
+        app = create_app('testing')
+        client = app.test_client()
+        headers = login(client, 'joao@exemplo.com')
+
+        response = client.get('/api/tasks', headers=headers)
+        assert 'X-Cache' not in response.headers
+        assert client.get('/api/metrics', headers=headers).get_json()['response_cache'] is None
+        with app.app_context():
+            db.drop_all()
@@ -0,0 +1,113 @@
+"""
+Testes para a revogação de tokens
+"""
+
+import pytest
+import sys
+import os
+import time
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import event
+from src.main import create_app
+from src.models import db, RevokedToken
+from src.services.revocation_service import RevocationList, RevocationService
+
+@pytest.fixture
+def app():
+    """Criar aplicação Flask completa para testes"""
+    app = create_app('testing')
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Cliente de teste"""
+    return app.test_client()
+
+@pytest.fixture
+def tokens(client):
+    """Tokens de um usuário registrado"""
+    client.post('/api/register', json={
+        'name': 'João', 'email': 'joao@exemplo.com', 'password': 'senha123'
+    })
+    response = client.post('/api/login', json={
+        'email': 'joao@exemplo.com', 'password': 'senha123'
+    })
+    return response.get_json()
+
+def bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+class TestRevocation:
+    """Testes para logout e revogação por troca de senha"""
+
+    def test_logout_revokes_access_and_refresh(self, client, tokens):
+        """Testar que o logout revoga o token de acesso e o refresh token enviado"""
+        response = client.post('/api/logout', headers=bearer(tokens['access_token']),
+                               json={'refresh_token': tokens['refresh_token']})
+        assert response.status_code == 200
+
+        response = client.get('/api/profile', headers=bearer(tokens['access_token']))
+        assert response.status_code == 401
+        assert response.get_json()['message'] == 'Token revogado'
+
+        response = client.post('/api/refresh', headers=bearer(tokens['refresh_token']))
+        assert response.status_code == 401
+
+    def test_password_change_revokes_all_sessions(self, client, tokens):
+        """Testar que a troca de senha revoga tokens anteriores e devolve novos"""
+        time.sleep(1)  # 'iat' tem resolução de segundos
+        other = client.post('/api/login', json={
+            'email': 'joao@exemplo.com', 'password': 'senha123'
+        }).get_json()
+        time.sleep(1)
+
+        response = client.put('/api/profile', headers=bearer(tokens['access_token']),
+                              json={'password': 'nova_senha'})
+        assert response.status_code == 200
+        fresh = response.get_json()
+
+        for token in (tokens['access_token'], other['access_token']):
+            assert client.get('/api/profile', headers=bearer(token)).status_code == 401
+        assert client.post('/api/refresh', headers=bearer(other['refresh_token'])).status_code == 401
+
+        assert client.get('/api/profile', headers=bearer(fresh['access_token'])).status_code == 200
+
+    def test_check_does_not_query_database(self, app, client, tokens):
+        """Testar que requisições autenticadas não consultam as revogações no banco"""
+        client.get('/api/profile', headers=bearer(tokens['access_token']))
+
+        statements = []
+        with app.app_context():
+            event.listen(db.engine, 'before_cursor_execute',
+                         lambda conn, cursor, statement, *args: statements.append(statement))
+
+        client.get('/api/profile', headers=bearer(tokens['access_token']))
+        assert not any('revoked_tokens' in s or 'user_revocations' in s for s in statements)
+
+    def test_sync_loads_revocations_from_other_processes(self, app, client, tokens):
+        """Testar que a sincronização traz revogações gravadas por outro processo"""
+        client.post('/api/logout', headers=bearer(tokens['access_token']))
+
+        with app.app_context():
+            app.extensions['token_revocations'] = RevocationList()
+            RevocationService.sync()
+            assert len(app.extensions['token_revocations'].tokens) == 1
+            assert RevokedToken.query.count() == 1
+
+        response = client.get('/api/profile', headers=bearer(tokens['access_token']))
+        assert response.status_code == 401
+
+    def test_sync_prunes_old_cutoffs(self, app):
+        """Testar que cortes por usuário mais antigos que a validade máxima de um token saem da memória"""
+        max_age = max(app.config['JWT_ACCESS_TOKEN_EXPIRES'], app.config['JWT_REFRESH_TOKEN_EXPIRES'])
+        with app.app_context():
+            state = RevocationList()
+            state.cutoffs = {'1': int(time.time() - max_age.total_seconds()) - 1, '2': int(time.time())}
+            RevocationService.sync(state)
+
+            assert list(state.cutoffs) == ['2']
@@ -0,0 +1,140 @@
+"""
+Testes para o roteamento de leitura/escrita entre primário e réplicas
+"""
+
+import pytest
+import shutil
+import sys
+import os
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import event
+from src.models import db
+from src.models.routing import configure_read_replicas, enable_wal
+from src.services.auth_service import AuthService
+from src.services.task_service import TaskService
+from src.config import config
+from flask import Flask
+
+@pytest.fixture
+def app(tmp_path):
+    """Aplicação com banco SQLite em arquivo e duas conexões de leitura"""
+    app = Flask(__name__)
+    app.config.from_object(config['testing'])
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'app.db'}"
+    app.config['SQLALCHEMY_READ_POOL_SIZE'] = 2
+
+    configure_read_replicas(app)
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        enable_wal(db.engine)
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def statements(app):
+    """Registrar em qual engine cada SQL foi executado"""
+    executed = []
+    engines = {'primary': db.engine}
+    for index, engine in enumerate(app.extensions['read_replicas']['engines']):
+        engines[f'read_{index}'] = engine
+    for key, engine in engines.items():
+        def record(conn, cursor, statement, params, context, executemany, key=key):
+            executed.append((key, statement))
+        event.listen(engine, 'before_cursor_execute', record)
+    return executed
+
+def seed_user_with_task(app):
+    """Criar usuário e tarefa em uma 'requisição' separada"""
+    with app.app_context():
+        success, message, user = AuthService.register_user("João", "joao@exemplo.com", "senha123")
+        TaskService.create_task(user.id, "Tarefa 1", "Descrição", "pendente")
+        return user.id
+
+class TestReadWriteRouting:
+    """Testes para a RoutingSession"""
+
+    def test_reads_go_to_replica(self, app, statements):
+        """Testar que operações somente leitura usam uma engine de leitura"""
+        user_id = seed_user_with_task(app)
+        statements.clear()
+
+        with app.app_context():
+            success, message, data = TaskService.get_user_tasks(user_id)
+            assert success is True
+            assert data['pagination']['total'] == 1
+
+            success, message, stats = TaskService.get_task_statistics(user_id)
+            assert stats['total'] == 1
+
+            assert AuthService.get_user_by_id(user_id) is not None
+
+        keys = {key for key, statement in statements}
+        assert keys and all(key.startswith('read_') for key in keys)
+        # Uma sessão usa sempre a mesma réplica
+        assert len(keys) == 1
+
+    def test_writes_go_to_primary(self, app, statements):
+        """Testar que escritas e a busca para escrita usam o primário"""
+        user_id = seed_user_with_task(app)
+        statements.clear()
+
+        with app.app_context():
+            success, message, task = TaskService.create_task(user_id, "Tarefa 2")
+            assert success is True
+
+        assert statements
+        assert all(key == 'primary' for key, statement in statements)
+
+    def test_read_your_writes(self, app, statements):
+        """Testar que leituras após uma escrita na mesma requisição ficam no primário"""
+        user_id = seed_user_with_task(app)
+        statements.clear()
+
+        with app.app_context():
+            TaskService.create_task(user_id, "Tarefa 2")
+            statements.clear()
+
+            success, message, data = TaskService.get_user_tasks(user_id)
+            assert data['pagination']['total'] == 2
+
+        assert all(key == 'primary' for key, statement in statements)
+
+    @pytest.mark.parametrize('window', [0, 5])
+    def test_read_your_core_writes(self, tmp_path, window):
+        """Testar read-your-writes após escritas Core, com uma réplica que não acompanha o primário"""
+        app = Flask(__name__)
+        app.config.from_object(config['testing'])
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'app.db'}"
+        app.config['SQLALCHEMY_READ_REPLICAS'] = [f"sqlite:///{tmp_path / 'replica.db'}"]
+        app.config['GROUP_COMMIT_WINDOW_MS'] = window
+        configure_read_replicas(app)
+        db.init_app(app)
+
+        with app.app_context():
+            db.create_all()
+            user_id = seed_user_with_task(app)
+            task_id = TaskService.create_task(user_id, "Tarefa 2")[2].id
+            db.session.remove()
+        # A réplica fica parada neste ponto
+        shutil.copyfile(tmp_path / 'app.db', tmp_path / 'replica.db')
+
+        with app.app_context():
+            success, message = TaskService.delete_task(task_id, user_id)
+            assert success is True, message
+
+            success, message, data = TaskService.get_user_tasks(user_id)
+            assert data['pagination']['total'] == 1
+            db.session.remove()
+
+        with app.app_context():
+            # Requisição nova, sem escrita: a réplica atrasada ainda responde
+            success, message, data = TaskService.get_user_tasks(user_id)
+            assert data['pagination']['total'] == 2
+            db.session.remove()
+            db.drop_all()
@@ -204,7 +204,28 @@ class TestTaskService:
         
         assert success is True
         assert len(data['tasks']) == 1
-    
+
+    def test_read_path_matches_orm(self, app_context):
+        """Testar que as leituras em Core devolvem o mesmo JSON do ORM, sem instâncias na sessão"""
+        success, message, user = AuthService.register_user("João", "joao@exemplo.com", "senha123")
+        user_id = user.id
+        TaskService.create_task(user_id, "Tarefa 1", None, "pendente")
+        TaskService.create_task(user_id, "Tarefa 2", "Descrição 2", "concluida")
+        db.session.expunge_all()
+
+        expected = [task.to_dict() for task in Task.query.order_by(Task.created_at.desc(), Task.id.desc())]
+        db.session.expunge_all()
+
+        success, message, data = TaskService.get_user_tasks(user_id)
+        assert data['tasks'] == expected
+        assert list(TaskService.iter_user_tasks(user_id)) == [
+            dict(task, archived=False) for task in reversed(expected)
+        ]
+
+        success, message, task = TaskService.get_task_by_id(expected[0]['id'], user_id)
+        assert task.to_dict() == expected[0]
+        assert len(db.session.identity_map) == 0
+
     def test_update_task(self, app_context):
         """Testar atualização de tarefa"""
         # Criar usuário e tarefa
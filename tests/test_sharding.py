@@ -0,0 +1,277 @@
+"""
+Testes para o particionamento de usuários entre shards
+"""
+
+import pytest
+import sys
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import func, select, update
+from src.models import db, User, Task, UserDirectory
+from src.models.sharding import HashRing, configure_shards, init_shards, shard_engine
+from src.services.auth_service import AuthService
+from src.services import task_service
+from src.services.task_service import TaskService
+from src.services.shard_service import ShardService
+from src.config import config
+from flask import Flask
+from flask_jwt_extended import JWTManager
+
+def make_app(db_file, shards):
+    """Aplicação sobre um banco SQLite em arquivo com N shards"""
+    app = Flask(__name__)
+    app.config.from_object(config['testing'])
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{db_file}"
+    app.config['SHARD_COUNT'] = shards
+
+    configure_shards(app)
+    db.init_app(app)
+    JWTManager(app)
+
+    with app.app_context():
+        db.create_all()
+        init_shards()
+    return app
+
+def count_rows(shard, model):
+    """Contar linhas de uma tabela diretamente em um shard"""
+    with shard_engine(shard).connect() as conn:
+        return conn.execute(select(func.count()).select_from(model.__table__)).scalar()
+
+@pytest.fixture
+def app(tmp_path):
+    """Aplicação com três shards"""
+    return make_app(tmp_path / 'app.db', shards=3)
+
+class TestHashRing:
+    """Testes para o anel de hashing consistente"""
+
+    def test_distribution_and_stability(self):
+        """Testar que usuários se espalham e poucos mudam ao adicionar um shard"""
+        ring3 = HashRing([0, 1, 2])
+        ring4 = HashRing([0, 1, 2, 3])
+
+        placements = [ring3.shard_for(user_id) for user_id in range(1, 3001)]
+        assert set(placements) == {0, 1, 2}
+
+        moved = sum(1 for user_id in range(1, 3001)
+                    if ring3.shard_for(user_id) != ring4.shard_for(user_id))
+        # Idealmente 1/4 dos usuários muda de shard
+        assert moved < 3000 * 0.4
+
+class TestSharding:
+    """Testes para o acesso transparente aos shards"""
+
+    def test_users_spread_across_shards(self, app):
+        """Testar cadastro, login e tarefas de usuários em shards diferentes"""
+        with app.app_context():
+            users = []
+            for index in range(8):
+                success, message, user = AuthService.register_user(
+                    f"Usuário {index}", f"user{index}@exemplo.com", "senha123"
+                )
+                assert success is True
+                users.append(user.id)
+
+            shards = {entry.user_id: entry.shard for entry in UserDirectory.query.all()}
+            assert len(set(shards.values())) > 1
+
+            for user_id in users:
+                TaskService.create_task(user_id, "Tarefa", "Descrição", "pendente")
+
+            for shard in {0, 1, 2}:
+                expected = sum(1 for value in shards.values() if value == shard)
+                assert count_rows(shard, User) == expected
+                assert count_rows(shard, Task) == expected
+
+        with app.app_context():
+            task_ids = set()
+            for index, user_id in enumerate(users):
+                success, message, tokens = AuthService.authenticate_user(
+                    f"user{index}@exemplo.com", "senha123"
+                )
+                assert success is True
+
+                success, message, data = TaskService.get_user_tasks(user_id)
+                assert data['pagination']['total'] == 1
+                task_ids.add(data['tasks'][0]['id'])
+                assert AuthService.get_user_by_id(user_id).id == user_id
+
+            # IDs de tarefas são globais entre os shards
+            assert len(task_ids) == len(users)
+
+    def test_create_task_with_group_commit(self, app):
+        """Testar IDs globais com group commit ativo, inclusive para usuários do shard 0"""
+        app.config['GROUP_COMMIT_WINDOW_MS'] = 5
+        with app.app_context():
+            users = [AuthService.register_user(f"Usuário {index}", f"user{index}@exemplo.com", "senha123")[2].id
+                     for index in range(6)]
+            assert 0 in {entry.shard for entry in UserDirectory.query.all()}
+
+            task_ids = []
+            for user_id in users:
+                # Forçar a reserva de um novo bloco de IDs dentro da escrita
+                app.extensions['shards']['id_blocks'].clear()
+                success, message, task = TaskService.create_task(user_id, "Tarefa")
+                assert success is True, message
+                task_ids.append(task.id)
+
+            assert len(set(task_ids)) == len(users)
+
+    def test_duplicate_email_across_shards(self, app):
+        """Testar que o diretório impede emails duplicados em shards diferentes"""
+        with app.app_context():
+            AuthService.register_user("João", "joao@exemplo.com", "senha123")
+            success, message, user = AuthService.register_user("Maria", "joao@exemplo.com", "senha456")
+
+            assert success is False
+            assert "já cadastrado" in message
+
+    def test_delete_user_on_shard(self, app):
+        """Testar exclusão de conta no shard do usuário e liberação do diretório"""
+        with app.app_context():
+            success, message, user = AuthService.register_user("João", "joao@exemplo.com", "senha123")
+            shard = UserDirectory.query.get(user.id).shard
+            TaskService.create_task(user.id, "Tarefa 1")
+            TaskService.create_task(user.id, "Tarefa 2")
+
+            user_id = user.id
+            success, message, data = AuthService.delete_user(user_id)
+
+            assert success is True
+            assert data == {'scheduled': False, 'tasks': 2}
+            assert count_rows(shard, User) == 0
+            assert count_rows(shard, Task) == 0
+            assert AuthService.email_in_use("joao@exemplo.com") is False
+
+            # IDs de contas excluídas não voltam para o diretório
+            success, message, other = AuthService.register_user("Maria", "maria@exemplo.com", "senha123")
+            assert other.id > user_id
+
+    def test_rebalance_after_adding_shards(self, tmp_path):
+        """Testar que o rebalanceamento move usuários de um banco único para os shards"""
+        db_file = tmp_path / 'app.db'
+        single = make_app(db_file, shards=1)
+        with single.app_context():
+            users = []
+            for index in range(6):
+                success, message, user = AuthService.register_user(
+                    f"Usuário {index}", f"user{index}@exemplo.com", "senha123"
+                )
+                TaskService.create_task(user.id, "Tarefa 1")
+                TaskService.create_task(user.id, "Tarefa 2")
+                users.append(user.id)
+
+        sharded = make_app(db_file, shards=3)
+        with sharded.app_context():
+            success, message, stats = ShardService.rebalance()
+            assert success is True
+            assert stats['scanned'] == 6
+            assert stats['moved'] > 0 and stats['failed'] == 0
+
+            assert sum(count_rows(shard, Task) for shard in range(3)) == 12
+            assert count_rows(0, User) == 6 - stats['moved']
+
+        with sharded.app_context():
+            for index, user_id in enumerate(users):
+                success, message, tokens = AuthService.authenticate_user(
+                    f"user{index}@exemplo.com", "senha123"
+                )
+                assert success is True
+                success, message, data = TaskService.get_user_tasks(user_id)
+                assert data['pagination']['total'] == 2
+
+    @pytest.mark.parametrize('stage', ['checked', 'writing'])
+    def test_write_during_move(self, app, monkeypatch, stage):
+        """Testar que uma escrita concorrente com a migração não se perde"""
+        with app.app_context():
+            user_id = AuthService.register_user("João", "joao@exemplo.com", "senha123")[2].id
+            TaskService.create_task(user_id, "Tarefa 1")
+            source = db.session.get(UserDirectory, user_id).shard
+            target = (source + 1) % 3
+            db.session.remove()
+
+        # A escrita para depois de conferir o diretório ou já dentro da transação
+        paused, resume = threading.Event(), threading.Event()
+        def pause(original):
+            def wrapper(*args):
+                result = original(*args)
+                paused.set()
+                resume.wait(5)
+                return result
+            return wrapper
+        if stage == 'checked':
+            monkeypatch.setattr(task_service, 'use_user_shard', pause(task_service.use_user_shard))
+        else:
+            monkeypatch.setattr(task_service, 'key_between', pause(task_service.key_between))
+
+        results = {}
+        def write():
+            with app.app_context():
+                results['write'] = TaskService.create_task(user_id, "Tarefa 2")
+                db.session.remove()
+        def move():
+            with app.app_context():
+                results['move'] = ShardService.move_user(user_id, source, target)
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        assert paused.wait(5)
+        mover = threading.Thread(target=move)
+        mover.start()
+        if stage == 'checked':
+            mover.join()
+        else:
+            # A migração espera o COMMIT da escrita em andamento
+            time.sleep(0.2)
+            assert mover.is_alive()
+        resume.set()
+        writer.join()
+        mover.join()
+
+        with app.app_context():
+            assert results['move'][0] is True, results['move'][1]
+            assert db.session.get(UserDirectory, user_id).shard == target
+            assert count_rows(source, Task) == 0
+            written = 1 if stage == 'checked' else 2
+            assert results['write'][0] is (stage == 'writing'), results['write'][1]
+            assert count_rows(target, Task) == written
+
+    def test_interrupted_move_lock_expires(self, app):
+        """Testar que a trava de uma migração interrompida vence e a migração pode ser repetida"""
+        with app.app_context():
+            user_id = AuthService.register_user("João", "joao@exemplo.com", "senha123")[2].id
+            TaskService.create_task(user_id, "Tarefa 1")
+            source = db.session.get(UserDirectory, user_id).shard
+            target = (source + 1) % 3
+
+            def lock(locked_at):
+                with db.engine.begin() as conn:
+                    conn.execute(
+                        update(UserDirectory.__table__).where(UserDirectory.user_id == user_id)
+                        .values(locked=True, locked_at=locked_at)
+                    )
+                db.session.remove()
+
+            # Migração em andamento: escritas e novas migrações recusadas
+            lock(datetime.now())
+            assert TaskService.create_task(user_id, "Tarefa 2")[0] is False
+            assert ShardService.move_user(user_id, source, target)[0] is False
+
+            # Processo encerrado no meio da migração: a trava vence
+            lock(datetime.now() - timedelta(seconds=app.config['SHARD_MOVE_LOCK_SECONDS'] + 1))
+            success, message, task = TaskService.create_task(user_id, "Tarefa 2")
+            assert success is True, message
+
+            success, message = ShardService.move_user(user_id, source, target)
+            assert success is True, message
+            db.session.remove()
+            entry = db.session.get(UserDirectory, user_id)
+            assert (entry.shard, entry.locked, entry.locked_at) == (target, False, None)
+            assert count_rows(target, Task) == 2
@@ -0,0 +1,71 @@
+"""
+Testes para o servidor de arquivos estáticos
+"""
+
+import pytest
+import sys
+import os
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.main import create_app
+from src.models import db
+
+@pytest.fixture
+def app():
+    """Criar aplicação Flask completa para testes"""
+    app = create_app('testing')
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Cliente de teste"""
+    return app.test_client()
+
+@pytest.fixture
+def manifest(app):
+    """Manifesto de arquivos estáticos da aplicação"""
+    return app.extensions['static_manifest']
+
+class TestStaticAssets:
+    """Testes para o manifesto e cabeçalhos de cache"""
+
+    def test_index_revalidates(self, client, manifest):
+        """Testar que o index.html é revalidado e aponta para assets com fingerprint"""
+        response = client.get('/')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/html'
+        assert response.headers['Cache-Control'] == 'no-cache'
+        assert response.headers['ETag']
+        assert manifest.url_for('favicon.ico').encode() in response.data
+
+    def test_conditional_request(self, client):
+        """Testar resposta 304 quando o ETag não mudou"""
+        etag = client.get('/').headers['ETag']
+        response = client.get('/', headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.data == b''
+
+    def test_fingerprinted_asset_is_immutable(self, client, manifest):
+        """Testar cache de longa duração para nomes com fingerprint"""
+        url = manifest.url_for('favicon.ico')
+        assert url != '/favicon.ico'
+
+        response = client.get(url)
+
+        assert response.status_code == 200
+        assert 'immutable' in response.headers['Cache-Control']
+        assert 'max-age=31536000' in response.headers['Cache-Control']
+        assert response.data == client.get('/favicon.ico').data
+
+    def test_unknown_path_falls_back_to_index(self, client):
+        """Testar que caminhos desconhecidos servem o index.html"""
+        response = client.get('/rota/inexistente')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/html'
@@ -0,0 +1,146 @@
+"""
+Testes para o agregado diário de tarefas concluídas
+"""
+
+import pytest
+import sys
+import os
+from datetime import date, datetime, timedelta
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from flask import Flask
+from sqlalchemy import create_engine, text
+from src.config import config
+from src.main import create_app
+from src.models import db, Task, TaskDailyStat
+from src.models.schema import create_missing_columns
+from src.services.auth_service import AuthService
+from src.services.stats_service import StatsService
+from src.services.task_service import TaskService
+
+@pytest.fixture
+def app():
+    """Criar aplicação Flask para testes"""
+    app = Flask(__name__)
+    app.config.from_object(config['testing'])
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        AuthService.register_user('João', 'joao@exemplo.com', 'senha123')
+        yield app
+        db.drop_all()
+
+def daily_counts(user_id=1):
+    """Conclusões por dia gravadas no agregado"""
+    return {row.day: row.completed for row in TaskDailyStat.query.filter_by(user_id=user_id)}
+
+class TestCompletionRollups:
+    """Testes para a manutenção incremental e a leitura das séries"""
+
+    def test_status_transitions_update_rollup(self, app):
+        """Testar criação, conclusão, reabertura e exclusão"""
+        today = date.today()
+        success, message, done = TaskService.create_task(1, 'Feita', status='concluida')
+        success, message, task = TaskService.create_task(1, 'Pendente')
+        assert done.completed_at is not None
+        assert daily_counts() == {today: 1}
+
+        TaskService.update_task(task.id, 1, status='concluida')
+        assert daily_counts() == {today: 2}
+
+        TaskService.update_task(task.id, 1, status='concluida')
+        assert daily_counts() == {today: 2}
+
+        success, message, task = TaskService.update_task(task.id, 1, status='pendente')
+        assert task.completed_at is None
+        assert daily_counts() == {today: 1}
+
+        TaskService.delete_task(done.id, 1)
+        assert daily_counts() == {today: 0}
+
+    def test_timeseries_buckets(self, app):
+        """Testar séries por dia e por semana com dias vazios"""
+        monday = date(2025, 3, 3)
+        for offset, count in ((0, 2), (1, 1), (8, 3)):
+            for _ in range(count):
+                moment = datetime.combine(monday + timedelta(days=offset), datetime.min.time())
+                StatsService.record_completion(db.session, 1, moment, 1)
+        db.session.commit()
+
+        success, message, data = StatsService.get_completion_timeseries(1, '2025-03-03', '2025-03-12')
+        assert success is True
+        assert len(data['series']) == 10
+        assert data['series'][0] == {'date': '2025-03-03', 'completed': 2}
+        assert data['series'][2] == {'date': '2025-03-05', 'completed': 0}
+        assert data['total'] == 6
+
+        success, message, data = StatsService.get_completion_timeseries(1, '2025-03-05', '2025-03-12', 'week')
+        assert [point['date'] for point in data['series']] == ['2025-03-03', '2025-03-10']
+        assert [point['completed'] for point in data['series']] == [0, 3]
+
+    @pytest.mark.parametrize('start,end,bucket', [
+        ('2025-03-10', '2025-03-01', 'day'),
+        ('ontem', None, 'day'),
+        ('2020-01-01', '2025-01-01', 'day'),
+        (None, None, 'month'),
+    ])
+    def test_invalid_periods(self, app, start, end, bucket):
+        """Testar períodos e agrupamentos inválidos"""
+        success, message, data = StatsService.get_completion_timeseries(1, start, end, bucket)
+
+        assert success is False
+        assert data is None
+
+    def test_backfill_matches_incremental(self, app):
+        """Testar que a reconstrução chega ao mesmo agregado e preenche completed_at"""
+        for index in range(3):
+            success, message, task = TaskService.create_task(1, f'Tarefa {index}', status='concluida')
+        legacy = Task(name='Antiga', status='concluida', user_id=1, updated_at=datetime(2024, 5, 1, 10))
+        db.session.add(legacy)
+        db.session.commit()
+
+        success, message, stats = StatsService.backfill_completions()
+
+        assert success is True
+        assert stats['tasks'] == 1
+        assert daily_counts() == {date(2024, 5, 1): 1, date.today(): 3}
+
+class TestTimeseriesRoute:
+    """Testes para a rota de séries e para a migração da coluna"""
+
+    def test_route(self):
+        """Testar a rota com os parâmetros from, to e bucket"""
+        app = create_app('testing')
+        client = app.test_client()
+        client.post('/api/register', json={'name': 'João', 'email': 'joao@exemplo.com', 'password': 'senha123'})
+        token = client.post('/api/login', json={'email': 'joao@exemplo.com', 'password': 'senha123'}).get_json()['access_token']
+        headers = {'Authorization': f'Bearer {token}'}
+        client.post('/api/tasks', json={'name': 'Tarefa', 'status': 'concluida'}, headers=headers)
+
+        response = client.get('/api/tasks/stats/timeseries', headers=headers)
+        assert response.status_code == 200
+        body = response.get_json()
+        assert len(body['series']) == StatsService.DEFAULT_DAYS
+        assert body['series'][-1] == {'date': date.today().isoformat(), 'completed': 1}
+
+        response = client.get('/api/tasks/stats/timeseries?bucket=year', headers=headers)
+        assert response.status_code == 400
+        with app.app_context():
+            db.drop_all()
+
+    def test_missing_column_added(self, tmp_path):
+        """Testar que completed_at é adicionada a bancos criados antes dela"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        with engine.begin() as conn:
+            conn.execute(text('CREATE TABLE tasks (id INTEGER PRIMARY KEY, name VARCHAR(200) NOT NULL, '
+                              'description TEXT, status VARCHAR(20) NOT NULL, created_at DATETIME, '
+                              'updated_at DATETIME, user_id INTEGER NOT NULL)'))
+
+        create_missing_columns(engine, [Task.__table__])
+
+        with engine.connect() as conn:
+            columns = [row[1] for row in conn.execute(text('PRAGMA table_info(tasks)'))]
+        assert 'completed_at' in columns
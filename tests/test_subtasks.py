@@ -0,0 +1,201 @@
+"""
+Testes para as subtarefas e a tabela de fechamento
+"""
+
+import pytest
+import sys
+import os
+from datetime import date
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from flask import Flask
+from src.config import config
+from src.main import create_app
+from src.models import db, Task, TaskArchive, TaskClosure, TaskDailyStat
+from src.services.archive_service import ArchiveService
+from src.services.auth_service import AuthService
+from src.services.subtask_service import SubtaskService
+from src.services.task_service import TaskService
+
+@pytest.fixture
+def app():
+    """Criar aplicação Flask para testes"""
+    app = Flask(__name__)
+    app.config.from_object(config['testing'])
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        AuthService.register_user('João', 'joao@exemplo.com', 'senha123')
+        AuthService.register_user('Maria', 'maria@exemplo.com', 'senha123')
+        yield app
+        db.drop_all()
+
+def create(name, parent=None, user_id=1):
+    """Criar uma tarefa e devolver o ID"""
+    success, message, task = TaskService.create_task(user_id, name, parent_id=parent)
+    assert success is True, message
+    return task.id
+
+def closure_pairs():
+    """Pares (ancestral, descendente, profundidade) da hierarquia"""
+    return {(row.ancestor_id, row.descendant_id, row.depth) for row in TaskClosure.query}
+
+@pytest.fixture
+def tree(app):
+    """raiz -> (a -> a1 -> a11, b); outra sem hierarquia"""
+    root = create('Raiz')
+    a = create('A', root)
+    a1 = create('A1', a)
+    a11 = create('A11', a1)
+    b = create('B', root)
+    other = create('Outra')
+    return {'root': root, 'a': a, 'a1': a1, 'a11': a11, 'b': b, 'other': other}
+
+class TestSubtaskService:
+    """Testes para a manutenção e a leitura da hierarquia"""
+
+    def test_subtree_and_ancestors(self, tree):
+        """Testar subárvore por nível e ancestrais da mãe para a raiz"""
+        success, message, data = SubtaskService.get_subtree(tree['root'], 1)
+
+        assert success is True
+        assert data['task']['id'] == tree['root']
+        assert [(task['name'], task['depth']) for task in data['subtasks']] == [
+            ('A', 1), ('B', 1), ('A1', 2), ('A11', 3)
+        ]
+        assert data['subtasks'][2]['parent_id'] == tree['a']
+
+        success, message, tasks = SubtaskService.get_ancestors(tree['a11'], 1)
+        assert [task['name'] for task in tasks] == ['A1', 'A', 'Raiz']
+
+        assert SubtaskService.get_subtree(tree['root'], 2)[0] is False
+
+    def test_subtree_statistics_and_complete(self, tree):
+        """Testar a conclusão da subárvore em conjunto e o agregado diário"""
+        TaskService.update_task(tree['a11'], 1, status='concluida')
+
+        success, message, stats = SubtaskService.get_subtree_statistics(tree['a'], 1)
+        assert stats == {'total': 3, 'pendente': 2, 'concluida': 1, 'completion_rate': 33.33, 'depth': 2}
+
+        success, message, data = TaskService.complete_subtree(tree['a'], 1)
+        assert success is True
+        assert data == {'completed': 2}
+        assert TaskDailyStat.query.filter_by(user_id=1, day=date.today()).one().completed == 3
+        assert db.session.get(Task, tree['a1']).completed_at is not None
+        assert db.session.get(Task, tree['b']).status == 'pendente'
+
+        success, message, stats = SubtaskService.get_subtree_statistics(tree['root'], 1)
+        assert stats['concluida'] == 3
+        assert stats['total'] == 5
+
+    def test_move(self, tree):
+        """Testar mover uma subárvore para outra mãe e para o primeiro nível"""
+        success, message, task = TaskService.move_task(tree['a'], 1, tree['other'])
+        assert success is True
+        assert task.parent_id == tree['other']
+
+        success, message, data = SubtaskService.get_subtree(tree['other'], 1)
+        assert [(task['name'], task['depth']) for task in data['subtasks']] == [('A', 1), ('A1', 2), ('A11', 3)]
+        success, message, data = SubtaskService.get_subtree(tree['root'], 1)
+        assert [task['name'] for task in data['subtasks']] == ['B']
+
+        TaskService.move_task(tree['a1'], 1, None)
+        assert (tree['a1'], tree['a11'], 1) in closure_pairs()
+        assert not {pair for pair in closure_pairs() if pair[1] == tree['a1']}
+        assert SubtaskService.get_ancestors(tree['a11'], 1)[2][0]['name'] == 'A1'
+
+    @pytest.mark.parametrize('task,parent', [('root', 'a11'), ('a', 'a'), ('a', 'missing')])
+    def test_invalid_moves(self, tree, task, parent):
+        """Testar ciclos e mães inexistentes"""
+        pairs = closure_pairs()
+
+        success, message, data = TaskService.move_task(tree[task], 1, tree.get(parent, 999))
+
+        assert success is False
+        assert closure_pairs() == pairs
+
+    def test_depth_limit(self, app, monkeypatch):
+        """Testar o limite de níveis na criação e ao mover"""
+        monkeypatch.setattr(SubtaskService, 'MAX_DEPTH', 2)
+        root = create('Raiz')
+        child = create('Filha', root)
+        grandchild = create('Neta', child)
+        other = create('Outra')
+
+        assert TaskService.create_task(1, 'Bisneta', parent_id=grandchild)[0] is False
+        assert TaskService.move_task(root, 1, other)[0] is False
+        assert TaskService.move_task(child, 1, other)[0] is True
+
+    def test_delete_subtree(self, tree):
+        """Testar que excluir uma tarefa remove a subárvore e os vínculos"""
+        TaskService.update_task(tree['a1'], 1, status='concluida')
+
+        success, message = TaskService.delete_task(tree['a'], 1)
+
+        assert success is True
+        assert {task.name for task in Task.query.filter_by(user_id=1)} == {'Raiz', 'B', 'Outra'}
+        assert closure_pairs() == {(tree['root'], tree['b'], 1)}
+        assert TaskDailyStat.query.filter_by(user_id=1).one().completed == 0
+
+    def test_parent_must_belong_to_user(self, tree):
+        """Testar que subtarefas só podem ficar sob tarefas do próprio usuário"""
+        success, message, task = TaskService.create_task(2, 'Intrusa', parent_id=tree['root'])
+
+        assert success is False
+        assert message == "Tarefa mãe não encontrada"
+
+    def test_archive_starts_from_leaves(self, tree):
+        """Testar que tarefas com subtarefas ativas não são arquivadas"""
+        TaskService.update_task(tree['b'], 1, status='concluida')
+        TaskService.update_task(tree['root'], 1, status='concluida')
+
+        ArchiveService.archive_completed_tasks(older_than_days=-1)
+
+        assert [row.id for row in TaskArchive.query] == [tree['b']]
+        assert all(pair[1] != tree['b'] for pair in closure_pairs())
+        assert db.session.get(Task, tree['root']) is not None
+
+class TestSubtaskRoutes:
+    """Testes para as rotas de subtarefas"""
+
+    def test_routes(self):
+        """Testar criação com parent_id, subárvore, ancestrais, movimento e conclusão"""
+        app = create_app('testing')
+        client = app.test_client()
+        client.post('/api/register', json={'name': 'João', 'email': 'joao@exemplo.com', 'password': 'senha123'})
+        token = client.post('/api/login', json={'email': 'joao@exemplo.com', 'password': 'senha123'}).get_json()['access_token']
+        headers = {'Authorization': f'Bearer {token}'}
+
+        root = client.post('/api/tasks', json={'name': 'Raiz'}, headers=headers).get_json()['task']['id']
+        response = client.post('/api/tasks', json={'name': 'Filha', 'parent_id': root}, headers=headers)
+        assert response.status_code == 201
+        child = response.get_json()['task']
+        assert child['parent_id'] == root
+
+        response = client.post('/api/tasks', json={'name': 'Filha', 'parent_id': 'raiz'}, headers=headers)
+        assert response.status_code == 400
+
+        response = client.get(f'/api/tasks/{root}/subtree', headers=headers)
+        assert [task['name'] for task in response.get_json()['subtasks']] == ['Filha']
+        response = client.get(f"/api/tasks/{child['id']}/subtree", headers=headers)
+        assert response.get_json()['subtasks'] == []
+
+        response = client.get(f"/api/tasks/{child['id']}/ancestors", headers=headers)
+        assert [task['id'] for task in response.get_json()['tasks']] == [root]
+
+        response = client.post(f'/api/tasks/{root}/subtree/complete', headers=headers)
+        assert response.get_json()['completed'] == 2
+        response = client.get(f'/api/tasks/{root}/subtree/stats', headers=headers)
+        assert response.get_json()['statistics']['completion_rate'] == 100.0
+
+        response = client.post(f"/api/tasks/{child['id']}/move", json={'parent_id': None}, headers=headers)
+        assert response.status_code == 200
+        assert response.get_json()['task']['parent_id'] is None
+
+        response = client.post(f'/api/tasks/{root}/move', json={'parent_id': root}, headers=headers)
+        assert response.status_code == 400
+        with app.app_context():
+            db.drop_all()
@@ -0,0 +1,127 @@
+"""
+Testes para as etiquetas das tarefas e o índice invertido
+"""
+
+import pytest
+import sys
+import os
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from flask import Flask
+from src.config import config
+from src.main import create_app
+from src.models import db, TaskTag, TagCount
+from src.services.auth_service import AuthService
+from src.services.tag_service import TagService
+from src.services.task_service import TaskService
+
+@pytest.fixture
+def app():
+    """Criar aplicação Flask para testes"""
+    app = Flask(__name__)
+    app.config.from_object(config['testing'])
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        AuthService.register_user('João', 'joao@exemplo.com', 'senha123')
+        yield app
+        db.drop_all()
+
+def tag_counts(user_id=1):
+    """Contagens mantidas por etiqueta"""
+    return {row.tag: row.count for row in TagCount.query.filter_by(user_id=user_id)}
+
+def listed_names(**kwargs):
+    """Nomes das tarefas devolvidas pela listagem"""
+    success, message, data = TaskService.get_user_tasks(1, **kwargs)
+    assert success is True, message
+    return sorted(task['name'] for task in data['tasks'])
+
+class TestTagService:
+    """Testes para a manutenção das etiquetas e das contagens"""
+
+    def test_normalize_tags(self):
+        """Testar minúsculas, espaços, repetição e limites"""
+        assert TagService.normalize_tags([' Casa', 'casa', 'URGENTE']) == (True, "Tags válidas", ['casa', 'urgente'])
+        assert TagService.normalize_tags('casa')[0] is False
+        assert TagService.normalize_tags(['', 'casa'])[0] is False
+        assert TagService.normalize_tags(['x' * 51])[0] is False
+        assert TagService.normalize_tags([f'tag{index}' for index in range(21)])[0] is False
+
+    def test_counts_follow_writes(self, app):
+        """Testar criação, troca de etiquetas e exclusão"""
+        success, message, first = TaskService.create_task(1, 'Primeira', tags=['Casa', 'urgente'])
+        success, message, second = TaskService.create_task(1, 'Segunda', tags=['casa'])
+        assert first.to_dict()['tags'] == ['casa', 'urgente']
+        assert tag_counts() == {'casa': 2, 'urgente': 1}
+
+        success, message, task = TaskService.update_task(first.id, 1, tags=['trabalho'])
+        assert task.to_dict()['tags'] == ['trabalho']
+        assert tag_counts() == {'casa': 1, 'trabalho': 1}
+
+        success, message, task = TaskService.update_task(second.id, 1, name='Renomeada')
+        assert task.to_dict()['tags'] == ['casa']
+
+        TaskService.delete_task(second.id, 1)
+        assert tag_counts() == {'trabalho': 1}
+        assert TaskTag.query.filter_by(task_id=second.id).count() == 0
+
+    def test_filter_all_and_any(self, app):
+        """Testar filtros que exigem todas ou alguma das etiquetas"""
+        TaskService.create_task(1, 'A', tags=['casa', 'urgente'])
+        TaskService.create_task(1, 'B', tags=['casa'])
+        TaskService.create_task(1, 'C', tags=['urgente', 'trabalho'], status='concluida')
+        TaskService.create_task(1, 'D')
+
+        assert listed_names(tags=['casa']) == ['A', 'B']
+        assert listed_names(tags=['Casa', 'urgente']) == ['A']
+        assert listed_names(tags=['casa', 'trabalho'], tag_mode='any') == ['A', 'B', 'C']
+        assert listed_names(tags=['urgente'], status='concluida') == ['C']
+        assert listed_names(tags=['inexistente']) == []
+
+        success, message, data = TaskService.get_user_tasks(1, tags=['casa'], tag_mode='nenhuma')
+        assert success is False
+
+    def test_tag_cloud_and_purge(self, app):
+        """Testar a nuvem de etiquetas e a remoção junto com o usuário"""
+        TaskService.create_task(1, 'A', tags=['casa', 'urgente'])
+        TaskService.create_task(1, 'B', tags=['casa'])
+
+        success, message, tags = TagService.get_tag_cloud(1)
+        assert tags == [{'tag': 'casa', 'count': 2}, {'tag': 'urgente', 'count': 1}]
+
+        assert AuthService.purge_user(1) == 2
+        assert TaskTag.query.count() == 0
+        assert TagCount.query.count() == 0
+
+class TestTagRoutes:
+    """Testes para as rotas com etiquetas"""
+
+    def test_routes(self):
+        """Testar criação com tags, filtro por ?tag= e GET /tags"""
+        app = create_app('testing')
+        client = app.test_client()
+        client.post('/api/register', json={'name': 'João', 'email': 'joao@exemplo.com', 'password': 'senha123'})
+        token = client.post('/api/login', json={'email': 'joao@exemplo.com', 'password': 'senha123'}).get_json()['access_token']
+        headers = {'Authorization': f'Bearer {token}'}
+
+        response = client.post('/api/tasks', json={'name': 'A', 'tags': ['Casa', 'urgente']}, headers=headers)
+        assert response.status_code == 201
+        assert response.get_json()['task']['tags'] == ['casa', 'urgente']
+        client.post('/api/tasks', json={'name': 'B', 'tags': ['casa']}, headers=headers)
+
+        response = client.post('/api/tasks', json={'name': 'C', 'tags': 'casa'}, headers=headers)
+        assert response.status_code == 400
+        assert 'tags' in response.get_json()['errors']
+
+        response = client.get('/api/tasks?tag=casa&tag=urgente', headers=headers)
+        assert [task['name'] for task in response.get_json()['tasks']] == ['A']
+
+        response = client.get('/api/tags', headers=headers)
+        assert response.status_code == 200
+        assert response.get_json()['tags'][0] == {'tag': 'casa', 'count': 2}
+        with app.app_context():
+            db.drop_all()
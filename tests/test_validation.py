@@ -0,0 +1,128 @@
+"""
+Testes para a validação declarativa dos corpos das requisições
+"""
+
+import pytest
+import sys
+import os
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.main import create_app
+from src.models import db
+from src.middleware.validation import Field, Schema
+
+@pytest.fixture
+def app():
+    """Criar aplicação Flask completa"""
+    app = create_app('testing')
+    app.config['MAX_CONTENT_LENGTH'] = 4096
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Cliente de teste"""
+    return app.test_client()
+
+def login(client):
+    """Registrar e autenticar um usuário, devolvendo os cabeçalhos"""
+    client.post('/api/register', json={'name': 'João', 'email': 'joao@exemplo.com', 'password': 'senha123'})
+    response = client.post('/api/login', json={'email': 'joao@exemplo.com', 'password': 'senha123'})
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+class TestSchema:
+    """Testes para os validadores compilados"""
+
+    def test_all_errors_in_one_pass(self):
+        """Testar que todos os campos inválidos são reportados juntos"""
+        schema = Schema(
+            name=Field('Nome', required=True, max_length=5),
+            status=Field('Status', choices=['a', 'b']),
+            note=Field('Nota', blank=True)
+        )
+
+        data, errors = schema.validate({'name': 'longo demais', 'status': 'c', 'note': 3})
+
+        assert errors == {
+            'name': 'Nome deve ter no máximo 5 caracteres',
+            'status': 'Status deve ser um dos seguintes: a, b',
+            'note': 'Nota deve ser texto'
+        }
+
+    def test_normalizes_and_drops_unknown_fields(self):
+        """Testar strip, valores padrão e descarte de campos não declarados"""
+        schema = Schema(
+            name=Field('Nome', required=True),
+            status=Field('Status', default='pendente'),
+            description=Field('Descrição', blank=True)
+        )
+
+        data, errors = schema.validate({'name': '  Tarefa  ', 'description': None, 'id': 99})
+
+        assert errors == {}
+        assert data == {'name': 'Tarefa', 'status': 'pendente', 'description': None}
+
+class TestRequestValidation:
+    """Testes para a validação nas rotas"""
+
+    def test_structured_errors(self, client):
+        """Testar a resposta com os erros de cada campo"""
+        response = client.post('/api/register', json={'name': ' ', 'email': 'invalido', 'password': '123'})
+
+        assert response.status_code == 400
+        body = response.get_json()
+        assert body['errors'] == {
+            'name': 'Nome é obrigatório',
+            'email': 'Formato de email inválido',
+            'password': 'Senha deve ter pelo menos 6 caracteres'
+        }
+        assert body['error'] == 'Nome é obrigatório'
+
+    def test_task_body_validated(self, client):
+        """Testar criação e atualização de tarefa com corpos inválidos e válidos"""
+        headers = login(client)
+
+        response = client.post('/api/tasks', json={'name': 'x' * 201, 'status': 'feita'}, headers=headers)
+        assert response.status_code == 400
+        assert set(response.get_json()['errors']) == {'name', 'status'}
+
+        response = client.post('/api/tasks', json={'name': '  Tarefa  '}, headers=headers)
+        assert response.status_code == 201
+        task = response.get_json()['task']
+        assert task['name'] == 'Tarefa'
+        assert task['status'] == 'pendente'
+
+        response = client.put(f"/api/tasks/{task['id']}", json={'name': ''}, headers=headers)
+        assert response.status_code == 400
+        assert response.get_json()['errors'] == {'name': 'Nome da tarefa é obrigatório'}
+
+    def test_oversized_body_rejected_before_parsing(self, app, client):
+        """Testar que corpos acima do limite são recusados pelo Content-Length"""
+        parsed = []
+        original = app.request_class.get_json
+        app.request_class.get_json = lambda self, *args, **kwargs: parsed.append(True) or original(self, *args, **kwargs)
+        try:
+            response = client.post('/api/register', data='{"name": "' + 'x' * 5000 + '"}',
+                                   content_type='application/json')
+        finally:
+            app.request_class.get_json = original
+
+        assert response.status_code == 413
+        assert 'error' in response.get_json()
+        assert parsed == []
+
+    def test_missing_or_invalid_body(self, client):
+        """Testar corpo ausente, não JSON ou que não é um objeto"""
+        assert client.post('/api/login').status_code == 400
+        assert client.post('/api/login', data='email=a', content_type='text/plain').status_code == 400
+        assert client.post('/api/login', json=['email']).status_code == 400
+
+    def test_optional_body(self, client):
+        """Testar que o logout aceita requisição sem corpo"""
+        headers = login(client)
+
+        response = client.post('/api/logout', headers=headers)
+        assert response.status_code == 200
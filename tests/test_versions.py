@@ -0,0 +1,164 @@
+"""
+Testes para o controle de concorrência otimista (coluna version)
+"""
+
+import pytest
+import sys
+import os
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from flask import Flask
+from sqlalchemy import create_engine, event, text, update
+from src.config import config
+from src.main import create_app
+from src.models import db, Task, User
+from src.models.schema import create_missing_columns
+from src.services.auth_service import AuthService
+from src.services.task_service import TaskService
+
+@pytest.fixture
+def app():
+    """Criar aplicação Flask para testes"""
+    app = Flask(__name__)
+    app.config.from_object(config['testing'])
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        AuthService.register_user('João', 'joao@exemplo.com', 'senha123')
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def task_id(app):
+    """Tarefa recém-criada (versão 1)"""
+    return TaskService.create_task(1, 'Tarefa')[2].id
+
+def stored_version(task_id):
+    """Versão gravada no banco"""
+    return db.session.execute(text('SELECT version FROM tasks WHERE id = :id'), {'id': task_id}).scalar()
+
+class TestTaskVersion:
+    """Testes para a versão das tarefas"""
+
+    def test_every_write_increments(self, task_id):
+        """Testar que cada escrita incrementa a versão"""
+        assert TaskService.get_task_by_id(task_id, 1)[2].version == 1
+
+        success, message, task = TaskService.update_task(task_id, 1, name='Renomeada')
+        assert task.version == 2
+        TaskService.update_task(task_id, 1, tags=['casa'])
+        assert stored_version(task_id) == 3
+        TaskService.complete_subtree(task_id, 1)
+        assert stored_version(task_id) == 4
+        assert TaskService.get_task_by_id(task_id, 1)[2].to_dict()['version'] == 4
+
+    def test_conditional_update(self, app, task_id):
+        """Testar que o UPDATE leva a versão lida na cláusula WHERE"""
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement) \
+            if statement.startswith('UPDATE tasks') else None
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            success, message, task = TaskService.update_task(task_id, 1, name='Renomeada', expected_version=1)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+        assert success is True
+        assert len(statements) == 1
+        assert 'version = ?' in statements[0].split('WHERE')[1]
+
+    def test_stale_expected_version(self, task_id):
+        """Testar que uma versão antiga no If-Match não grava nada"""
+        assert TaskService.update_task(task_id, 1, name='Primeira', expected_version=1)[0] is True
+
+        success, message, task = TaskService.update_task(task_id, 1, name='Segunda', expected_version=1)
+
+        assert success is False
+        assert message == TaskService.VERSION_CONFLICT
+        assert TaskService.get_task_by_id(task_id, 1)[2].name == 'Primeira'
+
+    def test_concurrent_write_between_read_and_update(self, task_id, monkeypatch):
+        """Testar que outra escrita entre a leitura e o UPDATE gera conflito"""
+        find_user_task = TaskService._find_user_task
+
+        def find_then_concurrent_write(*args):
+            result = find_user_task(*args)
+            tasks = Task.__table__
+            db.session.execute(update(tasks).where(tasks.c.id == task_id).values(
+                name='Concorrente', version=tasks.c.version + 1
+            ))
+            return result
+
+        monkeypatch.setattr(TaskService, '_find_user_task', find_then_concurrent_write)
+        success, message, task = TaskService.update_task(task_id, 1, name='Perdida')
+        monkeypatch.undo()
+
+        assert success is False
+        assert message == TaskService.VERSION_CONFLICT
+        # A escrita concorrente foi desfeita junto com a transação
+        assert TaskService.get_task_by_id(task_id, 1)[2].name == 'Tarefa'
+
+    def test_user_version(self, app):
+        """Testar a versão do usuário e o conflito na atualização do perfil"""
+        assert db.session.get(User, 1).version == 1
+
+        success, message, user = AuthService.update_user(1, name='João Silva', expected_version=1)
+        assert user.version == 2
+
+        success, message, user = AuthService.update_user(1, name='Outro', expected_version=1)
+        assert success is False
+        assert message == AuthService.VERSION_CONFLICT
+
+    def test_missing_version_column_added(self, tmp_path):
+        """Testar que bancos antigos recebem a coluna com as linhas na versão 1"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        with engine.begin() as conn:
+            conn.execute(text('CREATE TABLE tasks (id INTEGER PRIMARY KEY, name VARCHAR(200) NOT NULL, '
+                              'status VARCHAR(20) NOT NULL, user_id INTEGER NOT NULL)'))
+            conn.execute(text("INSERT INTO tasks (name, status, user_id) VALUES ('Antiga', 'pendente', 1)"))
+
+        create_missing_columns(engine, [Task.__table__])
+
+        with engine.connect() as conn:
+            assert conn.execute(text('SELECT version FROM tasks')).scalar() == 1
+
+class TestVersionRoutes:
+    """Testes para ETag e If-Match nas rotas"""
+
+    def test_if_match(self):
+        """Testar ETag, If-Match aceito, conflito 409 e valor inválido"""
+        app = create_app('testing')
+        client = app.test_client()
+        client.post('/api/register', json={'name': 'João', 'email': 'joao@exemplo.com', 'password': 'senha123'})
+        token = client.post('/api/login', json={'email': 'joao@exemplo.com', 'password': 'senha123'}).get_json()['access_token']
+        headers = {'Authorization': f'Bearer {token}'}
+        task_id = client.post('/api/tasks', json={'name': 'Tarefa'}, headers=headers).get_json()['task']['id']
+
+        response = client.get(f'/api/tasks/{task_id}', headers=headers)
+        assert response.headers['ETag'] == '"1"'
+        assert response.get_json()['task']['version'] == 1
+
+        response = client.put(f'/api/tasks/{task_id}', json={'name': 'Primeira'},
+                              headers={**headers, 'If-Match': '"1"'})
+        assert response.status_code == 200
+        assert response.headers['ETag'] == '"2"'
+
+        response = client.put(f'/api/tasks/{task_id}', json={'name': 'Segunda'},
+                              headers={**headers, 'If-Match': '"1"'})
+        assert response.status_code == 409
+        response = client.put(f'/api/tasks/{task_id}', json={'name': 'Segunda'},
+                              headers={**headers, 'If-Match': 'abc'})
+        assert response.status_code == 400
+        response = client.put(f'/api/tasks/{task_id}', json={'name': 'Segunda'}, headers={**headers, 'If-Match': '*'})
+        assert response.status_code == 200
+
+        response = client.put('/api/profile', json={'name': 'João Silva'}, headers={**headers, 'If-Match': 'W/"1"'})
+        assert response.status_code == 200
+        assert response.get_json()['user']['version'] == 2
+        response = client.put('/api/profile', json={'name': 'Outro'}, headers={**headers, 'If-Match': '1'})
+        assert response.status_code == 409
+        with app.app_context():
+            db.drop_all()